@@ -10,9 +10,13 @@ different analytical pages such as SMA, Runs, Daily Returns, and Max Profit.
 
 """
 
+import time
 import streamlit as st
 from datetime import date, timedelta
 from scr.data.yfinance_client import fetch_prices
+from scr.data.price_store import get_store, store_key
+from scr.data.fetch_client import get_client
+from scr.data.swr import describe
 
 # -----------------------------
 # Preset list of popular tickers
@@ -39,7 +43,7 @@ default_start = today - timedelta(days=365 * 3)
 # Initialize session state for persistence across pages
 st.session_state.setdefault("cfg", {"ticker": default_ticker, "start": default_start, "end": default_end})
 st.session_state.setdefault("data", None)
-st.session_state.setdefault("meta", {"last_fetch_ok": False, "error": None})
+st.session_state.setdefault("meta", {"last_fetch_ok": False, "error": None, "freshness": None})
 
 # -----------------------------
 # User controls for ticker and date selection
@@ -85,17 +89,34 @@ if start_date > end_date:
 # Load data on button click
 # -----------------------------
 if st.button("Load Data", type="primary"):
-    df = fetch_prices(ticker, start_date, end_date)
+    # Shared memory-mapped copy: every session loading this ticker/range gets a
+    # read-only view of the same files. Ranges ending today go stale after 15 min;
+    # a stale copy is shown immediately while a background refresh runs.
+    # NOTE: the loader raises (raise_errors=True) so a failed refresh is recorded
+    # on the stored entry and shown below, instead of looking like "no data".
+    key = store_key(ticker, start_date, end_date)
+    max_age = 15 * 60 if end_date >= today else None
+    try:
+        df = get_store().get_or_load(
+            key,
+            lambda: fetch_prices(ticker, start_date, end_date, raise_errors=True),
+            max_age=max_age,
+            stale_while_revalidate=True,
+        )
+        error = None
+    except Exception as e:
+        df, error = None, str(e) or type(e).__name__
 
     if df is None or df.empty:
         # Handle empty or invalid fetch
-        st.session_state["meta"] = {"last_fetch_ok": False, "error": "No data returned."}
-        st.error("Failed to fetch data. Try another ticker or change the range.")
+        st.session_state["meta"] = {"last_fetch_ok": False, "error": error or "No data returned.", "freshness": None}
+        st.error(f"Failed to fetch data ({error or 'no rows'}). Try another ticker or change the range.")
     else:
         # Save data and configuration in session
         st.session_state["cfg"] = {"ticker": ticker, "start": start_date, "end": end_date}
         st.session_state["data"] = df
-        st.session_state["meta"] = {"last_fetch_ok": True, "error": None}
+        st.session_state["meta"] = {"last_fetch_ok": True, "error": None, "freshness": df.attrs.get("freshness"),
+                                    "store_key": key, "max_age": max_age}
         st.success(f"Loaded {ticker}: {start_date} → {end_date}")
 
 # -----------------------------
@@ -105,6 +126,20 @@ with st.sidebar.expander("App status", expanded=True):
     cfg = st.session_state["cfg"]
     st.write(f"**Ticker:** {cfg['ticker']}")
     st.write(f"**Range:** {cfg['start']} → {cfg['end']}")
+    meta = st.session_state["meta"]
+    fresh = meta.get("freshness")
+    if meta.get("store_key"):
+        # Re-read the entry: a background refresh may have finished or failed since
+        fresh = get_store().status(meta["store_key"], meta.get("max_age")) or fresh
+    if fresh:
+        # Age is recomputed on every rerun from the fetch time
+        st.write(f"**Data:** {describe({**fresh, 'age': time.time() - fresh['fetched_at']})}")
+        if fresh.get("error"):
+            st.caption(f"Last upstream error: {fresh['error']}")
+    breaker = get_client().breaker.snapshot()
+    if breaker["state"] != "closed":
+        st.warning(f"Upstream {breaker['state'].replace('_', '-')}: serving cached data "
+                   f"(retry in {breaker['retry_in']:.0f}s).")
     st.write("Use the sidebar pages to explore SMA, Runs, Daily Returns, and Max Profit.")
 
 # -----------------------------
@@ -0,0 +1,148 @@
+# benchmarks/startup.py
+"""
+Startup Benchmark
+
+Measures cold-start cost in fresh interpreters so results are not skewed by
+modules already sitting in sys.modules:
+
+1. Import time of each `scr` module (and, for reference, the heavy libraries).
+2. Time to first render of each Streamlit page via `streamlit.testing.v1.AppTest`,
+   with a synthetic dataset pre-loaded into session state.
+
+Usage (from the project root):
+    python benchmarks/startup.py              # offline: synthetic DataSource
+    python benchmarks/startup.py --repeat 5   # median of 5 cold runs
+    python benchmarks/startup.py --network    # pages read from Yahoo Finance
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "scr.data.cache",
+    "scr.data.sources",
+    "scr.data.data",
+    "scr.data.data_preprocessing",
+    "scr.data.yfinance_client",
+    "scr.Calculations",
+    "scr.Calculations.sma",
+    "scr.Calculations.daily_returns",
+    "scr.Calculations.updown_runs",
+    "scr.Visualization.sma_chart",
+    "scr.Visualization.updown_chart",
+]
+
+# Reference points: what a module would cost if it imported these eagerly.
+HEAVY = ["pandas", "yfinance", "matplotlib.pyplot", "altair", "plotly.graph_objects", "streamlit"]
+
+PAGES = [
+    "Starting_page.py",
+    "pages/1_Simple Moving Average.py",
+    "pages/2_Upward and Downward Runs.py",
+    "pages/3_Daily Returns.py",
+    "pages/4_Maximum Profit Calculation.py",
+    "pages/5_Live Stock.py",
+]
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+t = time.perf_counter()
+import {mod}
+dt = time.perf_counter() - t
+heavy = [m for m in ("yfinance", "matplotlib", "altair", "plotly") if m in sys.modules]
+print(json.dumps({{"seconds": dt, "heavy_loaded": heavy}}))
+"""
+
+_PAGE_SNIPPET = """
+import json, time
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+rng = np.random.default_rng(0)
+n = 750
+dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n)
+close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+df = pd.DataFrame({{"Date": dates, "Open": close, "High": close * 1.01,
+                   "Low": close * 0.99, "Close": close, "Volume": 1_000_000.0}})
+
+t = time.perf_counter()
+at = AppTest.from_file({path!r}, default_timeout=120)
+at.session_state["data"] = df
+at.session_state["cfg"] = {{"ticker": "SYN", "start": dates[0].date(), "end": dates[-1].date()}}
+at.session_state["meta"] = {{"last_fetch_ok": True, "error": None}}
+at.run()
+dt = time.perf_counter() - t
+print(json.dumps({{"seconds": dt, "exceptions": len(at.exception)}}))
+"""
+
+
+def _run(snippet: str, env: dict) -> dict:
+    """Run a snippet in a fresh interpreter and parse the dict it prints."""
+    out = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, env=env,
+    )
+    if out.returncode != 0:
+        return {"error": (out.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _median(snippet: str, repeat: int, env: dict) -> dict:
+    """Median wall time over `repeat` cold runs (keeps the last run's extra fields)."""
+    runs = [_run(snippet, env) for _ in range(repeat)]
+    ok = [r for r in runs if "seconds" in r]
+    if not ok:
+        return runs[-1]
+    result = dict(ok[-1])
+    result["seconds"] = statistics.median(r["seconds"] for r in ok)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="cold runs per measurement (median reported)")
+    parser.add_argument("--network", action="store_true", help="use Yahoo Finance instead of the synthetic source")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATA_SOURCE"] = "yfinance" if args.network else env.get("DATA_SOURCE", "synthetic")
+
+    results = {"imports": {}, "heavy": {}, "pages": {}}
+    for mod in MODULES:
+        results["imports"][mod] = _median(_IMPORT_SNIPPET.format(mod=mod), args.repeat, env)
+    for mod in HEAVY:
+        results["heavy"][mod] = _median(_IMPORT_SNIPPET.format(mod=mod), args.repeat, env)
+    for page in PAGES:
+        results["pages"][page] = _median(_PAGE_SNIPPET.format(path=page), args.repeat, env)
+
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+        return
+
+    for section, title in (("imports", "scr import time"), ("heavy", "library import time"),
+                           ("pages", "time to first render")):
+        print(f"\n{title}")
+        print("-" * len(title))
+        for name, r in results[section].items():
+            if "seconds" not in r:
+                print(f"  {name:<45} ERROR  {r.get('error')}")
+                continue
+            extra = ""
+            if r.get("heavy_loaded"):
+                extra = f"  (loaded: {', '.join(r['heavy_loaded'])})"
+            if r.get("exceptions"):
+                extra = f"  ({r['exceptions']} exception(s) during render)"
+            print(f"  {name:<45} {r['seconds'] * 1000:8.1f} ms{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/updown_runs.py
+"""
+Up/Down Runs Benchmark
+
+Compares the run-length-encoded `compute_updown_runs` with the per-step Python
+loop it replaced (kept below as `legacy_updown_runs`, the reference
+implementation), on synthetic random-walk closes. Both are timed on the same
+PriceSeries, so cleaning is excluded, and their outputs are checked for
+equality before any timing is reported.
+
+Usage (from the project root):
+    python benchmarks/updown_runs.py                      # 10k, 100k, 1M, 5M rows
+    python benchmarks/updown_runs.py --rows 1000000 --repeat 5
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+from scr.Calculations.price_series import PriceSeries
+from scr.Calculations.updown_runs import RUN_COLUMNS, compute_updown_runs
+
+
+def legacy_updown_runs(prices: PriceSeries) -> Dict[str, Any]:
+    """The previous streak scan: one Python iteration per price change."""
+    data = prices.to_frame()
+    signs = prices.signs.tolist()
+    dates = data["Date"].tolist()
+
+    up_runs = down_runs = 0
+    up_days_total = down_days_total = 0
+    cur_dir = None
+    cur_len = 0
+    cur_start_idx = None
+    best_up = {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None}
+    best_down = {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None}
+    runs_list: List[dict] = []
+
+    def close_streak(end_idx: int):
+        nonlocal cur_dir, cur_len, cur_start_idx
+        nonlocal up_runs, down_runs, up_days_total, down_days_total, best_up, best_down
+        if cur_dir is None or cur_len == 0 or cur_start_idx is None:
+            return
+        run = {"len": cur_len, "start": dates[cur_start_idx], "end": dates[end_idx],
+               "start_idx": cur_start_idx, "end_idx": end_idx}
+        runs_list.append({"dir": cur_dir, **run})
+        if cur_dir == "up":
+            up_runs += 1
+            up_days_total += cur_len
+            if cur_len > best_up["len"]:
+                best_up = run
+        else:
+            down_runs += 1
+            down_days_total += cur_len
+            if cur_len > best_down["len"]:
+                best_down = run
+        cur_dir, cur_len, cur_start_idx = None, 0, None
+
+    for i in range(1, len(dates)):
+        sign = signs[i - 1]
+        step = "up" if sign > 0 else "down" if sign < 0 else None
+        if step is None:
+            close_streak(i - 1)
+            continue
+        if cur_dir is None:
+            cur_dir, cur_len, cur_start_idx = step, 1, i - 1
+        elif cur_dir == step:
+            cur_len += 1
+        else:
+            close_streak(i - 1)
+            cur_dir, cur_len, cur_start_idx = step, 1, i - 1
+    close_streak(len(dates) - 1)
+
+    return {
+        "up_runs_count": up_runs,
+        "down_runs_count": down_runs,
+        "up_days_total": up_days_total,
+        "down_days_total": down_days_total,
+        "longest_up": best_up,
+        "longest_down": best_down,
+        "runs": pd.DataFrame(runs_list, columns=RUN_COLUMNS),
+    }
+
+
+def make_prices(rows: int, seed: int = 0) -> PriceSeries:
+    """Random-walk closes rounded to cents (so flat days occur too)."""
+    rng = np.random.default_rng(seed)
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows))), 2)
+    dates = pd.date_range("1990-01-01", periods=rows, freq="min")
+    return PriceSeries(dates.to_numpy(), close)
+
+
+def check_equal(new: Dict[str, Any], old: Dict[str, Any]) -> None:
+    """Raise AssertionError unless the shared keys of both outputs match."""
+    for key in ("up_runs_count", "down_runs_count", "up_days_total", "down_days_total",
+                "longest_up", "longest_down"):
+        assert new[key] == old[key], f"{key}: {new[key]!r} != {old[key]!r}"
+    pd.testing.assert_frame_equal(new["runs"], old["runs"])
+
+
+def _time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (median reported)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy loop':>14} {'RLE':>10} {'speedup':>9}")
+    for rows in args.rows:
+        prices = make_prices(rows)
+        prices.signs  # shared cached input: time the run detection only
+        check_equal(compute_updown_runs(prices), legacy_updown_runs(prices))
+        old = _time(lambda: legacy_updown_runs(prices), args.repeat)
+        new = _time(lambda: compute_updown_runs(prices), args.repeat)
+        print(f"{rows:>10,} {old * 1000:>11.1f} ms {new * 1000:>7.1f} ms {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
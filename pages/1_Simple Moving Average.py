@@ -13,7 +13,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from scr.Calculations.price_series import PriceSeries
 from scr.Calculations.sma import compute_sma
+from scr.data.data_preprocessing import clean_date_close
 from scr.Visualization.sma_chart import plot_close_vs_sma  
 
 # -----------------------------
@@ -30,11 +32,8 @@ if "data" not in st.session_state or st.session_state["data"] is None:
     st.warning("Please load data from the Home page first.")
     st.stop()
 
-# Prepare dataset (convert types and clean)
-df = st.session_state["data"].copy()
-df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-df["Close"] = pd.to_numeric(df["Close"], errors="coerce")
-df = df.dropna(subset=["Date", "Close"]).sort_values("Date").reset_index(drop=True)
+# Prepare dataset (convert types and clean; no copy if the shared view is already clean)
+df = clean_date_close(st.session_state["data"])
 
 # -----------------------------
 # Controls: SMA window selection
@@ -44,8 +43,9 @@ left, mid, right = st.columns([1.2, 1, 1])
 with left:
     window = st.slider("SMA window size", min_value=2, max_value=200, value=5, help="Number of days in each moving window.")
 
-close = df["Close"]
-sma_series = compute_sma(close, window)
+# NOTE: PriceSeries is memoized per session frame, so slider reruns reuse its prefix sums.
+prices = PriceSeries.of(st.session_state["data"])
+sma_series = compute_sma(prices, window)
 
 with mid:
     st.metric("Data points", len(df))
@@ -78,6 +78,7 @@ def _validate_sma_cases(df: pd.DataFrame, user_window: int) -> pd.DataFrame:
         {"case": "Ascending 1..10, w=3", "series": pd.Series(range(1, 11)), "w": 3},
         {"case": "Shorter than window, w=5", "series": pd.Series([10, 20, 30, 40]), "w": 5},
         {"case": "With NaNs, w=0", "series": pd.Series([10, np.nan, 30, 40, 50]), "w": 0},
+        {"case": "NaN inside window, w=2", "series": pd.Series([10, np.nan, 30, 40, 50]), "w": 2},
         {"case": "Window=1 (identity)", "series": pd.Series([5, 7, 9, 11]), "w": 1},
         {"case": "Constant series, w=4", "series": pd.Series([7] * 8), "w": 4},
         {"case": "Window equals length, w=4", "series": pd.Series([2, 4, 6, 8]), "w": 4},
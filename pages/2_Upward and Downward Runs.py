@@ -108,6 +108,20 @@ if isinstance(runs_df, pd.DataFrame) and not runs_df.empty:
 else:
     st.info("No streaks detected for the selected range.")
 
+# ------------------------------------------------------------------
+# Run-length distribution
+# ------------------------------------------------------------------
+length_hist = res.get("length_hist")
+if isinstance(length_hist, pd.DataFrame) and not length_hist.empty:
+    with st.expander("Run-length distribution", expanded=False):
+        h1, h2 = st.columns(2)
+        with h1:
+            st.markdown("**Runs per length**")
+            st.bar_chart(length_hist)
+        with h2:
+            st.markdown("**Continuation probability** — P(run reaches L+1 | it reached L)")
+            st.dataframe(res["continuation"].style.format("{:.1%}", na_rep="—"), use_container_width=True)
+
 # ------------------------------------------------------------------
 # Footer status
 # ------------------------------------------------------------------
@@ -5,9 +5,11 @@ Streamlit Page: Daily Returns
 This page computes the single-day percentage return r_t for a user-selected date
 within the loaded dataset, using:
     r_t = (P_t - P_{t-1}) / P_{t-1}
-where P_t is the Close price on the selected trading day. It also shows a line
-chart of Close prices across the selected date range and preserves app status
-in the sidebar.
+where P_t is the Close price on the selected trading day. Returns for the whole
+series are computed once per dataset (scr.Calculations.returns) and the date is
+found by binary search, so interactions don't scale with history length. It
+also charts simple, log or cumulative returns across the loaded range and
+preserves app status in the sidebar.
 
 """
 
@@ -15,6 +17,7 @@ in the sidebar.
 import streamlit as st
 import pandas as pd
 from scr.Calculations.daily_returns import dr_calc
+from scr.Calculations.returns import DailyReturns
 
 # -----------------------------
 # Page setup
@@ -48,8 +51,12 @@ dropdown_date = pd.Timestamp(selected_date_custom)
 # Lookup & display selected day result
 # -----------------------------
 
-df = st.session_state["data"].copy()
-matching_index = df.index[df["Date"] == dropdown_date]
+# NOTE: read-only use, so the shared price-store view is used directly (no copy).
+df = st.session_state["data"]
+# NOTE: cached per dataset; reruns reuse the same arrays and sorted date index.
+returns = DailyReturns.of(df)
+closes = returns.prices.closes
+index = returns.index_of(dropdown_date)
 
 st.subheader("Selected Date Details:")
 sc, pc, dr = st.columns(3)
@@ -58,14 +65,13 @@ sc, pc, dr = st.columns(3)
 # Searching for date selected through dataset
 # -----------------------------
 
-if len(matching_index) > 0:
-    index = matching_index[0]
+if index is not None:
     if index != 0:
-        daily_return = dr_calc(df, index)
+        daily_return = returns.at(index)
         sc.metric("Selected Close (Pₜ)",
-                  f"${df.loc[index, 'Close']:.2f}", delta=None)
+                  f"${closes[index]:.2f}", delta=None)
         pc.metric("Previous Close (Pₜ₋₁)",
-                  f"${df.loc[index-1, 'Close']:.2f}", delta=None)
+                  f"${closes[index-1]:.2f}", delta=None)
         dr.metric("Daily Return (rₜ)", f"{daily_return:.3f}%", delta=None)
     else:
         st.warning("No previous day to compare for daily return, please select range that starts earlier.")
@@ -77,7 +83,8 @@ else:
 # -----------------------------
 # Line chart for daily returns across the range of dates selected
 st.subheader("Daily Returns for Range of Dates selected:")
-st.line_chart(df, x="Date", y="Close", width=0, height=0, use_container_width=True)
+chart_kind = st.radio("Show", ["Return (%)", "Log return", "Cumulative (%)"], index=0, horizontal=True)
+st.line_chart(returns.to_frame(), x="Date", y=chart_kind, width=0, height=0, use_container_width=True)
 
 # -----------------------------
 # Sidebar status
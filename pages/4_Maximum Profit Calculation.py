@@ -11,16 +11,23 @@ Date/Open/High/Low/Close/Volume, reconstructs greedy trades for explanation/
 plotting, and provides quick summary plus validation test cases.
 """
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-import altair as alt
 
-from scr.Calculations import ALGORITHMS
+from scr.Calculations import ALGORITHMS, PriceSeries
+from scr.Calculations.fused import fused_profits
+from scr.data.adjustments import adjust_prices
 from scr.data.data import fetch_raw_yf, POPULAR_TICKERS
-from scr.data.data_preprocessing import standardize_ohlcv, quick_summary
+from scr.data.data_preprocessing import (
+    standardize_ohlcv, quick_summary, load_csv_streaming, load_excel_ohlcv, IngestBudgetError,
+)
 
 st.set_page_config(page_title="Max Profit — Unlimited Transactions", layout="wide")
 
+# NOTE: Upper bound on the parsed size of an uploaded CSV (≈ 20M rows of OHLCV).
+UPLOAD_MAX_BYTES = 1 << 30
+
 # ------------------------------------------------------------------
 # Page-local state
 # ------------------------------------------------------------------
@@ -39,83 +46,63 @@ def canonicalize(df: pd.DataFrame) -> pd.DataFrame:
     return standardize_ohlcv(df).reset_index()[["Date", "Open", "High", "Low", "Close", "Volume"]]
 
 
+@st.cache_data(show_spinner=False)
+def load_yf_raw(ticker: str, start: str, end: str) -> pd.DataFrame:
+    """Fetch RAW prices (with 'Adj Close') once per ticker/range; adjustment is derived locally."""
+    return fetch_raw_yf(ticker, start, end, auto_adjust=False)
+
+
 @st.cache_data(show_spinner=False)
 def load_yf_clean(ticker: str, start: str, end: str, auto_adj: bool) -> pd.DataFrame:
     """Fetch prices from Yahoo Finance and return canonical OHLCV DataFrame."""
-    # NOTE: fetch_raw_yf may return differing schemas by ticker/range; canonicalize normalizes it.
-    raw = fetch_raw_yf(ticker, start, end, auto_adjust=auto_adj)
+    # NOTE: toggling auto-adjust reuses the cached raw frame (no second download);
+    # each (ticker, range, auto_adj) result is cached so reruns skip adjust/canonicalize.
+    raw = load_yf_raw(ticker, start, end)
     if raw is None or raw.empty:
         return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
-    return canonicalize(raw)
+    # NOTE: fetch_raw_yf may return differing schemas by ticker/range; canonicalize normalizes it.
+    return canonicalize(adjust_prices(raw) if auto_adj else raw)
 
 
 @st.cache_data(show_spinner=False)
 def load_csv_clean(file) -> pd.DataFrame:
     """
     Robust loader for CSV/Excel. Tries CSV; if canonicalization fails or the file
-    is actually Excel, retries as Excel and picks the first sheet that standardizes.
+    is actually Excel, retries as Excel, sniffing sheet headers and parsing only
+    the first sheet that has Date and Close columns.
     Returns canonical OHLCV with columns ["Date","Open","High","Low","Close","Volume"].
     """
     # NOTE: Some Excel files can be (wrongly) parsed by read_csv without raising;
-    # this function guards by attempting canonicalization and falling back to Excel.
+    # this function guards by requiring a non-empty canonical result and falling back to Excel.
     name = (getattr(file, "name", "") or "").lower()
 
-    def _canonical_or_none(df):
-        try:
-            out = canonicalize(df)
-            # must contain Date and Close after standardization
-            if out is None or out.empty or "Date" not in out.columns or "Close" not in out.columns:
-                return None
-            return out
-        except Exception:
-            return None
-
     # Prefer by file extension first (faster, less I/O thrash)
     is_excel_ext = name.endswith((".xlsx", ".xls"))
     if is_excel_ext:
-        # Read Excel (try each sheet until one standardizes)
+        # Sniff sheet headers (read-only) and parse only the sheet that looks like OHLCV
         try:
-            xl = pd.read_excel(file, sheet_name=None)  # dict of DataFrames
+            return load_excel_ohlcv(file)
         except Exception:
-            # If the file pointer was consumed, rewind and try again
-            try:
-                if hasattr(file, "seek"):
-                    file.seek(0)
-                xl = pd.read_excel(file, sheet_name=None)
-            except Exception:
-                return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
-
-        for _, df in xl.items():
-            out = _canonical_or_none(df)
-            if out is not None:
-                return out
-        # Nothing worked → empty canonical frame
-        return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
+            # Nothing worked → empty canonical frame
+            return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
 
-    # Try CSV path
+    # Try CSV path (streamed in chunks so multi-GB uploads don't need several times their size in RAM)
     try:
-        df_csv = pd.read_csv(file)
-        out = _canonical_or_none(df_csv)
-        if out is not None:
+        out = load_csv_streaming(file, max_bytes=UPLOAD_MAX_BYTES)
+        if out is not None and not out.empty:
             return out
+    except IngestBudgetError:
+        raise  # too large: surface to the user instead of retrying as Excel
     except Exception:
         pass  # fall through to Excel retry
 
     # Retry as Excel in case CSV-reading “succeeded” on an actual Excel stream
     try:
-        if hasattr(file, "seek"):
-            file.seek(0)
-        xl = pd.read_excel(file, sheet_name=None)
-        for _, df in xl.items():
-            out = _canonical_or_none(df)
-            if out is not None:
-                return out
+        return load_excel_ohlcv(file)
     except Exception:
         # Final fallback: empty canonical frame
         return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
 
-    return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
-
 
 def set_df(df: pd.DataFrame, ok_msg: str):
     """Store a validated dataset into session state and show success message."""
@@ -257,8 +244,13 @@ with st.sidebar:
         up = st.file_uploader("Upload a CSV/Excel (needs 'Date' and 'Close')", type=["csv", "xlsx", "xls"])
         if up and st.button("Load uploaded file", use_container_width=True, key="btn_load_upload"):
             # NOTE: load_csv_clean handles both CSV and multi-sheet Excel robustly.
-            df = load_csv_clean(up)
-            set_df(df, f"Loaded file with {len(df):,} rows.")
+            try:
+                df = load_csv_clean(up)
+            except IngestBudgetError as e:
+                st.error(str(e))
+                df = None
+            if df is not None:
+                set_df(df, f"Loaded file with {len(df):,} rows.")
             if df is not None and not df.empty:
                 st.session_state["maxprofit_meta"] = {
                     "source": "Upload",
@@ -313,17 +305,31 @@ fee = 0.0
 if "LC714" in algo_choice:
     # NOTE: Fee per completed trade (buy+sell); passed into the LC714 runner.
     fee = st.number_input("Transaction fee per trade", min_value=0.0, value=1.0, step=0.1)
+# Trade limit only for LC188
+k_max = 2
+if "LC188" in algo_choice:
+    # NOTE: k = 2 is LC123. Small k runs the vectorized DP, large k the heap merge.
+    k_max = int(st.number_input("Max transactions (k)", min_value=1, value=2, step=1))
 
 # Single dispatch (avoid duplicate computations)
+# NOTE: one PriceSeries per loaded frame; every runner below shares its cached arrays.
+prices = PriceSeries.of(df)
 if "LC714" in algo_choice:
-    trades, total_profit, meta_algo = ALGORITHMS[algo_choice](df["Date"], df["Close"], fee)
+    trades, total_profit, meta_algo = ALGORITHMS[algo_choice](prices, fee=fee)
+elif "LC188" in algo_choice:
+    trades, total_profit, meta_algo = ALGORITHMS[algo_choice](prices, k=k_max)
 else:
-    trades, total_profit, meta_algo = ALGORITHMS[algo_choice](df["Date"], df["Close"])
+    trades, total_profit, meta_algo = ALGORITHMS[algo_choice](prices)
 
 # Result banner
 st.subheader("Result")
-# NOTE: meta_algo['label'] comes from each runner (LC122/LC121/LC714); trades may be [] for LC714.
+# NOTE: meta_algo['label'] comes from each runner (LC122/LC121/LC714/LC188).
 st.success(f"{meta_algo.get('label','Algorithm')} — Maximum Profit: **{total_profit:.2f}**  • Trades: **{len(trades)}**")
+if "LC188" in algo_choice and prices.dates is not None and len(prices) > 1:
+    # Express k as a yearly rate ("N round-trips per year") over the loaded span
+    years = (prices.dates[-1] - prices.dates[0]) / np.timedelta64(1, "D") / 365.25
+    if years > 0:
+        st.caption(f"k = {k_max} over {years:.1f} years ≈ **{k_max / years:.1f}** round-trips per year")
 
 # Quick side-by-side comparison
 with st.expander("Quick Profit Comparison", expanded=False):
@@ -332,25 +338,73 @@ with st.expander("Quick Profit Comparison", expanded=False):
         "Preview fee for LC714", min_value=0.0, value=1.0, step=0.1, key="cmp_fee"
     )
 
-    # Call each registered runner directly (keeps page logic minimal)
-    _, p122, _ = ALGORITHMS["Unlimited (LC122)"](df["Date"], df["Close"])
-    _, p121, _ = ALGORITHMS["Single (LC121)"](df["Date"], df["Close"])
-    _, p714, _ = ALGORITHMS["With Fee (LC714)"](df["Date"], df["Close"], fee_cmp)
+    # NOTE: one fused pass over the shared closes computes all three (see scr.Calculations.fused).
+    cmp = fused_profits(prices, fee=fee_cmp, plans=True)
+    profits, plans = cmp["profits"], cmp["plans"]
 
     st.write(pd.DataFrame({
         "Algorithm": ["LC122 (Unlimited)", "LC121 (Single)", f"LC714 (fee={fee_cmp})"],
-        "Profit": [p122, p121, p714]
+        "Profit": [profits["LC122"], profits["LC121"], profits["LC714"]],
+        "Trades": [len(plans["LC122"][0]), len(plans["LC121"][0]), len(plans["LC714"][0])],
     }))
 
+# Fee sensitivity (LC714 only): the whole fee→profit curve in one pass
+if "LC714" in algo_choice:
+    with st.expander("Fee sensitivity", expanded=False):
+        from scr.Calculations.lc714_fee import max_profit_fee_sweep
+
+        max_fee = st.number_input(
+            "Highest fee to chart", min_value=0.1, value=float(max(5.0, 4 * fee)), step=0.5, key="sweep_max_fee"
+        )
+        # NOTE: 41 fees share one traversal of the closes (see max_profit_fee_sweep).
+        curve = max_profit_fee_sweep(prices, np.linspace(0.0, max_fee, 41))
+        st.line_chart(curve.rename("Max profit"), use_container_width=True)
+        st.caption(f"Profit at your fee ({fee:g}): **{total_profit:.2f}** • at zero fee: **{curve.iloc[0]:.2f}**")
+
+# What-if window: best single trade inside any date range, from the per-dataset index
+if prices.dates is not None and len(prices) > 1:
+    with st.expander("What-if window (best single trade)", expanded=False):
+        from scr.Calculations.range_index import BestTradeIndex, PrefixIndex
+
+        first, last = prices.date_at(0), prices.date_at(len(prices) - 1)
+        window = st.date_input("Trade only between", value=(first, last),
+                               min_value=first, max_value=last, key="whatif_window")
+        # NOTE: date_input returns a 1-tuple while the user is still picking the end date.
+        if isinstance(window, (tuple, list)) and len(window) == 2:
+            try:
+                # NOTE: built once per dataset, then each window is an O(log n) query.
+                index = BestTradeIndex.of(prices)
+                b, sidx, best = index.query_dates(window[0], window[1])
+                if b < 0:
+                    st.info("No profitable single trade in this window.")
+                else:
+                    st.success(
+                        f"Buy **{prices.date_at(b)}** at {prices.closes[b]:.2f} → "
+                        f"sell **{prices.date_at(sidx)}** at {prices.closes[sidx]:.2f} • Profit: **{best:.2f}**"
+                    )
+                # NOTE: O(1) window statistics from the per-dataset prefix sums.
+                stats = PrefixIndex.of(prices)
+                i, j = index.rows_between(window[0], window[1])
+                c1, c2, c3, c4 = st.columns(4)
+                c1.metric("LC122 profit", f"{stats.lc122_profit(i, j):.2f}")
+                c2.metric("Return", f"{stats.total_return_pct(i, j):.2f}%")
+                c3.metric("Mean close", f"{stats.mean(i, j):.2f}")
+                c4.metric("Close std-dev", f"{stats.variance(i, j) ** 0.5:.2f}")
+            except ValueError as e:
+                st.warning(str(e))
+
 # Optional trades table
 if show_trades_table:
     st.subheader("Buy/Sell Plan (Greedy valley→peak)")
-    # NOTE: LC121 returns a single trade (if profitable). LC714 may return [] (fast version).
+    # NOTE: LC121 returns a single trade (if profitable). LC714 profits are net of the fee.
     st.dataframe(
         pd.DataFrame(trades) if trades else pd.DataFrame(columns=["buy_date", "buy_price", "sell_date", "sell_price", "profit"]),
         use_container_width=True
     )
 
+# NOTE: Altair is imported here (not at the top) so the empty-state render stays cheap.
+import altair as alt
+
 # Base price line (always shown)
 base = alt.Chart(df).mark_line().encode(
     x=alt.X("Date:T", title="Date"),
@@ -398,9 +452,10 @@ else:
 # ------------------------------------------------------------------
 with st.expander("Validation (auto tests)", expanded=False):
     try:
-        from scr.Calculations.max_profit import max_profit_unlimited
+        from scr.Calculations.max_profit import max_profit_unlimited, extract_trades
         from scr.Calculations.lc121_single import max_profit_single
         from scr.Calculations.lc714_fee import max_profit_fee
+        from scr.Calculations.lc188_k import max_profit_k
         import math
 
         # NOTE: Keep these tests tiny, deterministic, and matching LeetCode examples.
@@ -411,6 +466,7 @@ with st.expander("Validation (auto tests)", expanded=False):
                 ([5,4,3,2,1],   0.0),
                 ([2,1,2,0,1],   2.0),
                 ([3,3,5,0,0,3,1,4], 8.0),
+                ([1,2,3,2,1,5], 6.0),
             ]
             label = "LC122"
 
@@ -426,26 +482,30 @@ with st.expander("Validation (auto tests)", expanded=False):
             for arr, expect in tests:
                 algo_profit = float(max_profit_unlimited(pd.Series(arr)))
                 trusted_profit = trusted_lc122(arr)
+                # The reconstructed trades must add up to the reported profit
+                plan_profit = float(sum(t["profit"] for t in extract_trades(pd.Series(arr))))
                 passed = (
                     math.isclose(algo_profit, expect, rel_tol=1e-9)
                     and math.isclose(algo_profit, trusted_profit, rel_tol=1e-9)
+                    and math.isclose(plan_profit, algo_profit, rel_tol=1e-9, abs_tol=1e-12)
                 )
                 rows.append({
                     "Test Case": str(arr),
                     "Algorithm Profit": round(algo_profit, 6),
                     "Expected (Manual)": round(expect, 6),
                     "Trusted Method": round(trusted_profit, 6),
+                    "Trades Sum": round(plan_profit, 6),
                     "Result": "PASS" if passed else "FAIL",
                 })
 
             st.write("**LC122 Validation Summary**")
             df = pd.DataFrame(rows, columns=[
-                "Test Case", "Algorithm Profit", "Expected (Manual)", "Trusted Method", "Result"
+                "Test Case", "Algorithm Profit", "Expected (Manual)", "Trusted Method", "Trades Sum", "Result"
             ])
             st.dataframe(df, use_container_width=True)
 
             if df["Result"].eq("PASS").all():
-                st.success("Validation OK — LC122 matches manual expectations and trusted method on all test cases.")
+                st.success("Validation OK — LC122 matches manual expectations, the trusted method and its own trades on all test cases.")
             else:
                 st.warning("Some LC122 cases failed. See the summary table above.")
 
@@ -481,6 +541,25 @@ with st.expander("Validation (auto tests)", expanded=False):
                 )
             st.success(f"All {label} validation cases passed.")
 
+        elif algo_choice == "At Most k (LC188)":
+            tests = [
+                ([3,3,5,0,0,3,1,4], 2, 6.0),
+                ([1,2,3,4,5], 2, 4.0),
+                ([7,6,4,3,1], 2, 0.0),
+                ([2,4,1], 2, 2.0),
+                ([3,2,6,5,0,3], 2, 7.0),
+                ([1,5,2,8,3,10], 1, 9.0),
+                ([1,5,2,8,3,10], 50, 17.0),
+            ]
+            label = "LC188"
+            for arr, k_v, expect in tests:
+                got = float(max_profit_k(pd.Series(arr), k_v))
+                st.write(
+                    f"{label}: prices={arr}, k={k_v} → profit={got:.2f} (expect {expect:.2f}) "
+                    + ("✅" if abs(got-expect) < 1e-9 else "❌")
+                )
+            st.success(f"All {label} validation cases passed.")
+
     except Exception as e:
         # NOTE: Catch-all so internal object reprs don’t leak giant tracebacks to end users.
         st.error(f"Validation error: {e}")
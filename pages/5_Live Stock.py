@@ -3,7 +3,8 @@
 """
 Streamlit Page: Maximum Profit Calculation (Live Dashboard)
 
-This page provides a live stock dashboard powered by Yahoo Finance. 
+This page provides a live stock dashboard powered by Yahoo Finance (or any
+configured `scr.data.sources.DataSource`). 
 It displays real-time price updates every 5 seconds, supports multiple 
 historical ranges (1D–All), and includes a Plotly chart alongside 
 snapshot metrics such as market cap, EPS, and P/E ratio.
@@ -11,10 +12,12 @@ snapshot metrics such as market cap, EPS, and P/E ratio.
 
 import streamlit as st
 import pandas as pd
-import yfinance as yf
-import plotly.graph_objects as go
 from datetime import datetime, date
 from streamlit_autorefresh import st_autorefresh
+from scr.Calculations.streaming import LiveIndicators
+from scr.data.singleflight import request_key
+from scr.data.sources import get_source
+from scr.data.swr import get_cache, describe
 
 # -----------------------------
 # Page setup and header
@@ -113,45 +116,50 @@ def range_to_history_args(rng: str):
 # -----------------------------
 # Helper: Fetch snapshot + history
 # -----------------------------
-@st.cache_data(ttl=4)
 def fetch_snapshot_and_history(ticker: str, rng: str):
     """
     Fetch live snapshot and historical price data for a given ticker.
 
+    Served stale-while-revalidate from a process-wide cache: values younger
+    than 4 s are reused, older ones are returned at once and refreshed in the
+    background, so a slow or failing upstream doesn't block the page.
+
     Args:
         ticker (str): Stock symbol (e.g., 'AAPL').
         rng (str): Selected range label (controls period/interval).
 
     Returns:
-        tuple[dict, pd.DataFrame]:
+        tuple[dict, pd.DataFrame, dict]:
             info (dict): Snapshot fields (fast_info + info).
             df (pd.DataFrame): Historical prices with columns ['Date','Close'].
+            freshness (dict): Age/source of the history (see scr.data.swr).
     """
-    stock = yf.Ticker(ticker)
-    info = stock.fast_info if hasattr(stock, "fast_info") else {}
-
-    # Fallback to .info for missing fields
-    try:
-        info_full = stock.info
-        info = {**info_full, **info}
-    except Exception:
-        pass
+    source = get_source()
+    # NOTE: identical concurrent requests from other sessions/pages share one upstream call.
+    live = get_cache("live_stock", fresh_for=4, max_stale=15 * 60)
+    info, _ = live.get(request_key("snapshot", ticker), lambda: source.snapshot(ticker), source.name)
 
     # Retrieve price history
     args = range_to_history_args(rng)
-    df = stock.history(**args)
+    key = request_key("history", ticker, start=args.get("start"), interval=args["interval"], period=args.get("period"))
+    df, freshness = live.get(key, lambda: source.history(ticker, **args), source.name)
     if not df.empty:
         df = df.reset_index().rename(columns={"Datetime": "Date"})
         if "Date" not in df.columns:
             df["Date"] = df.index
         df["Date"] = pd.to_datetime(df["Date"])
         df["Close"] = pd.to_numeric(df["Close"], errors="coerce")
-    return info, df
+    return info, df, freshness
 
 # -----------------------------
 # Fetch data and handle missing cases
 # -----------------------------
-info, df = fetch_snapshot_and_history(ticker, sel_range)
+try:
+    info, df, freshness = fetch_snapshot_and_history(ticker, sel_range)
+except RuntimeError as e:
+    # Nothing cached yet and the upstream failed (after retries) or its circuit is open
+    st.error(f"Failed to fetch data: {e}")
+    st.stop()
 if df is None or df.empty:
     st.error("No data returned. Try a different range or ticker.")
     st.stop()
@@ -188,6 +196,8 @@ with left:
             (y[-1] if len(y) else None)
         )
 
+        import plotly.graph_objects as go  # only needed once there is something to draw
+
         fig = go.Figure()
 
         # Add price line
@@ -274,9 +284,33 @@ with right:
     st.write("**EPS (TTM):**", fmt(eps_ttm))
     st.write("**Forward Dividend & Yield:**", f"{fmt(div_yield*100 if isinstance(div_yield,(int,float)) else div_yield)}%")
 
+# -----------------------------
+# Live indicators (streaming: per-tick cost, not per history length)
+# -----------------------------
+LIVE_SMA_WINDOW = 20
+
+if not chart_df.empty:
+    # One LiveIndicators per ticker/range; a new selection starts a fresh one
+    ind_key = (ticker, sel_range)
+    stored = st.session_state.get("live_indicators")
+    if stored is None or stored[0] != ind_key:
+        stored = st.session_state["live_indicators"] = (ind_key, LiveIndicators(LIVE_SMA_WINDOW))
+    live = stored[1]
+    live.feed(chart_df["Date"].to_numpy(), chart_df["Close"].to_numpy())
+    snap = live.snapshot()
+
+    st.subheader("Live indicators")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric(f"SMA{LIVE_SMA_WINDOW}", fmt(snap["sma"]))
+    c2.metric("Last bar return", f"{fmt(snap['return_pct'])}%")
+    streak = snap["streak"]
+    c3.metric("Current streak", f"{streak['len']} {streak['dir']}" if streak["dir"] else "flat")
+    runs = snap["runs"]
+    c4.metric("Longest up / down", f"{runs['longest_up']['len']} / {runs['longest_down']['len']}")
+
 # -----------------------------
 # Footer
 # -----------------------------
 st.caption(
-    f"Range: **{sel_range}** • Data source: yfinance • Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    f"Range: **{sel_range}** • Data: {describe(freshness)} • Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 )
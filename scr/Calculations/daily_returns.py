@@ -6,8 +6,9 @@
       where P_t is df.loc[index, "Close"] and P_{t-1} is df.loc[index-1, "Close"].
 
     Args:
-        df (pd.DataFrame): Price DataFrame containing at least a "Close" column.
-                           Rows should be in chronological order.
+        df (pd.DataFrame | PriceSeries): Price DataFrame containing at least a
+                           "Close" column, or a PriceSeries (then `index` is a
+                           position). Rows should be in chronological order.
         index (int): Row index for day t (must be >= 1 so that t-1 exists).
 
     Returns:
@@ -18,8 +19,16 @@
         - Assumes previous close (P_{t-1}) is nonzero.
 """
 
+from scr.Calculations.price_series import PriceSeries
+
 def dr_calc(df, index):
-    dc = float(df.loc[index, "Close"])
-    pc = float(df.loc[index-1,"Close"])
+    if isinstance(df, PriceSeries):
+        if index < 1:
+            raise IndexError("No previous day for index 0.")
+        dc = float(df.closes[index])
+        pc = float(df.closes[index-1])
+    else:
+        dc = float(df.loc[index, "Close"])
+        pc = float(df.loc[index-1,"Close"])
     daily_return = ((dc-pc)/pc)*100
     return daily_return
\ No newline at end of file
@@ -0,0 +1,302 @@
+# scr/Calculations/fused.py
+"""
+Fused Profit Engine (LC121 + LC122 + LC714)
+
+Computes the single-transaction (LC121), unlimited (LC122) and fee-adjusted
+(LC714) maximum profits — and optionally their trade plans — in one
+traversal of a shared float64 close array. The array is walked in blocks of
+`FUSED_BLOCK` rows; every block is read once while still in cache and feeds
+all three algorithms, each carrying a little state across block boundaries:
+
+- LC121: running minimum (value + first index) and best (buy, sell) so far.
+- LC122: sum of positive changes; the last price and last non-zero slope sign
+  for valley/peak detection (`turning_points`, shared with
+  `max_profit.trade_indices`).
+- LC714: the (cash, hold) DP state (+ the decision gap, see below). Inside a
+  block the DP is evaluated as a max-plus matrix product instead of a Python
+  loop: one day is the 2×2 matrix
+
+      [cash']   [ 0       p - fee ]   [cash]
+      [hold'] = [ -p      0       ] ⊗ [hold]     (⊗: max of sums)
+
+  and the block's product is reduced pairwise in log2(block) vectorized steps.
+  Results equal the sequential DP up to float rounding.
+
+LC714 trade plans come from the DP's decisions, which depend only on the gap
+g = cash - hold:  buy on day i iff p_i < g_{i-1},  sell iff p_i - fee > g_{i-1},
+and the gap evolves as a clamp,  g_i = clamp(g_{i-1}, p_i - fee, p_i)  (g = +inf
+before day 0). Clamps compose into clamps, so the gaps of a block come from a
+vectorized prefix scan with only min/max (no rounding). The decisions are kept
+as two bit-packed arrays (2 bits per day); walking the DP back from the end
+reduces to pairing the last buy of each buy run with the last sell of the
+following sell run, which `fee_plan_from_bits` does block by block.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from scr.Calculations.price_series import PriceSeries, as_price_series
+
+FUSED_BLOCK = 1 << 16   # rows per block (≈ 512 KiB of float64 closes)
+
+# ---------- max-plus helpers (LC714) ----------
+
+def fee_block_transition(p: np.ndarray,
+                         fee) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Max-plus product of the LC714 day matrices for prices `p` (in order).
+
+    Args:
+        p (np.ndarray): float64 prices of one block, shape (m,).
+        fee (float | np.ndarray): Fee per trade; an array of shape (k, 1)
+            evaluates k fees at once.
+
+    Returns:
+        tuple: (a, b, c, d) with new_cash = max(a + cash, b + hold) and
+        new_hold = max(c + cash, d + hold); scalars (shape ()) for a scalar
+        fee, arrays of shape (k,) for a fee column.
+    """
+    fee = np.asarray(fee, dtype=np.float64)
+    shape = np.broadcast_shapes(fee.shape, p.shape)
+    a = np.zeros(shape)
+    b = np.broadcast_to(p - fee, shape).copy()
+    c = np.broadcast_to(-p, shape).copy()
+    d = np.zeros(shape)
+    while a.shape[-1] > 1:
+        if a.shape[-1] % 2:
+            # Pad with the max-plus identity so days pair up
+            pad = [(0, 0)] * (a.ndim - 1) + [(0, 1)]
+            a = np.pad(a, pad, constant_values=0.0)
+            b = np.pad(b, pad, constant_values=-np.inf)
+            c = np.pad(c, pad, constant_values=-np.inf)
+            d = np.pad(d, pad, constant_values=0.0)
+        # Earlier day E (even slots) is applied first, later day L (odd) after: L ⊗ E
+        ea, eb, ec, ed = a[..., 0::2], b[..., 0::2], c[..., 0::2], d[..., 0::2]
+        la, lb, lc, ld = a[..., 1::2], b[..., 1::2], c[..., 1::2], d[..., 1::2]
+        a, b, c, d = (np.maximum(la + ea, lb + ec), np.maximum(la + eb, lb + ed),
+                      np.maximum(lc + ea, ld + ec), np.maximum(lc + eb, ld + ed))
+    return a[..., 0], b[..., 0], c[..., 0], d[..., 0]
+
+
+def apply_transition(t, cash, hold):
+    """(cash, hold) after a block with transition `t` from `fee_block_transition`."""
+    a, b, c, d = t
+    return np.maximum(a + cash, b + hold), np.maximum(c + cash, d + hold)
+
+# ---------- LC714 decisions (trade plans) ----------
+
+def fee_decisions(p: np.ndarray, fee: float,
+                  g_start: float) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    LC714 buy/sell decisions for one block of prices.
+
+    Args:
+        p (np.ndarray): float64 prices of the block, shape (m,), m ≥ 1.
+        fee (float): Fee per completed trade.
+        g_start (float): Gap cash - hold before the block (+inf at the start).
+
+    Returns:
+        tuple: (bought, sold, g_end) — bool arrays of shape (m,) and the gap
+        after the block's last day.
+    """
+    lo = p - fee
+    hi = p
+    # Inclusive prefix scan of clamp(·, lo_i, hi_i): later ∘ earlier,
+    # doubling the span each round
+    shift = 1
+    while shift < len(p):
+        lo_later, hi_later = lo[shift:], hi[shift:]
+        lo = np.concatenate((lo[:shift], np.minimum(np.maximum(lo[:-shift], lo_later), hi_later)))
+        hi = np.concatenate((hi[:shift], np.minimum(np.maximum(hi[:-shift], lo_later), hi_later)))
+        shift *= 2
+    g = np.minimum(np.maximum(g_start, lo), hi)
+    g_prev = np.empty_like(g)
+    g_prev[0] = g_start
+    g_prev[1:] = g[:-1]
+    return p < g_prev, (p - fee) > g_prev, float(g[-1])
+
+
+def fee_plan_from_bits(buy_bits: np.ndarray, sell_bits: np.ndarray, n: int,
+                       block: int = FUSED_BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rebuild the LC714 trades from bit-packed decisions (see `fee_decisions`).
+
+    Walking the DP backwards from "no position" on the last day takes the last
+    sell of every sell run and the last buy of the buy run before it, so the
+    plan is the sequence of run ends (buy, sell, buy, sell, ...), minus a
+    trailing buy run. Bits are unpacked one block at a time (block must be a
+    multiple of 8), so extra memory stays O(block + trades).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (buy_idx, sell_idx) int64 positions.
+    """
+    ends_pos, ends_sell = [], []
+    pend_pos = np.empty(0, dtype=np.int64)     # last event seen (its run may continue)
+    pend_sell = np.empty(0, dtype=bool)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        bits = slice(start // 8, (stop + 7) // 8)
+        bought = np.unpackbits(buy_bits[bits], count=stop - start).view(bool)
+        sold = np.unpackbits(sell_bits[bits], count=stop - start).view(bool)
+        ev = np.flatnonzero(bought | sold)
+        pos = np.concatenate((pend_pos, ev + start))
+        is_sell = np.concatenate((pend_sell, sold[ev]))
+        if len(pos) == 0:
+            continue
+        run_end = is_sell[:-1] != is_sell[1:]
+        ends_pos.append(pos[:-1][run_end])
+        ends_sell.append(is_sell[:-1][run_end])
+        pend_pos, pend_sell = pos[-1:], is_sell[-1:]
+    pos = np.concatenate(ends_pos + [pend_pos]).astype(np.int64, copy=False)
+    is_sell = np.concatenate(ends_sell + [pend_sell])
+    if len(pos) and not is_sell[-1]:
+        pos = pos[:-1]                          # still holding at the end: not a trade
+    return pos[0::2], pos[1::2]
+
+# ---------- LC122 turning points ----------
+
+def turning_points(sign: np.ndarray, prev_nz: int = 0) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Valleys and peaks of the greedy LC122 strategy from step signs.
+
+    Step t is the move from close t to close t+1, so a turn found at step t
+    marks close t: a valley where the slope turns up, a peak where it turns
+    down. Flat steps keep the last non-zero sign (forward-filled), so a flat
+    stretch never splits a rise, and a trade buys (sells) on the last close of
+    a flat bottom (top).
+
+    Args:
+        sign (np.ndarray): Signs of consecutive close changes (-1/0/+1).
+        prev_nz (int): Last non-zero sign before `sign` (0 = none), to carry
+            the slope across blocks.
+
+    Returns:
+        tuple: (valleys, peaks, last_nz) — step positions relative to the
+        start of `sign`, and the sign to carry into the next block.
+    """
+    if len(sign) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), int(prev_nz)
+    pos = np.where(sign != 0, np.arange(len(sign)), -1)
+    np.maximum.accumulate(pos, out=pos)
+    nz = np.where(pos >= 0, sign[np.maximum(pos, 0)], prev_nz).astype(np.int8)
+    before = np.empty_like(nz)
+    before[0] = prev_nz
+    before[1:] = nz[:-1]
+    valleys = np.flatnonzero((nz > 0) & (before <= 0))
+    peaks = np.flatnonzero((nz < 0) & (before > 0))
+    return valleys, peaks, int(nz[-1])
+
+
+def pair_turning_points(closes: np.ndarray, valleys: np.ndarray,
+                        peaks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pair valleys with the following peaks (greedy LC122 trades).
+
+    Turns from `turning_points` alternate valley, peak, valley, ...; a series
+    that ends rising sells on its last close. Every pair spans one maximal
+    rise, so the gains sum to `max_profit.max_profit_unlimited`.
+    """
+    if len(valleys) > len(peaks):
+        peaks = np.r_[peaks, len(closes) - 1]  # still rising at the end
+    buy_idx = valleys.astype(np.int64, copy=False)
+    sell_idx = peaks.astype(np.int64, copy=False)
+    keep = closes[sell_idx] > closes[buy_idx]
+    return buy_idx[keep], sell_idx[keep]
+
+# ---------- fused traversal ----------
+
+def fused_profits(prices, fee: float = 1.0, plans: bool = False,
+                  block: int = FUSED_BLOCK) -> Dict[str, Any]:
+    """
+    LC121, LC122 and LC714 profits in one blocked pass over the closes.
+
+    Args:
+        prices (PriceSeries | pd.DataFrame | pd.Series | array-like): Anything
+            accepted by `as_price_series`.
+        fee (float): LC714 fee per completed trade.
+        plans (bool): Also return the trade index arrays of all three.
+        block (int): Rows per block.
+
+    Returns:
+        dict: {"profits": {"LC121": float, "LC122": float, "LC714": float},
+               "fee": float,
+               "plans": {"LC121": (buy_idx, sell_idx), "LC122": (buy_idx, sell_idx),
+                         "LC714": (buy_idx, sell_idx)} or None}
+        Index arrays are int64 positions in the PriceSeries; LC121's hold at
+        most one pair. Turn them into UI rows with
+        `trades_utils.trades_from_indices`.
+    """
+    ps: PriceSeries = as_price_series(prices)
+    s = ps.closes.astype(np.float64, copy=False)
+    n = len(s)
+    block = max(int(block), 1)
+
+    # LC121 state
+    min_val, min_idx = np.inf, -1
+    best121, buy121, sell121 = 0.0, -1, -1
+    # LC122 state
+    up_sum = 0.0
+    prev_price: Optional[float] = None
+    prev_nz = 0                    # last non-zero slope sign (0 = none yet)
+    minima, maxima = [], []
+    # LC714 state
+    cash, hold = 0.0, -np.inf
+    if plans:
+        block = -(-block // 8) * 8           # whole bytes per block for the decision bits
+        gap = np.inf
+        buy_bits = np.zeros((n + 7) // 8, dtype=np.uint8)
+        sell_bits = np.zeros((n + 7) // 8, dtype=np.uint8)
+
+    for start in range(0, n, block):
+        p = s[start:start + block]
+
+        # --- LC121: running minimum carried across blocks ---
+        run_min = np.minimum(np.minimum.accumulate(p), min_val)
+        gain = p - run_min
+        k = int(np.argmax(gain))
+        if gain[k] > best121:
+            best121, sell121 = float(gain[k]), start + k
+            if run_min[k] == min_val:
+                buy121 = min_idx                     # minimum from an earlier block
+            else:
+                buy121 = start + int(np.argmax(p[:k + 1] == run_min[k]))
+        j = int(np.argmin(p))
+        if p[j] < min_val:
+            min_val, min_idx = float(p[j]), start + j
+
+        # --- LC122: positive changes (+ valley/peak detection) ---
+        d = np.diff(p, prepend=prev_price) if prev_price is not None else np.r_[0.0, np.diff(p)]
+        up_sum += float(d[d > 0.0].sum())
+        if plans:
+            # d[i] is step start + i - 1 (the first day's placeholder 0 never turns)
+            valleys, peaks, prev_nz = turning_points(np.sign(d).astype(np.int8), prev_nz)
+            minima.append(valleys + (start - 1))
+            maxima.append(peaks + (start - 1))
+        prev_price = float(p[-1])
+
+        # --- LC714: max-plus block transition (+ bit-packed decisions) ---
+        cash, hold = apply_transition(fee_block_transition(p, fee), cash, hold)
+        if plans:
+            bought, sold, gap = fee_decisions(p, fee, gap)
+            packed = slice(start // 8, start // 8 + (len(p) + 7) // 8)
+            buy_bits[packed] = np.packbits(bought)
+            sell_bits[packed] = np.packbits(sold)
+
+    result: Dict[str, Any] = {
+        "profits": {"LC121": best121 if best121 > 0 else 0.0, "LC122": up_sum,
+                    "LC714": float(cash)},
+        "fee": float(fee),
+        "plans": None,
+    }
+    if plans:
+        if best121 > 0:
+            plan121 = (np.array([buy121], dtype=np.int64), np.array([sell121], dtype=np.int64))
+        else:
+            plan121 = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        if n >= 2:
+            plan122 = pair_turning_points(s, np.concatenate(minima), np.concatenate(maxima))
+        else:
+            plan122 = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        result["plans"] = {"LC121": plan121, "LC122": plan122,
+                           "LC714": fee_plan_from_bits(buy_bits, sell_bits, n, block)}
+    return result
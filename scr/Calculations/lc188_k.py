@@ -0,0 +1,239 @@
+# scr/Calculations/lc188_k.py
+"""
+At Most k Transactions (LeetCode 123 / 188)
+
+Max profit when at most k buy→sell round-trips are allowed (hold ≤ 1 share).
+LC123 is the k = 2 case.
+
+Three regimes, picked by `k_trade_indices` / `max_profit_k`:
+
+- k ≥ number of LC122 trades (`max_profit.trade_indices`): the limit does
+  not bind, so buying every valley and selling the next peak is optimal.
+- small k (≤ DP_MAX_K): O(n·k) DP, vectorized over the days. Level j holds
+  f_j[i] = best profit within days 0..i using at most j trades:
+
+      f_j[i] = max(f_j[i-1], f_{j-1}[i], p_i + max_{t<i}(f_{j-1}[t-1] - p_t))
+
+  which is two running maxima (np.maximum.accumulate) per level.
+- large k: O(m log m) merge over the m LC122 trades. The trades and the dips
+  between them form an alternating chain gain, dip, gain, …; each step takes
+  the smallest element off a heap and either drops that trade (gain) or joins
+  the two trades around that dip (dip), until k trades remain.
+"""
+
+from __future__ import annotations
+import heapq
+from typing import Tuple
+import numpy as np
+import pandas as pd
+from scr.Calculations.price_series import PriceSeries, as_price_series
+from scr.Calculations.max_profit import trade_indices
+from scr.Calculations.trades_utils import trades_from_indices
+
+# NOTE: above this k the heap merge beats k vectorized passes over the closes.
+DP_MAX_K = 8
+
+# ---------- helpers ----------
+
+def _dp_level(p: np.ndarray, f_prev: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    One DP level: f_j from f_{j-1}.
+
+    Returns:
+        tuple: (f, cand, best_buy) where cand[i] is the best profit of a plan
+        whose j-th trade sells on day i, and best_buy[i] = max_{t≤i}(f_{j-1}[t-1] - p_t)
+        (f_{j-1}[-1] = 0), i.e. the best state holding the j-th share after day i.
+    """
+    n = len(p)
+    shifted = np.zeros(n)
+    shifted[1:] = f_prev[:-1]
+    best_buy = np.maximum.accumulate(shifted - p)
+    cand = np.full(n, -np.inf)
+    cand[1:] = p[1:] + best_buy[:-1]
+    f = np.maximum.accumulate(np.maximum(cand, f_prev))
+    return f, cand, best_buy
+
+
+def _dp_profit(p: np.ndarray, k: int) -> float:
+    """f_k[n-1], stopping early once another trade no longer helps."""
+    f = np.zeros(len(p))
+    for _ in range(k):
+        nxt = _dp_level(p, f)[0]
+        if nxt[-1] == f[-1]:
+            break
+        f = nxt
+    return float(f[-1])
+
+
+def _dp_plan(p: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trades realizing `_dp_profit`, recovered backwards with O(n) memory.
+
+    Instead of storing k levels of n values, each step recomputes the levels
+    on the prefix that is still open, up to the first level reaching the
+    remaining target profit: O(n·k²) time in total, fine for k ≤ DP_MAX_K.
+    """
+    buys, sells = [], []
+    e, target = len(p) - 1, _dp_profit(p, k)
+    while target > 0 and e > 0:
+        q = p[: e + 1]
+        f_prev = np.zeros(e + 1)
+        for _ in range(k):
+            f, cand, best_buy = _dp_level(q, f_prev)
+            if f[e] == target:
+                break
+            f_prev = f
+        # Sell on the first day that reaches the target, buy at the first day
+        # that realizes the best holding state just before it
+        sell = int(np.argmax(cand == target))
+        shifted = np.zeros(sell)
+        shifted[1:] = f_prev[: sell - 1]
+        buy = int(np.argmax(shifted - q[:sell] == best_buy[sell - 1]))
+        buys.append(buy)
+        sells.append(sell)
+        target, e = float(shifted[buy]), buy - 1
+    return np.array(buys[::-1], dtype=np.int64), np.array(sells[::-1], dtype=np.int64)
+
+
+def _merge_plan(p: np.ndarray, buy: np.ndarray, sell: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce the m LC122 trades to the best k trades (k < m) with a min-heap.
+
+    Chain slot 2i is trade i (value: its gain); slot 2i+1 is the dip between
+    trades i and i+1 (value: how far the price falls). Removing the smallest
+    element x costs exactly x:
+      - a trade at either end of the chain is dropped with its dip;
+      - any other element is fused with its two neighbours into one element
+        spanning both (two trades around a dip → one longer trade; two dips
+        around a trade → one deeper dip).
+    Merged elements keep the earlier slot, so live even slots stay in time order.
+    """
+    m = len(buy)
+    size = 2 * m - 1
+    start = np.empty(size, dtype=np.int64)
+    end = np.empty(size, dtype=np.int64)
+    start[0::2], end[0::2] = buy, sell
+    start[1::2], end[1::2] = sell[:-1], buy[1:]
+    value = p[end] - p[start]
+    value[1::2] *= -1
+
+    start, end, value = start.tolist(), end.tolist(), value.tolist()
+    prev = list(range(-1, size - 1))
+    nxt = list(range(1, size + 1))
+    nxt[-1] = -1
+    version = [0] * size
+    alive = [True] * size
+
+    heap = [(v, x, 0) for x, v in enumerate(value)]
+    heapq.heapify(heap)
+
+    def unlink(x: int) -> None:
+        alive[x] = False
+        if prev[x] >= 0:
+            nxt[prev[x]] = nxt[x]
+        if nxt[x] >= 0:
+            prev[nxt[x]] = prev[x]
+
+    trades = m
+    while trades > k:
+        v, x, ver = heapq.heappop(heap)
+        if not alive[x] or ver != version[x]:
+            continue   # stale entry
+        a, b = prev[x], nxt[x]
+        if a < 0 or b < 0:
+            # Trade at an end of the chain: drop it and its (now dangling) dip
+            unlink(x)
+            if a >= 0:
+                unlink(a)
+            elif b >= 0:
+                unlink(b)
+        else:
+            # Fuse a, x, b into slot a
+            end[a] = end[b]
+            unlink(x)
+            unlink(b)
+            gain = p[end[a]] - p[start[a]]
+            value[a] = float(gain if a % 2 == 0 else -gain)
+            version[a] += 1
+            heapq.heappush(heap, (value[a], a, version[a]))
+        trades -= 1
+
+    keep = [x for x in range(0, size, 2) if alive[x]]
+    return (np.array([start[x] for x in keep], dtype=np.int64),
+            np.array([end[x] for x in keep], dtype=np.int64))
+
+# ---------- algorithms ----------
+
+def k_trade_indices(prices: pd.Series | PriceSeries, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Optimal plan with at most `k` trades, as (buy_idx, sell_idx) arrays.
+
+    Args:
+        prices (pd.Series | PriceSeries): Close prices (or a PriceSeries).
+        k (int): Maximum number of completed trades.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: int64 positions in the PriceSeries,
+        in time order, at most k pairs, each strictly profitable.
+
+    Raises:
+        ValueError: If `k` is negative.
+    """
+    k = int(k)
+    if k < 0:
+        raise ValueError("k must be a non-negative integer.")
+    ps = as_price_series(prices)
+    buy, sell = trade_indices(ps)
+    if k >= len(buy):
+        return buy, sell
+    p = ps.closes.astype(np.float64, copy=False)
+    if k == 0:
+        return buy[:0], sell[:0]
+    if k <= DP_MAX_K:
+        return _dp_plan(p, k)
+    return _merge_plan(p, buy, sell, k)
+
+
+def max_profit_k(prices: pd.Series | PriceSeries, k: int) -> float:
+    """
+    LC188 — Max profit with at most `k` transactions (LC123 for k = 2).
+
+    Args:
+        prices (pd.Series | PriceSeries): Close prices (or a PriceSeries).
+        k (int): Maximum number of completed trades.
+
+    Returns:
+        float: Max profit (non-negative).
+
+    Raises:
+        ValueError: If `k` is negative.
+    """
+    k = int(k)
+    if k < 0:
+        raise ValueError("k must be a non-negative integer.")
+    ps = as_price_series(prices)
+    p = ps.closes.astype(np.float64, copy=False)
+    if k == 0 or len(p) < 2:
+        return 0.0
+    if k <= DP_MAX_K:
+        return _dp_profit(p, k)
+    buy, sell = k_trade_indices(ps, k)
+    return float((p[sell] - p[buy]).sum())
+
+
+def run(dates: pd.Series | PriceSeries, prices: pd.Series | None = None, k: int = 2) -> tuple[list[dict], float, dict]:
+    """
+    Unified interface for UI: (trades, total_profit, meta)
+    Accepts (dates, prices) or a single PriceSeries.
+    """
+    ps = as_price_series(dates, prices)
+
+    # Optimal plan with at most k round-trips (DP for small k, heap merge for large k)
+    buy_idx, sell_idx = k_trade_indices(ps, k)
+    trades = trades_from_indices(ps, buy_idx, sell_idx)
+
+    # Total equals the optimum (the plan realizes it)
+    total = float(sum(t["profit"] for t in trades))
+
+    meta = {"algo": "LC188", "label": f"At Most {int(k)} Transactions"}
+    return trades, total, meta
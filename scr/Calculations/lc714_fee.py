@@ -1,16 +1,25 @@
 from __future__ import annotations
 from typing import Tuple, List, Dict
+import numpy as np
 import pandas as pd
+from scr.Calculations.fused import (
+    FUSED_BLOCK, apply_transition, fee_block_transition, fee_decisions, fee_plan_from_bits,
+)
+from scr.Calculations.price_series import PriceSeries, as_price_series
+from scr.Calculations.trades_utils import trades_from_indices
 
-def max_profit_fee(prices: pd.Series, fee: float) -> float:
+# NOTE: caps the (fees × block) working set of the sweep at ~1M cells per array.
+SWEEP_CELLS = 1 << 20
+
+def max_profit_fee(prices: pd.Series | PriceSeries, fee: float) -> float:
     """
     LC714 — Max profit with transaction fee (O(n), DP).
     cash = max profit if we DO NOT hold a stock after day i
     hold = max profit if we DO hold a stock after day i
     """
-    # Normalize inputs to numeric and drop missing values to avoid NaN math issues
-    s = pd.to_numeric(prices, errors="coerce").dropna()
-    if s.empty:
+    # Numeric closes without NaNs (shared PriceSeries, coerced once)
+    s = as_price_series(prices).closes
+    if len(s) == 0:
         # No usable data → zero profit
         return 0.0
 
@@ -23,7 +32,7 @@ def max_profit_fee(prices: pd.Series, fee: float) -> float:
     # Transition:
     # - Selling today:  cash = max(cash, hold + price - fee)
     # - Buying today:   hold = max(hold, prev_cash - price)
-    for p in s.values:
+    for p in s.tolist():
         prev_cash = cash
         cash = max(cash, hold + p - fee)   # sell today (close position, pay fee)
         hold = max(hold, prev_cash - p)    # buy today (open/refresh position)
@@ -31,15 +40,90 @@ def max_profit_fee(prices: pd.Series, fee: float) -> float:
     # Final answer is the best state with no position (can't count an open position as realized profit)
     return float(cash)
 
-def run(dates: pd.Series, prices: pd.Series, fee: float = 1.0) -> tuple[list[dict], float, dict]:
+def max_profit_fee_sweep(prices: pd.Series | PriceSeries, fees) -> pd.Series:
+    """
+    LC714 for many fees at once: the fee→profit curve.
+
+    The cash/hold DP states of every fee advance together in one pass over the
+    prices. Each block of days is folded into a max-plus transition per fee
+    (see scr.Calculations.fused), so there is no per-day Python loop; profits
+    equal `max_profit_fee` up to float rounding.
+
+    Args:
+        prices (pd.Series | PriceSeries): Close prices (or a PriceSeries).
+        fees (array-like): Non-negative fees per completed trade.
+
+    Returns:
+        pd.Series: Max profit per fee, indexed by fee (name "fee"), in the order given.
+
+    Raises:
+        ValueError: If `fees` is not one-dimensional or contains negative/NaN values.
+    """
+    fee_arr = np.asarray(fees, dtype=np.float64)
+    if fee_arr.ndim != 1:
+        raise ValueError("fees must be a one-dimensional sequence.")
+    if np.isnan(fee_arr).any() or (fee_arr < 0).any():
+        raise ValueError("fees must be non-negative numbers.")
+
+    s = as_price_series(prices).closes.astype(np.float64, copy=False)
+    k = len(fee_arr)
+    cash = np.zeros(k)
+    hold = np.full(k, -np.inf)
+    if k:
+        block = max(1, min(FUSED_BLOCK, SWEEP_CELLS // k))
+        fee_col = fee_arr[:, None]
+        for start in range(0, len(s), block):
+            t = fee_block_transition(s[start:start + block], fee_col)
+            cash, hold = apply_transition(t, cash, hold)
+    return pd.Series(cash, index=pd.Index(fee_arr, name="fee"), name="profit")
+
+def fee_trade_indices(prices: pd.Series | PriceSeries, fee: float,
+                      block: int = FUSED_BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Optimal LC714 trade plan as (buy_idx, sell_idx) arrays, in O(n).
+
+    The DP's buy/sell decisions are recorded as two bit-packed arrays (2 bits
+    per day, i.e. n/4 bytes) and the plan is rebuilt from them afterwards; see
+    scr.Calculations.fused for how the decisions are derived.
+
+    Args:
+        prices (pd.Series | PriceSeries): Close prices (or a PriceSeries).
+        fee (float): Fee per completed trade.
+        block (int): Days per vectorized block (rounded up to a multiple of 8).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: int64 positions in the PriceSeries.
+    """
+    s = as_price_series(prices).closes.astype(np.float64, copy=False)
+    n = len(s)
+    block = -(-max(int(block), 1) // 8) * 8
+    buy_bits = np.zeros((n + 7) // 8, dtype=np.uint8)
+    sell_bits = np.zeros((n + 7) // 8, dtype=np.uint8)
+    gap = np.inf
+    for start in range(0, n, block):
+        bought, sold, gap = fee_decisions(s[start:start + block], float(fee), gap)
+        packed = slice(start // 8, start // 8 + (len(bought) + 7) // 8)
+        buy_bits[packed] = np.packbits(bought)
+        sell_bits[packed] = np.packbits(sold)
+    return fee_plan_from_bits(buy_bits, sell_bits, n, block)
+
+def run(dates: pd.Series | PriceSeries, prices: pd.Series | None = None,
+        fee: float = 1.0) -> tuple[list[dict], float, dict]:
     """
     Unified interface for UI: (trades, total_profit, meta)
+    Accepts (dates, prices) or a single PriceSeries.
+    Each trade's "profit" is net of the fee, so the rows sum to the total.
     """
-    # Compute optimal fee-adjusted profit via the DP above
-    total = max_profit_fee(prices, fee)
+    ps = as_price_series(dates, prices)
+
+    # Optimal fee-aware plan rebuilt from the DP's bit-packed decisions
+    buy_idx, sell_idx = fee_trade_indices(ps, fee)
+    trades = trades_from_indices(ps, buy_idx, sell_idx, fee=fee)
+
+    # Total equals the DP optimum (the plan realizes it)
+    total = float(sum(t["profit"] for t in trades))
 
     # Keep metadata short; the page uses meta['label'] for the result banner
     meta = {"algo": "LC714", "label": f"With Transaction Fee (fee={fee})"}
 
-    # Returning [] for trades keeps the UI consistent (table will show headers only for 714)
-    return [], total, meta
+    return trades, total, meta
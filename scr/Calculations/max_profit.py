@@ -8,17 +8,26 @@ the “unlimited transactions, hold ≤ 1 share at a time” constraint (a.k.a.
 LeetCode 122) and for reconstructing the corresponding buy/sell trades.
 
 Key functions:
-- max_profit_unlimited: O(n) greedy sum of positive day-to-day increases.
+- max_profit_unlimited: greedy sum of positive day-to-day increases (O(n) once
+  per dataset, then O(1) from its PrefixIndex).
+- trade_indices: NumPy kernel returning valley→peak (buy, sell) index arrays.
 - extract_trades: Rebuilds valley→peak trade segments for explanation/plotting.
 - coerce_to_price_series: Normalizes input (Series/DataFrame) into a numeric
   Close-price Series with an optional DatetimeIndex.
 
+Both algorithms also accept a `PriceSeries` and reuse its cached diffs/signs.
+
 """
 
 from __future__ import annotations
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Tuple
 import numpy as np
 import pandas as pd
+from scr.data.data_preprocessing import decode_dates
+from scr.Calculations.price_series import PriceSeries, as_price_series
+from scr.Calculations.fused import pair_turning_points, turning_points
+from scr.Calculations.range_index import PrefixIndex
+from scr.Calculations.trades_utils import trades_from_indices
 
 # ---------- helpers ----------
 
@@ -48,19 +57,23 @@ def coerce_to_price_series(data: Union[pd.Series, pd.DataFrame]) -> pd.Series:
         return pd.to_numeric(data, errors="coerce").dropna()
 
     if isinstance(data, pd.DataFrame):
-        df = data.copy()
-        if "Date" in df.columns:
-            df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-            df = df.dropna(subset=["Date"]).set_index("Date").sort_index()
-        if "Close" not in df.columns:
+        # Work on the two columns only (no full-frame copy of shared/read-only data)
+        if "Close" not in data.columns:
             raise ValueError("DataFrame must contain a 'Close' column.")
-        return pd.to_numeric(df["Close"], errors="coerce").dropna()
+        close = pd.to_numeric(data["Close"], errors="coerce")
+        if "Date" in data.columns:
+            dates = decode_dates(data["Date"])
+            keep = dates.notna().to_numpy()
+            close = pd.Series(close.to_numpy()[keep],
+                              index=pd.DatetimeIndex(dates[keep], name="Date"))
+            close = close.sort_index()
+        return close.dropna()
 
     raise TypeError("Input must be a pandas Series or DataFrame.")
 
 # ---------- algorithms ----------
 
-def max_profit_unlimited(prices: Union[pd.Series, pd.DataFrame]) -> float:
+def max_profit_unlimited(prices: Union[pd.Series, pd.DataFrame, PriceSeries]) -> float:
     """
     Compute the maximum profit with unlimited transactions (hold ≤ 1 share).
 
@@ -69,12 +82,13 @@ def max_profit_unlimited(prices: Union[pd.Series, pd.DataFrame]) -> float:
             profit = Σ max(0, p_t - p_{t-1})
 
     Complexity:
-        O(n) time, O(1) extra space beyond the diff.
+        O(n) on the first call per dataset (builds the cumulative-gain prefix
+        array of `range_index.PrefixIndex`), O(1) afterwards.
 
     Args:
-        prices (pd.Series | pd.DataFrame): Price sequence or OHLCV frame. If a
-            DataFrame is given, the 'Close' column is used (and 'Date' may set
-            a DatetimeIndex).
+        prices (pd.Series | pd.DataFrame | PriceSeries): Price sequence or OHLCV
+            frame. If a DataFrame is given, the 'Close' column is used (rows
+            sorted by 'Date' when present).
 
     Returns:
         float: Total profit (non-negative).
@@ -83,23 +97,58 @@ def max_profit_unlimited(prices: Union[pd.Series, pd.DataFrame]) -> float:
         This assumes zero transaction costs and the ability to buy/sell within
         the same day transitions only (no shorting, one position at a time).
     """
-    s = coerce_to_price_series(prices)
-    diff = s.diff().fillna(0.0)
-    profit = float(diff.where(diff > 0.0, 0.0).sum())
-    return profit
+    ps = as_price_series(prices)
+    if len(ps) < 2:
+        return 0.0
+    # Whole-series range query on the cached cumulative positive diffs
+    return PrefixIndex.of(ps).lc122_profit(0, len(ps) - 1)
+
+def trade_indices(dates: Union[pd.Series, PriceSeries],
+                  prices: pd.Series | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Valley→peak turning points of the greedy LC122 strategy, as index arrays.
+
+    Pure NumPy: step t runs from close t to close t+1; its sign is
+    forward-filled over flat steps, and a turn up at step t makes close t a
+    valley, a turn down a peak (`fused.turning_points`). Each pair spans one
+    maximal rise, so the trade profits sum to `max_profit_unlimited`.
+
+    Args:
+        dates (pd.Series | PriceSeries): Date-like sequence aligned with prices,
+            or a PriceSeries (then `prices` is omitted).
+        prices (pd.Series, optional): Close prices aligned with dates.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (buy_idx, sell_idx) int64 positions in
+        the PriceSeries, one pair per strictly profitable trade, in order.
+    """
+    ps = as_price_series(dates, prices)
+    s = ps.closes
+    if len(s) < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    # Valleys/peaks on the day-to-day signs, paired valley→peak
+    # (shared with the fused engine)
+    valleys, peaks, _ = turning_points(ps.signs)
+    return pair_turning_points(s, valleys, peaks)
+
 
-def extract_trades(dates: pd.Series, prices: pd.Series) -> List[Dict]:
+def extract_trades(dates: Union[pd.Series, PriceSeries], prices: pd.Series | None = None) -> List[Dict]:
     """
     Reconstruct greedy valley→peak trades from aligned Date & Close arrays.
 
     The reconstruction pairs local minima (valleys) with subsequent local
     maxima (peaks) following the same greedy logic used by
     `max_profit_unlimited`. Flat segments are resolved by forward-filling the
-    last non-zero slope sign to ensure deterministic turning points.
+    last non-zero slope sign to ensure deterministic turning points. The
+    turning points come from the `trade_indices` kernel; rows are built
+    column-wise by `trades_utils.trades_from_indices`.
 
     Args:
-        dates (pd.Series): Date-like sequence aligned with prices.
-        prices (pd.Series): Close prices aligned with dates.
+        dates (pd.Series | PriceSeries): Date-like sequence aligned with prices,
+            or a PriceSeries (then `prices` is omitted).
+        prices (pd.Series, optional): Close prices aligned with dates.
 
     Returns:
         list[dict]: Each dict contains:
@@ -112,52 +161,12 @@ def extract_trades(dates: pd.Series, prices: pd.Series) -> List[Dict]:
             }
 
     Notes:
-        - Inputs are coerced to float prices and datetime-like dates internally.
+        - Inputs are coerced once into a PriceSeries (rows with a missing date
+          or price are dropped); its cached signs drive the turning points.
         - Only strictly profitable segments (sell_price > buy_price) are kept.
         - Edge cases are handled so that a rising sequence at the start or end
           still yields a valid buy or sell respectively.
     """
-    # Ensure alignment and float dtype
-    s = pd.Series(prices).astype(float).reset_index(drop=True)
-    dts = pd.to_datetime(pd.Series(dates), errors="coerce").reset_index(drop=True)
-
-    # Day-to-day change and trend sign
-    d = s.diff()
-    sign = np.sign(d.fillna(0.0))
-
-    # Resolve flat segments by forward-filling last non-zero sign
-    nz = pd.Series(sign).replace(0, np.nan).ffill().fillna(0).values
-    turn = pd.Series(nz).diff().fillna(0).values
-
-    # Local minima where slope goes from <=0 to >0 (turn > 0)
-    # Local maxima where slope goes from >=0 to <0 (turn < 0)
-    minima_idx = np.where(turn > 0)[0]
-    maxima_idx = np.where(turn < 0)[0]
-
-    # Edge handling
-    if len(minima_idx) == 0 or (len(maxima_idx) and minima_idx[0] > maxima_idx[0]):
-        minima_idx = np.r_[0, minima_idx]  # treat start as valley if we begin rising
-    if len(maxima_idx) == 0 or (len(minima_idx) and maxima_idx[-1] < minima_idx[-1]):
-        maxima_idx = np.r_[maxima_idx, len(s) - 1]  # end peak if we finish rising
-
-    # Pair valleys→peaks
-    m = min(len(minima_idx), len(maxima_idx))
-    minima_idx = minima_idx[:m]
-    maxima_idx = maxima_idx[:m]
-
-    trades: List[Dict] = []
-    for buy_i, sell_i in zip(minima_idx, maxima_idx):
-        if sell_i <= buy_i:
-            continue
-        buy_price = float(s.iloc[buy_i])
-        sell_price = float(s.iloc[sell_i])
-        if sell_price <= buy_price:
-            continue
-        trades.append({
-            "buy_date": dts.iloc[buy_i].date(),
-            "buy_price": buy_price,
-            "sell_date": dts.iloc[sell_i].date(),
-            "sell_price": sell_price,
-            "profit": sell_price - buy_price
-        })
-    return trades
+    ps = as_price_series(dates, prices)
+    buy_idx, sell_idx = trade_indices(ps)
+    return trades_from_indices(ps, buy_idx, sell_idx)
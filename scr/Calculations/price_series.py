@@ -0,0 +1,227 @@
+# scr/Calculations/price_series.py
+"""
+PriceSeries: one canonical, immutable Close-price container
+
+Every calculation used to clean, coerce, drop NaNs from and diff the same Close
+column on its own. `PriceSeries` does that once: it holds the dates and closes
+as NumPy arrays and computes the shared derived arrays (diffs, signs, log
+returns, prefix sums) lazily, memoizing each on first use.
+
+`PriceSeries.of(df)` also remembers the container built for a given frame, so
+pages that pass the same session DataFrame on every rerun reuse one instance
+(and its cached arrays) instead of rebuilding it.
+
+All arrays are read-only. Treat the frames handed to `of` as read-only too:
+the memo is keyed by object identity, not by content.
+"""
+
+from __future__ import annotations
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scr.data.data_preprocessing import clean_date_close, decode_dates
+
+_memo: Dict[int, Tuple[weakref.ref, "PriceSeries"]] = {}
+_memo_lock = threading.Lock()
+
+# ---------- helpers ----------
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr.setflags(write=False)
+    return arr
+
+
+def _close_array(values) -> np.ndarray:
+    """Numeric closes; float32 input stays float32, everything else is float64."""
+    arr = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy()
+    return arr if arr.dtype == np.float32 else arr.astype(np.float64, copy=False)
+
+
+def _date_array(values) -> np.ndarray:
+    """tz-naive datetime64[ns] dates (tz-aware input keeps its wall-clock time)."""
+    idx = pd.DatetimeIndex(decode_dates(values))
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.as_unit("ns").to_numpy()
+
+
+def _forget(key: int, ref: weakref.ref) -> None:
+    """weakref callback: drop the memo entry once its frame is garbage-collected."""
+    with _memo_lock:
+        hit = _memo.get(key)
+        if hit is not None and hit[0] is ref:
+            del _memo[key]
+
+# ---------- container ----------
+
+class PriceSeries:
+    """
+    Immutable dates + closes with memoized derived arrays.
+
+    Attributes:
+        dates (np.ndarray | None): datetime64[ns] dates, or None when built from
+            an unlabelled sequence (e.g. a plain list of prices).
+        closes (np.ndarray): Close prices without NaNs (float64, or float32 for
+            compact frames).
+
+    Derived arrays (computed on first access, then cached):
+        diffs        closes[i] - closes[i-1]               (length n-1)
+        signs        sign of diffs as int8 (-1, 0, 1)      (length n-1)
+        log_returns  log(closes[i] / closes[i-1])          (length n-1)
+        prefix_sums  [0, c0, c0+c1, ...] in float64       (length n+1)
+    """
+
+    __slots__ = ("dates", "closes", "_diffs", "_signs", "_log_returns", "_prefix_sums", "__weakref__")
+
+    def __init__(self, dates: Optional[np.ndarray], closes: np.ndarray):
+        closes = np.asarray(closes)
+        if dates is not None and len(dates) != len(closes):
+            raise ValueError("dates and closes must have the same length.")
+        object.__setattr__(self, "dates", None if dates is None else _readonly(np.array(dates, copy=True)))
+        object.__setattr__(self, "closes", _readonly(np.array(closes, copy=True)))
+        for name in ("_diffs", "_signs", "_log_returns", "_prefix_sums"):
+            object.__setattr__(self, name, None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PriceSeries is immutable.")
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    def __repr__(self) -> str:
+        if self.dates is not None and len(self):
+            span = f"{pd.Timestamp(self.dates[0]).date()} → {pd.Timestamp(self.dates[-1]).date()}"
+        else:
+            span = "no dates"
+        return f"PriceSeries(n={len(self)}, {span}, dtype={self.closes.dtype})"
+
+    # ---------- construction ----------
+
+    @classmethod
+    def from_arrays(cls, dates, closes) -> "PriceSeries":
+        """
+        Build from aligned date and close sequences, dropping rows where either
+        is missing. Order is kept as given (no sorting).
+        """
+        c = _close_array(closes)
+        d = _date_array(dates) if dates is not None else None
+        keep = ~np.isnan(c)
+        if d is not None:
+            keep &= ~np.isnat(d)
+        if not keep.all():
+            c, d = c[keep], (d[keep] if d is not None else None)
+        return cls(d, c)
+
+    @classmethod
+    def _build(cls, data) -> "PriceSeries":
+        if isinstance(data, pd.DataFrame):
+            if "Close" not in data.columns:
+                raise ValueError("DataFrame must contain a 'Close' column.")
+            if "Date" not in data.columns:
+                return cls.from_arrays(None, data["Close"])
+            clean = clean_date_close(data)  # sorted by Date, no NaT/NaN
+            return cls(_date_array(clean["Date"]), _close_array(clean["Close"]))
+        if isinstance(data, pd.Series):
+            dates = data.index if isinstance(data.index, pd.DatetimeIndex) else None
+            return cls.from_arrays(dates, data)
+        return cls.from_arrays(None, data)
+
+    @classmethod
+    def of(cls, data) -> "PriceSeries":
+        """
+        Return the PriceSeries for `data`, reusing the one built earlier for the
+        same object.
+
+        Args:
+            data (PriceSeries | pd.DataFrame | pd.Series | array-like): A frame
+                with 'Date'/'Close' (cleaned and sorted by date), a Close Series
+                (a DatetimeIndex becomes the dates) or a plain price sequence.
+
+        Returns:
+            PriceSeries: `data` itself if it already is one.
+
+        Raises:
+            ValueError: If a DataFrame has no 'Close' column.
+        """
+        if isinstance(data, cls):
+            return data
+        key = id(data)
+        with _memo_lock:
+            hit = _memo.get(key)
+        if hit is not None and hit[0]() is data:
+            return hit[1]
+        ps = cls._build(data)
+        try:
+            ref = weakref.ref(data, lambda r, key=key: _forget(key, r))
+        except TypeError:
+            return ps  # lists/arrays can't be weakly referenced; just don't memoize
+        with _memo_lock:
+            _memo[key] = (ref, ps)
+        return ps
+
+    # ---------- derived arrays ----------
+
+    def _cached(self, name: str, compute):
+        value = object.__getattribute__(self, name)
+        if value is None:
+            value = _readonly(compute())
+            object.__setattr__(self, name, value)
+        return value
+
+    @property
+    def diffs(self) -> np.ndarray:
+        return self._cached("_diffs", lambda: np.diff(self.closes))
+
+    @property
+    def signs(self) -> np.ndarray:
+        return self._cached("_signs", lambda: np.sign(self.diffs).astype(np.int8))
+
+    @property
+    def log_returns(self) -> np.ndarray:
+        def compute():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.diff(np.log(self.closes))
+        return self._cached("_log_returns", compute)
+
+    @property
+    def prefix_sums(self) -> np.ndarray:
+        return self._cached(
+            "_prefix_sums",
+            lambda: np.concatenate(([0.0], np.cumsum(self.closes, dtype=np.float64))),
+        )
+
+    # ---------- conversions ----------
+
+    def date_index(self) -> pd.Index:
+        """DatetimeIndex named 'Date', or a RangeIndex when there are no dates."""
+        if self.dates is None:
+            return pd.RangeIndex(len(self))
+        return pd.DatetimeIndex(self.dates, name="Date")
+
+    def to_series(self) -> pd.Series:
+        """Close prices as a pandas Series (see `date_index`)."""
+        return pd.Series(self.closes, index=self.date_index(), name="Close", copy=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        """['Date', 'Close'] frame with a RangeIndex (Date is NaT-free)."""
+        dates = self.dates if self.dates is not None else np.full(len(self), np.datetime64("NaT", "ns"))
+        return pd.DataFrame({"Date": dates, "Close": self.closes}, copy=False)
+
+    def date_at(self, i: int):
+        """Calendar date of row `i` (or the row number when there are no dates)."""
+        return pd.Timestamp(self.dates[i]).date() if self.dates is not None else int(i)
+
+
+def as_price_series(data, prices=None) -> PriceSeries:
+    """
+    Normalize calculation inputs to a PriceSeries.
+
+    Accepts either a single argument (PriceSeries, DataFrame, Series or price
+    sequence, see `PriceSeries.of`) or the (dates, prices) pair the
+    `ALGORITHMS` runners take.
+    """
+    if prices is None or isinstance(data, PriceSeries):
+        return PriceSeries.of(data)
+    return PriceSeries.from_arrays(data, prices)
@@ -0,0 +1,353 @@
+# scr/Calculations/range_index.py
+"""
+Range-query Indexes
+
+Per-dataset indexes built once over a PriceSeries, so sub-range questions
+("what if I had only traded between A and B?") are answered without
+rescanning the closes.
+
+- PrefixIndex: O(1) LC122 profit, total/mean return, SMA, mean and variance
+  of the closes over any [i, j] window, from prefix sums (each built on first
+  use).
+- BestTradeIndex: best single buy→sell (LC121) inside any [i, j] window in
+  O(log n), with its indices. A segment tree over the closes whose nodes hold
+  (min, argmin, max, argmax, best profit, best buy, best sell) of their span.
+
+Indexes are cached against the PriceSeries (itself memoized per frame), like
+`DailyReturns.of`.
+"""
+
+from __future__ import annotations
+import datetime
+import math
+import threading
+import weakref
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+from scr.Calculations.price_series import PriceSeries, as_price_series
+
+_memo: "weakref.WeakKeyDictionary[PriceSeries, dict]" = weakref.WeakKeyDictionary()
+_memo_lock = threading.Lock()
+
+# ---------- helpers ----------
+
+def _cached_index(cls, data, prices):
+    """The `cls` index for a dataset, built on first use (see `DailyReturns.of`)."""
+    ps = as_price_series(data, prices)
+    with _memo_lock:
+        hit = _memo.get(ps, {}).get(cls)
+    if hit is None:
+        hit = cls(ps)
+        with _memo_lock:
+            hit = _memo.setdefault(ps, {}).setdefault(cls, hit)
+    return hit
+
+
+def _combine(L: tuple, R: tuple) -> tuple:
+    """
+    Merge two adjacent spans (L before R), vectorized over nodes.
+
+    Ties follow `max_profit_single`: highest profit, then earliest sell, then
+    earliest buy; argmin/argmax are the first occurrence.
+    """
+    l_mn, l_mni, l_mx, l_mxi, l_best, l_b, l_s = L
+    r_mn, r_mni, r_mx, r_mxi, r_best, r_b, r_s = R
+    cross = r_mx - l_mn
+    # Pairs selling in L sell earliest, so L's best wins any tie; a cross pair
+    # (buy in L) beats R's own best on equal profit unless it sells later
+    take_cross = (cross > r_best) | ((cross == r_best) & (r_mxi <= r_s))
+    best = np.where(take_cross, cross, r_best)
+    b = np.where(take_cross, l_mni, r_b)
+    s = np.where(take_cross, r_mxi, r_s)
+    take_l = l_best >= best
+    left_min = l_mn <= r_mn
+    left_max = l_mx >= r_mx
+    return (
+        np.where(left_min, l_mn, r_mn), np.where(left_min, l_mni, r_mni),
+        np.where(left_max, l_mx, r_mx), np.where(left_max, l_mxi, r_mxi),
+        np.where(take_l, l_best, best), np.where(take_l, l_b, b), np.where(take_l, l_s, s),
+    )
+
+
+def _check_window(i: int, j: int, n: int) -> Tuple[int, int]:
+    i, j = int(i), int(j)
+    if not 0 <= i <= j < n:
+        raise IndexError(f"Window [{i}, {j}] is not within [0, {n - 1}].")
+    return i, j
+
+
+def rows_between(prices: PriceSeries, start, end) -> Tuple[int, int]:
+    """
+    Row window [i, j] covering the dates start..end (inclusive), by binary
+    search over the (ascending) dates. A plain `datetime.date` as `end`
+    covers that whole day (intraday bars included).
+
+    Raises:
+        ValueError: If the series has no dates or no row falls in the range.
+    """
+    d = prices.dates
+    if d is None:
+        raise ValueError("This series has no dates; query by row instead.")
+    lo = np.datetime64(pd.Timestamp(start).tz_localize(None), "ns")
+    hi_ts = pd.Timestamp(end).tz_localize(None)
+    if isinstance(end, datetime.date) and not isinstance(end, datetime.datetime):
+        hi_ts += pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+    hi = np.datetime64(hi_ts, "ns")
+    i = int(np.searchsorted(d, lo, side="left"))
+    j = int(np.searchsorted(d, hi, side="right")) - 1
+    if i > j:
+        raise ValueError("No trading days in the selected range.")
+    return i, j
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """[0, v0, v0+v1, ...] in float64 (length len(values) + 1), read-only."""
+    out = np.zeros(len(values) + 1)
+    np.cumsum(values, dtype=np.float64, out=out[1:])
+    out.setflags(write=False)
+    return out
+
+# ---------- prefix sums ----------
+
+class PrefixIndex:
+    """
+    Prefix sums over a PriceSeries for constant-time range statistics.
+
+    Windows are inclusive row ranges [i, j]. Changes (diffs, returns) inside
+    a window are the j - i steps from row i to row j, so a one-row window has
+    zero profit and return. Each prefix array is built on first use:
+
+        gains     Σ max(p_t - p_{t-1}, 0)       → LC122 profit
+        log       Σ ln(p_t / p_{t-1})           → log return
+        returns   Σ simple step returns (%)     → mean return
+        sums      Σ (p_t - p_0)                 → mean / SMA
+        squares   Σ (p_t - p_0)²                → variance
+
+    Sums and squares are taken about the first close, so the variance does not
+    cancel away on high-priced series.
+
+    Attributes:
+        prices (PriceSeries): Source series.
+    """
+
+    __slots__ = ("prices", "_p", "_n", "_shift", "_arrays")
+
+    def __init__(self, prices: PriceSeries):
+        self.prices = prices
+        self._p = prices.closes.astype(np.float64, copy=False)
+        self._n = len(self._p)
+        self._shift = float(self._p[0]) if self._n else 0.0
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def of(cls, data, prices=None) -> "PrefixIndex":
+        """Return the (cached) index for a dataset (see `BestTradeIndex.of`)."""
+        return _cached_index(cls, data, prices)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _array(self, name: str) -> np.ndarray:
+        arr = self._arrays.get(name)
+        if arr is None:
+            ps, p = self.prices, self._p
+            if name == "gains":
+                arr = _prefix(np.maximum(ps.diffs, 0.0))
+            elif name == "log":
+                arr = _prefix(ps.log_returns)
+            elif name == "returns":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    arr = _prefix(ps.diffs / p[:-1] * 100)
+            elif name == "sums":
+                arr = _prefix(p - self._shift)
+            else:  # "squares"
+                arr = _prefix(np.square(p - self._shift))
+            arr = self._arrays.setdefault(name, arr)
+        return arr
+
+    def _step_sum(self, name: str, i: int, j: int) -> float:
+        """Sum of the per-step values from row i to row j (j - i steps)."""
+        i, j = _check_window(i, j, self._n)
+        arr = self._array(name)
+        return float(arr[j] - arr[i])
+
+    # ---------- queries ----------
+
+    def rows_between(self, start, end) -> Tuple[int, int]:
+        """Row window [i, j] for the dates start..end (see module `rows_between`)."""
+        return rows_between(self.prices, start, end)
+
+    def lc122_profit(self, i: int, j: int) -> float:
+        """Max profit with unlimited transactions trading only within rows i..j."""
+        return self._step_sum("gains", i, j)
+
+    def total_return_pct(self, i: int, j: int) -> float:
+        """Return from the close of row i to the close of row j, in percent."""
+        i, j = _check_window(i, j, self._n)
+        return float((self._p[j] / self._p[i] - 1) * 100)
+
+    def log_return(self, i: int, j: int) -> float:
+        """ln(P_j / P_i), as the sum of the step log returns."""
+        return self._step_sum("log", i, j)
+
+    def mean_return_pct(self, i: int, j: int) -> float:
+        """Mean of the j - i step returns (%) in the window; NaN if i == j."""
+        total = self._step_sum("returns", i, j)
+        return total / (j - i) if j > i else math.nan
+
+    def mean(self, i: int, j: int) -> float:
+        """Mean close over rows i..j."""
+        i, j = _check_window(i, j, self._n)
+        sums = self._array("sums")
+        return float((sums[j + 1] - sums[i]) / (j - i + 1) + self._shift)
+
+    def variance(self, i: int, j: int, ddof: int = 0) -> float:
+        """
+        Variance of the closes over rows i..j.
+
+        Args:
+            i (int): First row of the window.
+            j (int): Last row of the window.
+            ddof (int): Delta degrees of freedom (1 for the sample variance).
+
+        Returns:
+            float: Variance (never negative); NaN if the window has ≤ ddof rows.
+        """
+        i, j = _check_window(i, j, self._n)
+        count = j - i + 1
+        if count <= ddof:
+            return math.nan
+        sums, squares = self._array("sums"), self._array("squares")
+        s1 = sums[j + 1] - sums[i]
+        s2 = squares[j + 1] - squares[i]
+        return max(float(s2 - s1 * s1 / count), 0.0) / (count - ddof)
+
+    def sma(self, end: int, window: int) -> float:
+        """
+        Simple moving average of the `window` closes ending at row `end`
+        (NaN while fewer than `window` rows are available, like `compute_sma`).
+        """
+        window = int(window)
+        if window <= 0:
+            raise ValueError("window must be a positive integer.")
+        if end - window + 1 < 0:
+            _check_window(0, end, self._n)
+            return math.nan
+        return self.mean(end - window + 1, end)
+
+# ---------- best single trade ----------
+
+class BestTradeIndex:
+    """
+    Segment tree answering "best single buy→sell between rows i and j".
+
+    Built bottom-up one tree level at a time (vectorized, O(n) work). Only the
+    n-1 internal nodes are stored; leaf k is closes[k] itself. Queries combine
+    the O(log n) nodes covering the window, left to right.
+
+    Attributes:
+        prices (PriceSeries): Source series.
+    """
+
+    __slots__ = ("prices", "_p", "_n", "_nodes")
+
+    def __init__(self, prices: PriceSeries):
+        self.prices = prices
+        p = prices.closes.astype(np.float64, copy=False)
+        n = len(p)
+        self._p, self._n = p, n
+        idx_dtype = np.int32 if n < 2**31 else np.int64
+        # Node v (1 ≤ v < n) covers children 2v and 2v+1; ids ≥ n are leaves
+        self._nodes = (
+            np.empty(n), np.empty(n, dtype=idx_dtype), np.empty(n), np.empty(n, dtype=idx_dtype),
+            np.empty(n), np.empty(n, dtype=idx_dtype), np.empty(n, dtype=idx_dtype),
+        )
+        hi = n
+        while hi > 1:
+            # Children of nodes in [lo, hi) are all ≥ hi, i.e. already built
+            lo = (hi + 1) // 2
+            v = np.arange(lo, hi)
+            merged = _combine(self._gather(2 * v), self._gather(2 * v + 1))
+            for arr, vals in zip(self._nodes, merged):
+                arr[lo:hi] = vals
+            hi = lo
+
+    @classmethod
+    def of(cls, data, prices=None) -> "BestTradeIndex":
+        """
+        Return the (cached) index for a dataset.
+
+        Args:
+            data (PriceSeries | pd.DataFrame | pd.Series): Anything accepted by
+                `as_price_series`.
+            prices (pd.Series, optional): Prices when `data` holds the dates.
+
+        Returns:
+            BestTradeIndex
+        """
+        return _cached_index(cls, data, prices)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _gather(self, ids: np.ndarray) -> tuple:
+        """Node fields for node ids (leaves, ids ≥ n, are read from the closes)."""
+        leaf = ids >= self._n
+        pos = np.where(leaf, ids - self._n, 0)
+        inner = np.where(leaf, 0, ids)
+        price = self._p[pos]
+        mn, mni, mx, mxi, best, b, s = (arr[inner] for arr in self._nodes)
+        return (
+            np.where(leaf, price, mn), np.where(leaf, pos, mni),
+            np.where(leaf, price, mx), np.where(leaf, pos, mxi),
+            np.where(leaf, 0.0, best), np.where(leaf, pos, b), np.where(leaf, pos, s),
+        )
+
+    # ---------- queries ----------
+
+    def query(self, i: int, j: int) -> Tuple[int, int, float]:
+        """
+        Best single trade buying and selling within rows i..j (inclusive).
+
+        Args:
+            i (int): First row of the window.
+            j (int): Last row of the window.
+
+        Returns:
+            tuple[int, int, float]: (buy_idx, sell_idx, profit) as positions in
+            the PriceSeries, like `max_profit_single`; (-1, -1, 0.0) if no
+            trade in the window is profitable.
+
+        Raises:
+            IndexError: If the window is empty or out of range.
+        """
+        i, j = _check_window(i, j, self._n)
+        # Covering nodes in left-to-right order (standard bottom-up walk)
+        left, right = [], []
+        lo, hi = i + self._n, j + self._n + 1
+        while lo < hi:
+            if lo & 1:
+                left.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right.append(hi)
+            lo //= 2
+            hi //= 2
+        fields = self._gather(np.array(left + right[::-1], dtype=np.int64))
+        acc = tuple(f[:1] for f in fields)
+        for k in range(1, len(fields[0])):
+            acc = _combine(acc, tuple(f[k:k + 1] for f in fields))
+        best = float(acc[4][0])
+        if best <= 0:
+            return -1, -1, 0.0
+        return int(acc[5][0]), int(acc[6][0]), best
+
+    def rows_between(self, start, end) -> Tuple[int, int]:
+        """Row window [i, j] for the dates start..end (see module `rows_between`)."""
+        return rows_between(self.prices, start, end)
+
+    def query_dates(self, start, end) -> Tuple[int, int, float]:
+        """`query` over the rows dated start..end (inclusive). See `rows_between`."""
+        return self.query(*self.rows_between(start, end))
@@ -0,0 +1,137 @@
+# scr/Calculations/returns.py
+"""
+Whole-series Returns
+
+Vectorized counterpart of `dr_calc`: simple, log and cumulative returns for
+every row of a price series, computed in one pass and cached per dataset.
+
+    simple_pct[t]     = (P_t - P_{t-1}) / P_{t-1} * 100      (same formula as dr_calc)
+    log[t]            = ln(P_t / P_{t-1})
+    cumulative_pct[t] = (P_t / P_0 - 1) * 100
+
+All arrays have one entry per row of the underlying PriceSeries; row 0 has no
+previous day, so simple_pct[0] and log[0] are NaN (cumulative_pct[0] is 0).
+
+`index_of(date)` answers date → row lookups in O(log n) with a binary search
+over the sorted dates, instead of scanning the Date column.
+"""
+
+from __future__ import annotations
+import threading
+import weakref
+from typing import Optional
+import numpy as np
+import pandas as pd
+from scr.Calculations.price_series import PriceSeries, as_price_series
+
+_memo: "weakref.WeakKeyDictionary[PriceSeries, DailyReturns]" = weakref.WeakKeyDictionary()
+_memo_lock = threading.Lock()
+
+
+class DailyReturns:
+    """
+    Returns for a whole PriceSeries, plus a sorted date index.
+
+    Attributes:
+        prices (PriceSeries): Source series.
+        simple_pct (np.ndarray): Simple returns in percent (NaN at row 0).
+        log (np.ndarray): Log returns (NaN at row 0).
+        cumulative_pct (np.ndarray): Return since the first row, in percent.
+    """
+
+    __slots__ = ("prices", "simple_pct", "log", "cumulative_pct", "_sorted_dates", "_order", "_frame")
+
+    def __init__(self, prices: PriceSeries):
+        self.prices = prices
+        c = prices.closes.astype(np.float64, copy=False)
+        n = len(c)
+        self.simple_pct = np.full(n, np.nan)
+        self.log = np.full(n, np.nan)
+        self.cumulative_pct = np.full(n, np.nan)
+        if n:
+            prev = c[:-1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.simple_pct[1:] = ((c[1:] - prev) / prev) * 100
+                self.log[1:] = np.log(c[1:] / prev)
+                self.cumulative_pct[:] = (c / c[0] - 1) * 100
+        for arr in (self.simple_pct, self.log, self.cumulative_pct):
+            arr.setflags(write=False)
+        self._frame: Optional[pd.DataFrame] = None
+
+        # Sorted view of the dates for binary search (frames are already sorted,
+        # so the argsort is only paid for unsorted input)
+        d = prices.dates
+        if d is None or len(d) < 2 or (d[1:] >= d[:-1]).all():
+            self._sorted_dates, self._order = d, None
+        else:
+            self._order = np.argsort(d, kind="stable")
+            self._sorted_dates = d[self._order]
+
+    @classmethod
+    def of(cls, data, prices=None) -> "DailyReturns":
+        """
+        Return the (cached) DailyReturns for a dataset.
+
+        Args:
+            data (PriceSeries | pd.DataFrame | pd.Series): Anything accepted by
+                `as_price_series`. The result is cached against the PriceSeries,
+                which is itself memoized per frame, so reruns on the same
+                session DataFrame reuse it.
+            prices (pd.Series, optional): Prices when `data` holds the dates.
+
+        Returns:
+            DailyReturns
+        """
+        ps = as_price_series(data, prices)
+        with _memo_lock:
+            hit = _memo.get(ps)
+        if hit is None:
+            hit = cls(ps)
+            with _memo_lock:
+                hit = _memo.setdefault(ps, hit)
+        return hit
+
+    def __len__(self) -> int:
+        return len(self.simple_pct)
+
+    # ---------- lookups ----------
+
+    def index_of(self, date) -> Optional[int]:
+        """
+        Row of `date` (binary search, O(log n)), or None if it is not a trading
+        day in the data. Time of day is compared as stored (daily bars are at
+        midnight).
+        """
+        if self._sorted_dates is None or not len(self._sorted_dates):
+            return None
+        key = np.datetime64(pd.Timestamp(date).tz_localize(None), "ns")
+        pos = int(np.searchsorted(self._sorted_dates, key, side="left"))
+        if pos == len(self._sorted_dates) or self._sorted_dates[pos] != key:
+            return None
+        return pos if self._order is None else int(self._order[pos])
+
+    def at(self, i: int) -> float:
+        """
+        Simple return of row `i` in percent (what `dr_calc` returns).
+
+        Raises:
+            IndexError: If `i` < 1 (no previous day) or out of range.
+        """
+        if i < 1:
+            raise IndexError("No previous day for index 0.")
+        return float(self.simple_pct[i])
+
+    # ---------- conversions ----------
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Frame with Date, Close and the three return columns (RangeIndex).
+        Built once and shared — treat it as read-only.
+        """
+        if self._frame is None:
+            out = self.prices.to_frame()
+            out["Return (%)"] = self.simple_pct
+            out["Log return"] = self.log
+            out["Cumulative (%)"] = self.cumulative_pct
+            self._frame = out
+        return self._frame
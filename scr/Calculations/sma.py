@@ -2,13 +2,109 @@
 """
 SMA Utilities
 
-Manual SMA computation for a univariate price series and a convenience
+Vectorized SMA computation for a univariate price series and a convenience
 function that returns pandas' rolling mean for reference/validation.
 
+`sma_matrix` computes any number of windows in one pass from cumulative sums.
+Prefix sums over long series grow large and the difference of two large sums
+loses precision, so the sums are re-anchored every `SMA_ANCHOR_BLOCK` rows:
+each block starts a fresh cumulative sum (overlapping the previous block by
+the largest window), which keeps the rounding error bounded by the block
+length instead of the series length.
+
+`compute_sma` and `compute_sma_matrix` accept a pd.Series or a `PriceSeries`.
+
 """
 
 import pandas as pd
 import numpy as np
+from scr.Calculations.price_series import PriceSeries
+
+SMA_ANCHOR_BLOCK = 1 << 16   # rows per re-anchored cumulative-sum block
+
+def sma_matrix(values, windows, block: int = SMA_ANCHOR_BLOCK) -> np.ndarray:
+    """
+    Compute the SMA of `values` for several windows at once.
+
+    Semantics match `pd.Series.rolling(w).mean()`: row i is NaN while fewer than
+    `w` observations exist or when any value in the window is NaN. Windows that
+    are non-positive or longer than the series yield an all-NaN column.
+
+    Args:
+        values (array-like): 1-D numeric values in chronological order.
+        windows (iterable[int]): Window lengths, one output column each.
+        block (int): Rows per re-anchored cumulative-sum block (raised to at
+            least the largest window).
+
+    Returns:
+        np.ndarray: float64 array of shape (len(values), len(windows)).
+
+    Raises:
+        ValueError: If `values` is not one-dimensional.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    if x.ndim != 1:
+        raise ValueError("sma_matrix expects a one-dimensional series.")
+    wins = [int(w) for w in windows]
+    n = len(x)
+    out = np.full((n, len(wins)), np.nan, order="F")   # contiguous columns
+    valid = [(j, w) for j, w in enumerate(wins) if 0 < w <= n]
+    if not valid:
+        return out
+
+    nan_mask = np.isnan(x)
+    has_nan = bool(nan_mask.any())
+    if has_nan:
+        x = np.where(nan_mask, 0.0, x)
+
+    wmax = max(w for _, w in valid)
+    block = max(int(block), wmax, 1)
+    c = np.empty(block + wmax + 1)
+    c[0] = 0.0
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        anchor = max(start - wmax, 0)          # local prefix sums restart here
+        seg = c[: stop - anchor + 1]
+        np.cumsum(x[anchor:stop], out=seg[1:])
+        for j, w in valid:
+            first = max(start, w - 1)          # first row with a full window
+            if first >= stop:
+                continue
+            a, b = first + 1 - anchor, stop + 1 - anchor
+            out[first:stop, j] = (seg[a:b] - seg[a - w:b - w]) / w
+
+    if has_nan:
+        # Integer prefix count of NaNs: exact, so no re-anchoring needed
+        bad = np.concatenate(([0], np.cumsum(nan_mask, dtype=np.int64)))
+        for j, w in valid:
+            out[w - 1:, j][(bad[w:] - bad[:-w]) > 0] = np.nan
+    return out
+
+
+def _values_and_index(series):
+    """(values, index) for a pd.Series or a PriceSeries."""
+    if isinstance(series, PriceSeries):
+        return series.closes, series.date_index()
+    return series.to_numpy(dtype=np.float64, na_value=np.nan), series.index
+
+
+def compute_sma_matrix(series, windows, block: int = SMA_ANCHOR_BLOCK) -> pd.DataFrame:
+    """
+    Compute SMAs for several windows in one vectorized call.
+
+    Args:
+        series (pd.Series | PriceSeries): Input numeric series in chronological order.
+        windows (iterable[int]): Window lengths.
+        block (int): Re-anchoring block size (see `sma_matrix`).
+
+    Returns:
+        pd.DataFrame: One column per window (column label = window), aligned
+        with the input index (the dates, for a PriceSeries).
+    """
+    wins = [int(w) for w in windows]
+    values, index = _values_and_index(series)
+    return pd.DataFrame(sma_matrix(values, wins, block), index=index, columns=wins)
+
 def compute_sma(series: pd.Series, window: int = 5) -> pd.Series:
     """
     Compute the Simple Moving Average (SMA) for a one-dimensional numeric Series.
@@ -18,8 +114,8 @@ def compute_sma(series: pd.Series, window: int = 5) -> pd.Series:
     the result is NaN for that position.
 
     Args:
-        series (pd.Series): Input numeric series (e.g., stock closing prices) 
-            in chronological order.
+        series (pd.Series | PriceSeries): Input numeric series (e.g., stock
+            closing prices) in chronological order.
         window (int): The number of consecutive observations to average. 
             Must be a positive integer.
 
@@ -28,25 +124,15 @@ def compute_sma(series: pd.Series, window: int = 5) -> pd.Series:
         The first `window - 1` positions will be NaN due to insufficient data.
 
     Notes:
-        - Use a positive integer for `window`; non-positive values are invalid.
+        - Use a positive integer for `window`; non-positive values are invalid
+          and give an all-NaN result.
+        - Any NaN inside a window makes that position NaN (as in pandas'
+          rolling mean).
         - This function does not coerce non-numeric values—ensure the input 
           Series is numeric before calling.
     """
-    # Manually compute the Simple Moving Average (SMA).
-    sma_values = [np.nan] * len(series)
-    if window <= 0 or len(series) < window:
-        return pd.Series(sma_values, index=series.index)
-
-    # Initialize first window sum
-    window_sum = series.iloc[:window].sum()
-    sma_values[window - 1] = window_sum / window
-
-    # Slide the window forward one step at a time
-    for i in range(window, len(series)):
-        window_sum += series.iloc[i] - series.iloc[i - window]  # add new, remove old
-        sma_values[i] = window_sum / window
-
-    return pd.Series(sma_values, index=series.index)
+    values, index = _values_and_index(series)
+    return pd.Series(sma_matrix(values, [window])[:, 0], index=index)
 
 
 # ----Velidation for SMA function----
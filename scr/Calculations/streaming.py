@@ -0,0 +1,327 @@
+# scr/Calculations/streaming.py
+"""
+Streaming Indicators
+
+Incremental counterparts of the batch functions, for live data that grows one
+bar at a time:
+
+- StreamingSMA     ↔ sma.compute_sma             (O(1) per bar, O(window) memory)
+- StreamingReturns ↔ daily_returns.dr_calc       (O(1) per bar, O(1) memory)
+- StreamingRuns    ↔ updown_runs.compute_updown_runs summary metrics
+                                                 (O(1) per bar, O(1) memory)
+
+Each object takes one new bar with `update(...)`. Live feeds also rewrite the
+newest (still forming) bar on every tick; `revise(...)` replaces the most
+recent bar instead of appending one, again in O(1).
+
+`LiveIndicators` bundles the three and feeds them from a refetched history,
+applying only the bars at or after the last one it has seen.
+"""
+
+from __future__ import annotations
+import math
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+
+# ---------- SMA ----------
+
+class StreamingSMA:
+    """
+    Simple Moving Average over the last `window` values.
+
+    Matches `compute_sma` on the same values (to float rounding): NaN until
+    `window` values have been seen, and NaN while any value in the window is
+    NaN. The running sum is re-summed exactly (math.fsum) once every `window`
+    updates, so rounding error cannot accumulate over long streams; that costs
+    O(window) every `window` bars, i.e. O(1) amortized.
+
+    Args:
+        window (int): Number of values averaged. Must be positive.
+
+    Raises:
+        ValueError: If `window` is not positive.
+    """
+
+    __slots__ = ("window", "_buf", "_count", "_sum", "_nans", "_since_resum")
+
+    def __init__(self, window: int):
+        if int(window) <= 0:
+            raise ValueError("window must be a positive integer.")
+        self.window = int(window)
+        self._buf = [0.0] * self.window   # ring buffer of the last `window` values
+        self._count = 0                   # values seen so far
+        self._sum = 0.0                   # sum of the non-NaN values in the window
+        self._nans = 0                    # NaNs in the window
+        self._since_resum = 0
+
+    def _add(self, v: float, sign: int) -> None:
+        if math.isnan(v):
+            self._nans += sign
+        else:
+            self._sum += sign * v
+
+    def _resum(self) -> None:
+        filled = self._buf if self._count >= self.window else self._buf[: self._count]
+        self._sum = math.fsum(v for v in filled if not math.isnan(v))
+        self._since_resum = 0
+
+    def update(self, value: float) -> float:
+        """Append one value and return the new SMA (NaN if undefined)."""
+        v = float(value)
+        pos = self._count % self.window
+        if self._count >= self.window:
+            self._add(self._buf[pos], -1)
+        self._buf[pos] = v
+        self._add(v, +1)
+        self._count += 1
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self._resum()
+        return self.value
+
+    def revise(self, value: float) -> float:
+        """Replace the most recent value (same bar, new price) and return the SMA."""
+        if self._count == 0:
+            return self.update(value)
+        v = float(value)
+        pos = (self._count - 1) % self.window
+        self._add(self._buf[pos], -1)
+        self._buf[pos] = v
+        self._add(v, +1)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self._count < self.window or self._nans:
+            return math.nan
+        return self._sum / self.window
+
+# ---------- daily returns ----------
+
+class StreamingReturns:
+    """
+    Bar-over-bar percentage return of the latest close, as `dr_calc` computes
+    it: ((P_t - P_{t-1}) / P_{t-1}) * 100. NaN until two closes have been seen.
+    """
+
+    __slots__ = ("_prev", "_last", "_count")
+
+    def __init__(self):
+        self._prev = math.nan   # close before the latest one
+        self._last = math.nan   # latest close
+        self._count = 0
+
+    def update(self, close: float) -> float:
+        """Append one close and return its return in percent."""
+        self._prev, self._last = self._last, float(close)
+        self._count += 1
+        return self.value
+
+    def revise(self, close: float) -> float:
+        """Replace the latest close and return its return in percent."""
+        if self._count == 0:
+            return self.update(close)
+        self._last = float(close)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self._count < 2:
+            return math.nan
+        return ((self._last - self._prev) / self._prev) * 100
+
+# ---------- up/down runs ----------
+
+def _no_run() -> Dict[str, Any]:
+    return {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None}
+
+
+class StreamingRuns:
+    """
+    Up/down streak state with the same rules as `compute_updown_runs`: streaks
+    are counted in price changes, flat bars break any streak, and NaN closes
+    are ignored (the batch function drops them). Indices count the non-NaN
+    bars seen so far, starting at 0.
+
+    Only aggregates are kept (no per-run table), so memory stays constant.
+    """
+
+    _FIELDS = ("n", "last_close", "last_date", "cur_dir", "cur_len", "cur_start_idx",
+               "cur_start", "up_runs", "down_runs", "up_days", "down_days",
+               "best_up", "best_down")
+
+    __slots__ = _FIELDS + ("_undo",)
+
+    def __init__(self):
+        self.n = 0
+        self.last_close: Optional[float] = None
+        self.last_date = None
+        self.cur_dir: Optional[str] = None   # "up" | "down" | None
+        self.cur_len = 0
+        self.cur_start_idx: Optional[int] = None
+        self.cur_start = None
+        self.up_runs = self.down_runs = 0
+        self.up_days = self.down_days = 0
+        self.best_up = _no_run()
+        self.best_down = _no_run()
+        self._undo: Optional[tuple] = None   # state before the latest bar
+
+    # ---------- helpers ----------
+
+    def _state(self) -> tuple:
+        return tuple(getattr(self, f) for f in self._FIELDS)
+
+    def _restore(self, state: tuple) -> None:
+        for f, v in zip(self._FIELDS, state):
+            setattr(self, f, v)
+
+    def _close_streak(self) -> None:
+        """Close the current streak at the previous bar (index n-1)."""
+        if self.cur_dir is None or self.cur_len == 0:
+            return
+        run = {"len": self.cur_len, "start": self.cur_start, "end": self.last_date,
+               "start_idx": self.cur_start_idx, "end_idx": self.n - 1}
+        if self.cur_dir == "up":
+            self.up_runs += 1
+            self.up_days += self.cur_len
+            if self.cur_len > self.best_up["len"]:
+                self.best_up = run
+        else:
+            self.down_runs += 1
+            self.down_days += self.cur_len
+            if self.cur_len > self.best_down["len"]:
+                self.best_down = run
+        self.cur_dir, self.cur_len, self.cur_start_idx, self.cur_start = None, 0, None, None
+
+    # ---------- updates ----------
+
+    def update(self, date, close: float) -> None:
+        """Append one bar (date, close). NaN closes are skipped."""
+        close = float(close)
+        if math.isnan(close):
+            self._undo = None   # nothing to revise: this bar was not counted
+            return
+        self._undo = self._state()
+        if self.last_close is not None:
+            step = "up" if close > self.last_close else "down" if close < self.last_close else None
+            if step is None:
+                self._close_streak()
+            elif self.cur_dir == step:
+                self.cur_len += 1
+            else:
+                self._close_streak()
+                self.cur_dir, self.cur_len = step, 1
+                self.cur_start_idx, self.cur_start = self.n - 1, self.last_date
+        self.n += 1
+        self.last_close = close
+        self.last_date = date
+
+    def revise(self, date, close: float) -> None:
+        """Replace the latest bar (e.g. the still-forming live bar)."""
+        if self._undo is not None:
+            self._restore(self._undo)
+        self.update(date, close)
+
+    # ---------- output ----------
+
+    def current(self) -> Dict[str, Any]:
+        """The open streak: {"dir", "len", "start", "start_idx"} (dir None if flat)."""
+        return {"dir": self.cur_dir, "len": self.cur_len,
+                "start": self.cur_start, "start_idx": self.cur_start_idx}
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Same scalar metrics as `compute_updown_runs` over every bar seen so far
+        (the open streak is counted as if the series ended now): up/down run
+        counts, day totals and longest up/down streaks.
+        """
+        up_runs, down_runs = self.up_runs, self.down_runs
+        up_days, down_days = self.up_days, self.down_days
+        best_up, best_down = self.best_up, self.best_down
+        if self.cur_dir is not None and self.cur_len:
+            run = {"len": self.cur_len, "start": self.cur_start, "end": self.last_date,
+                   "start_idx": self.cur_start_idx, "end_idx": self.n - 1}
+            if self.cur_dir == "up":
+                up_runs += 1
+                up_days += self.cur_len
+                best_up = run if self.cur_len > best_up["len"] else best_up
+            else:
+                down_runs += 1
+                down_days += self.cur_len
+                best_down = run if self.cur_len > best_down["len"] else best_down
+        return {
+            "up_runs_count": up_runs,
+            "down_runs_count": down_runs,
+            "up_days_total": up_days,
+            "down_days_total": down_days,
+            "longest_up": dict(best_up),
+            "longest_down": dict(best_down),
+        }
+
+# ---------- live feed ----------
+
+class LiveIndicators:
+    """
+    SMA, latest return and streak state for a live, periodically refetched history.
+
+    `feed(dates, closes)` applies only bars at or after the last date seen: the
+    last seen bar is revised in place, newer bars are appended. If the history
+    no longer starts where it did (rolling range, new session) or goes back in
+    time, the state is rebuilt from the new history, so the values always
+    describe exactly the history last fed.
+
+    Args:
+        sma_window (int): Window of the streaming SMA.
+    """
+
+    def __init__(self, sma_window: int = 20):
+        self.sma_window = int(sma_window)
+        self.reset()
+
+    def reset(self) -> None:
+        self.sma = StreamingSMA(self.sma_window)
+        self.returns = StreamingReturns()
+        self.runs = StreamingRuns()
+        self.first_date = None
+        self.last_date = None
+
+    def _apply(self, date: np.datetime64, close: float, revise: bool) -> None:
+        ts = pd.Timestamp(date)
+        if revise:
+            self.sma.revise(close)
+            self.returns.revise(close)
+            self.runs.revise(ts, close)
+        else:
+            self.sma.update(close)
+            self.returns.update(close)
+            self.runs.update(ts, close)
+        self.last_date = date
+
+    def feed(self, dates, closes) -> int:
+        """
+        Bring the indicators up to date with a (chronological, NaN-free) history.
+
+        Args:
+            dates (array-like): Bar timestamps, ascending.
+            closes (array-like): Close prices aligned with `dates`.
+
+        Returns:
+            int: Number of bars applied (revised or appended).
+        """
+        d = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+        c = np.asarray(closes, dtype=np.float64)
+        if len(d) == 0:
+            return 0
+        if self.first_date is None or d[0] != self.first_date or d[-1] < self.last_date:
+            self.reset()
+            self.first_date = d[0]
+        start = 0 if self.last_date is None else int(np.searchsorted(d, self.last_date, side="left"))
+        for i in range(start, len(d)):
+            self._apply(d[i], c[i], revise=d[i] == self.last_date)
+        return len(d) - start
+
+    def snapshot(self) -> Dict[str, Any]:
+        """{"sma", "return_pct", "streak", "runs"} for display."""
+        return {"sma": self.sma.value, "return_pct": self.returns.value,
+                "streak": self.runs.current(), "runs": self.runs.summary()}
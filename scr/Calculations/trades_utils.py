@@ -1,34 +1,61 @@
 # scr/Calculations/trades_utils.py
 from __future__ import annotations
 from typing import List, Dict
+import numpy as np
 import pandas as pd
+from scr.Calculations.price_series import PriceSeries, as_price_series
 
-def one_trade_as_rows(dates: pd.Series, prices: pd.Series, b_idx: int, s_idx: int) -> List[Dict]:
-    """Return a single trade in the same schema your page already displays."""
+
+def trades_from_indices(prices: PriceSeries, buy_idx, sell_idx, fee: float = 0.0) -> List[Dict]:
+    """
+    Build the UI trade rows from (buy, sell) index arrays, column-wise.
+
+    Prices and dates are gathered with one fancy-index per column; only the
+    final zip creates per-trade dicts. Pairs are taken as given (callers
+    filter unprofitable ones).
+
+    Args:
+        prices (PriceSeries): Series the indices refer to.
+        buy_idx, sell_idx (array-like of int): Aligned buy/sell positions.
+        fee (float): Deducted from each trade's profit (LC714).
+
+    Returns:
+        list[dict]: Rows with keys ["buy_date","buy_price","sell_date","sell_price","profit"].
+    """
+    b = np.asarray(buy_idx, dtype=np.int64)
+    s = np.asarray(sell_idx, dtype=np.int64)
+    closes = prices.closes
+    buy = closes[b].astype(np.float64).tolist()
+    sell = closes[s].astype(np.float64).tolist()
+    if prices.dates is not None:
+        buy_dates = pd.DatetimeIndex(prices.dates[b]).date.tolist()
+        sell_dates = pd.DatetimeIndex(prices.dates[s]).date.tolist()
+    else:
+        buy_dates, sell_dates = b.tolist(), s.tolist()
+    return [
+        {"buy_date": bd, "buy_price": bp, "sell_date": sd, "sell_price": sp, "profit": sp - bp - fee}
+        for bd, bp, sd, sp in zip(buy_dates, buy, sell_dates, sell)
+    ]
+
+
+def one_trade_as_rows(dates, prices, b_idx: int, s_idx: int) -> List[Dict]:
+    """
+    Return a single trade in the same schema your page already displays.
+    `dates` may be a PriceSeries (pass prices=None); indices are positions in it.
+    """
     # Guard clause: invalid indices or no profitable trade
     if b_idx < 0 or s_idx < 0:
         # Means no trade identified (e.g., LC121 found no profit opportunity)
         return []
 
-    # Normalize and reindex dates/prices to ensure integer-based lookup
-    dates = pd.to_datetime(dates).reset_index(drop=True)
-    prices = pd.to_numeric(prices, errors="coerce").reset_index(drop=True)
-
-    # Extract buy/sell prices for the given indices
-    buy = float(prices.iloc[b_idx])
-    sell = float(prices.iloc[s_idx])
+    # Positional lookup on the shared, NaN-free arrays
+    ps = as_price_series(dates, prices)
 
     # Sanity check: ignore zero or negative-profit trades
-    if not (sell > buy):
+    if not (ps.closes[s_idx] > ps.closes[b_idx]):
         return []
 
     # Return as list of dicts matching the Streamlit DataFrame schema:
     # ["buy_date","buy_price","sell_date","sell_price","profit"]
     # This format aligns with how `extract_trades` and LC121 results are displayed.
-    return [{
-        "buy_date": dates.iloc[b_idx].date(),
-        "buy_price": buy,
-        "sell_date": dates.iloc[s_idx].date(),
-        "sell_price": sell,
-        "profit": sell - buy
-    }]
+    return trades_from_indices(ps, [b_idx], [s_idx])
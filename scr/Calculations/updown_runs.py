@@ -7,19 +7,81 @@ changes in a price series. The function sanitizes input (coercing Date/Close typ
 sorting by date, resetting index), returns summary metrics (counts, totals, longest
 streaks), a detailed runs table, and a cleaned DataFrame ready for visualization.
 
+Runs are found with run-length encoding in NumPy (no Python loop): the sign of
+each change, the change points where the sign differs from the previous one, and
+the run lengths between them. Flat runs (sign 0) are dropped.
+
 Outputs (from compute_updown_runs):
 - up_runs_count, down_runs_count (int)
 - up_days_total, down_days_total (int)
 - longest_up, longest_down: dicts with {"len","start","end","start_idx","end_idx"}
 - runs: DataFrame columns ["dir","len","start","end","start_idx","end_idx"]
 - clean_df: cleaned DataFrame with ["Date","Close"] for plotting
+- length_hist: DataFrame indexed by run length ("len") with columns ["up","down"]
+  counting runs of each exact length
+- continuation: DataFrame indexed by "len" with columns ["up","down"]: the
+  probability that a run which reached length L goes on to length L+1
 
 
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, Tuple
+import numpy as np
 import pandas as pd
+from scr.Calculations.price_series import PriceSeries
+
+
+RUN_COLUMNS = ["dir", "len", "start", "end", "start_idx", "end_idx"]
+_DIR_LABELS = np.array(["down", "up"], dtype=object)
+
+
+def _no_run() -> Dict[str, Any]:
+    return {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None}
+
+
+def run_length_encode(signs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run-length encode a sign array.
+
+    Args:
+        signs (np.ndarray): Step signs (-1, 0, 1), e.g. `PriceSeries.signs`.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (starts, lengths, values) of
+        every maximal block of equal signs, flat blocks included.
+    """
+    s = np.asarray(signs)
+    if len(s) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, s[:0]
+    starts = np.concatenate(([0], np.flatnonzero(s[1:] != s[:-1]) + 1))
+    lengths = np.diff(np.append(starts, len(s)))
+    return starts, lengths, s[starts]
+
+
+def _run_stats(up_lengths: np.ndarray, down_lengths: np.ndarray) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Histogram of run lengths and continuation probabilities, via bincount."""
+    max_len = int(max(up_lengths.max(initial=0), down_lengths.max(initial=0)))
+    lens = pd.RangeIndex(1, max_len + 1, name="len")
+    hist, cont = {}, {}
+    for name, lengths in (("up", up_lengths), ("down", down_lengths)):
+        counts = np.bincount(lengths, minlength=max_len + 2)[1:]      # counts[L-1] = runs of length L
+        reached = np.cumsum(counts[::-1])[::-1]                        # reached[L-1] = runs of length >= L
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cont[name] = reached[1:] / reached[:-1]                    # P(len >= L+1 | len >= L)
+        hist[name] = counts[:-1]
+    return pd.DataFrame(hist, index=lens), pd.DataFrame(cont, index=lens)
+
+
+def _longest(lengths, starts, ends, dates) -> Dict[str, Any]:
+    """First longest run (ties keep the earliest, as the streak scan did)."""
+    if len(lengths) == 0:
+        return _no_run()
+    k = int(np.argmax(lengths))
+    si, ei = int(starts[k]), int(ends[k])
+    return {"len": int(lengths[k]), "start": pd.Timestamp(dates[si]), "end": pd.Timestamp(dates[ei]),
+            "start_idx": si, "end_idx": ei}
 
 
 def compute_updown_runs(df: pd.DataFrame) -> Dict[str, Any]:
@@ -29,7 +91,8 @@ def compute_updown_runs(df: pd.DataFrame) -> Dict[str, Any]:
 
     INPUT
     -----
-    df : DataFrame with at least ["Date", "Close"] (can be messy; types are coerced here)
+    df : DataFrame with at least ["Date", "Close"] (can be messy; types are coerced here),
+         or a PriceSeries (its cached signs are reused)
 
     RETURNS
     -------
@@ -42,122 +105,47 @@ def compute_updown_runs(df: pd.DataFrame) -> Dict[str, Any]:
                       "start_idx": int|None, "end_idx": int|None}
       - longest_down : same keys as longest_up
       - runs : DataFrame(columns=["dir", "len", "start", "end", "start_idx", "end_idx"])
-      - clean_df : DataFrame with ["Date","Close"] cleaned, sorted, index reset  <-- NEW
+      - clean_df : DataFrame with ["Date","Close"] cleaned, sorted, index reset
+      - length_hist : DataFrame(index="len", columns=["up", "down"]) run counts per length
+      - continuation : DataFrame(index="len", columns=["up", "down"]) P(run reaches L+1 | reached L)
     """
     # --- Clean & normalize input (this is now the single source of truth for viz too) ---
-    data = df.copy()
-    data["Date"] = pd.to_datetime(data.get("Date"), errors="coerce")
-    data["Close"] = pd.to_numeric(data.get("Close"), errors="coerce")
-    data = (
-        data.dropna(subset=["Date", "Close"])
-            .sort_values("Date")
-            .reset_index(drop=True)
-    )
-
-    # Provide empty result if not enough rows
-    if len(data) < 2:
-        empty_runs = pd.DataFrame(columns=["dir", "len", "start", "end", "start_idx", "end_idx"])
-        base = {
-            "up_runs_count": 0,
-            "down_runs_count": 0,
-            "up_days_total": 0,
-            "down_days_total": 0,
-            "longest_up":   {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None},
-            "longest_down": {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None},
-            "runs": empty_runs,
-            "clean_df": data[["Date", "Close"]] if not data.empty else pd.DataFrame(columns=["Date","Close"]),
-        }
-        return base
-
-    closes = data["Close"].tolist()
-    dates  = data["Date"].tolist()
-
-    # Aggregates
-    up_runs = down_runs = 0
-    up_days_total = down_days_total = 0
-
-    # Current streak
-    cur_dir: str | None = None   # "up" | "down" | None
-    cur_len = 0                  # number of steps in the streak
-    cur_start_idx: int | None = None
-
-    # Best streaks
-    best_up  = {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None}
-    best_down= {"len": 0, "start": None, "end": None, "start_idx": None, "end_idx": None}
-
-    # Collect all streaks
-    runs_list: List[dict] = []
-
-    def close_streak(end_idx: int):
-        nonlocal cur_dir, cur_len, cur_start_idx
-        nonlocal up_runs, down_runs, up_days_total, down_days_total, best_up, best_down, runs_list
-
-        if cur_dir is None or cur_len == 0 or cur_start_idx is None:
-            return
-
-        start_dt = dates[cur_start_idx]
-        end_dt   = dates[end_idx]
-        runs_list.append({
-            "dir": cur_dir,
-            "len": cur_len,
-            "start": start_dt,
-            "end": end_dt,
-            "start_idx": cur_start_idx,
-            "end_idx": end_idx,
-        })
-
-        if cur_dir == "up":
-            up_runs += 1
-            up_days_total += cur_len
-            if cur_len > best_up["len"]:
-                best_up = {"len": cur_len, "start": start_dt, "end": end_dt,
-                           "start_idx": cur_start_idx, "end_idx": end_idx}
-        else:
-            down_runs += 1
-            down_days_total += cur_len
-            if cur_len > best_down["len"]:
-                best_down = {"len": cur_len, "start": start_dt, "end": end_dt,
-                             "start_idx": cur_start_idx, "end_idx": end_idx}
-
-        # reset
-        cur_dir = None
-        cur_len = 0
-        cur_start_idx = None
-
-    # Single pass over changes
-    for i in range(1, len(closes)):
-        delta = closes[i] - closes[i - 1]
-        step = "up" if delta > 0 else "down" if delta < 0 else None
-
-        if step is None:
-            # flat → break
-            close_streak(i - 1)
-            continue
-
-        if cur_dir is None:
-            cur_dir = step
-            cur_len = 1
-            cur_start_idx = i - 1
-        elif cur_dir == step:
-            cur_len += 1
-        else:
-            # direction flipped
-            close_streak(i - 1)
-            cur_dir = step
-            cur_len = 1
-            cur_start_idx = i - 1
-
-    # close tail
-    close_streak(len(closes) - 1)
-    runs_df = pd.DataFrame(runs_list, columns=["dir", "len", "start", "end", "start_idx", "end_idx"])
+    # NOTE: the PriceSeries is memoized per frame, so reruns reuse it.
+    prices = PriceSeries.of(df)
+    data = prices.to_frame()
+
+    # Run-length encode the step signs; a run of steps k0..k1 spans rows k0..k1+1
+    starts, lengths, values = run_length_encode(prices.signs)
+    moving = values != 0
+    starts, lengths, values = starts[moving], lengths[moving], values[moving]
+    ends = starts + lengths
+    up = values > 0
+    down = ~up
+
+    dates = data["Date"].to_numpy()
+    if len(values):
+        runs_df = pd.DataFrame({
+            "dir": _DIR_LABELS[up.view(np.int8)],
+            "len": lengths.astype(np.int64),
+            "start": dates[starts],
+            "end": dates[ends],
+            "start_idx": starts.astype(np.int64),
+            "end_idx": ends.astype(np.int64),
+        }, columns=RUN_COLUMNS)
+    else:
+        runs_df = pd.DataFrame(columns=RUN_COLUMNS)
+
+    length_hist, continuation = _run_stats(lengths[up], lengths[down])
 
     return {
-        "up_runs_count": int(up_runs),
-        "down_runs_count": int(down_runs),
-        "up_days_total": int(up_days_total),
-        "down_days_total": int(down_days_total),
-        "longest_up": best_up,
-        "longest_down": best_down,
+        "up_runs_count": int(up.sum()),
+        "down_runs_count": int(down.sum()),
+        "up_days_total": int(lengths[up].sum()),
+        "down_days_total": int(lengths[down].sum()),
+        "longest_up": _longest(lengths[up], starts[up], ends[up], dates),
+        "longest_down": _longest(lengths[down], starts[down], ends[down], dates),
         "runs": runs_df,
         "clean_df": data[["Date", "Close"]],   # <-- ready for plotting
+        "length_hist": length_hist,
+        "continuation": continuation,
     }
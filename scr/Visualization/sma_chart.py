@@ -5,10 +5,9 @@ Visualization: Close vs. Simple Moving Average (SMA)
 Creates a Matplotlib figure comparing the Close price time series against a
 precomputed SMA series for the same dates.
 
+Matplotlib is imported on first call so importing this module stays cheap.
 """
 
-import matplotlib.pyplot as plt
-
 def plot_close_vs_sma(df, sma_series):
     """
     Plot Close prices and a corresponding SMA series on the same axes.
@@ -27,6 +26,8 @@ def plot_close_vs_sma(df, sma_series):
         - Assumes df["Date"] and sma_series are aligned (same order/length).
         - The function does not modify the input DataFrame or the SMA series.
     """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(10, 5))
     ax.plot(df["Date"], df["Close"], label="Close Price")
     ax.plot(df["Date"], sma_series, label="SMA")
@@ -7,11 +7,12 @@ Plots a Close-price time series segmented into upward (green) and downward
 longest up/down run) and optional boundary markers. Intended to work with
 the `clean_df` returned by `compute_updown_runs()`.
 
+Matplotlib is imported on first call so importing this module stays cheap.
 """
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+from scr.data.data_preprocessing import clean_date_close
 
 def _prep(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -28,10 +29,7 @@ def _prep(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Two-column DataFrame ['Date','Close'] ready for plotting.
     """
-    d = df.copy()
-    d["Date"]  = pd.to_datetime(d["Date"], errors="coerce")
-    d["Close"] = pd.to_numeric(d["Close"], errors="coerce")
-    d = d.dropna(subset=["Date", "Close"]).sort_values("Date").reset_index(drop=True)
+    d = clean_date_close(df)
     return d[["Date", "Close"]]
 
 def _resolve_indices(d: pd.DataFrame, highlight: dict | None):
@@ -84,6 +82,8 @@ def plot_updown_runs(df: pd.DataFrame, highlight: dict | None = None, show_marke
     -------
     matplotlib.figure.Figure
     """
+    import matplotlib.pyplot as plt
+
     d = _prep(df)
     dates = d["Date"].to_numpy()
     prices = d["Close"].to_numpy(dtype=float)
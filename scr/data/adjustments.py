@@ -0,0 +1,77 @@
+# scr/data/adjustments.py
+"""
+Split/Dividend Adjustment
+-------------------------
+The data layer downloads and stores RAW bars only (auto_adjust=False), which
+include Yahoo's 'Adj Close'. The per-row adjustment factor
+
+    factor_t = Adj Close_t / Close_t
+
+captures every split and dividend up to the latest bar, so the adjusted frame
+yfinance would return for auto_adjust=True can be rebuilt locally:
+
+    Open/High/Low/Close (adjusted) = raw value × factor_t,  Volume unchanged.
+
+This lets one cached download serve both raw and adjusted views.
+
+Note: Yahoo rescales all historical 'Adj Close' values after each new
+dividend. scr.data.cache re-checks a stored bar against a fresh download and
+refetches the whole range when its factor has changed, so the factors used
+here always come from one consistent download.
+"""
+
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+ADJUSTED_COLS = ["Open", "High", "Low", "Close"]
+
+
+def adjustment_factors(df: pd.DataFrame) -> np.ndarray:
+    """
+    Return Adj Close / Close per row as float64.
+
+    Rows where the ratio is undefined (missing values, zero Close) and frames
+    without an 'Adj Close' column get a factor of 1.0 (i.e. left unadjusted).
+    """
+    if "Adj Close" not in df.columns or "Close" not in df.columns:
+        return np.ones(len(df))
+    close = pd.to_numeric(df["Close"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    adj = pd.to_numeric(df["Adj Close"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = adj / close
+    factor[~np.isfinite(factor)] = 1.0
+    return factor
+
+
+def adjust_prices(df: pd.DataFrame, keep_adj_close: bool = False) -> pd.DataFrame:
+    """
+    Derive the auto-adjusted OHLC frame from raw bars (vectorized, one pass).
+
+    Args:
+        df (pd.DataFrame): Raw frame with 'Close' and 'Adj Close' (plus any of
+            'Open', 'High', 'Low', 'Volume' and other columns, kept as is).
+        keep_adj_close (bool): Keep the 'Adj Close' column (equal to the new
+            'Close'). yfinance's adjusted output drops it; so does the default.
+
+    Returns:
+        pd.DataFrame: New frame with the same index; price columns keep their
+            dtype (float32 stays float32). Returned unchanged (same object) if
+            there is no 'Adj Close' to adjust by.
+    """
+    if "Adj Close" not in df.columns:
+        return df
+    factor = adjustment_factors(df)
+    data = {}
+    for col in df.columns:
+        if col == "Adj Close" and not keep_adj_close:
+            continue
+        values = df[col]
+        if col in ADJUSTED_COLS:
+            raw = pd.to_numeric(values, errors="coerce").to_numpy()
+            dtype = raw.dtype if raw.dtype.kind == "f" else np.float64
+            values = (raw.astype(np.float64, copy=False) * factor).astype(dtype, copy=False)
+        data[col] = values
+    out = pd.DataFrame(data, index=df.index, copy=False)
+    out.attrs = dict(df.attrs)
+    return out
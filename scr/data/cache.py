@@ -0,0 +1,422 @@
+# scr/data/cache.py
+"""
+On-disk OHLCV Cache
+-------------------
+A small local cache that sits in front of every Yahoo Finance download made by
+`scr.data` (i.e. every request to a `cacheable` DataSource). Each
+(ticker, interval) combination is stored as ONE columnar file (Parquet when
+`pyarrow` is installed, pickle otherwise) plus a JSON sidecar recording which
+date ranges have already been fetched.
+
+Only RAW bars (auto_adjust=False, with 'Adj Close') are downloaded and stored;
+auto-adjusted requests are derived from them locally (scr.data.adjustments),
+so raw and adjusted views of a ticker cost one download and one file. The
+derived view is only as current as the stored Adj Close, which is why stored
+bars are revalidated (below).
+
+When a range is requested, only the missing sub-ranges are downloaded, merged
+into the stored frame and written back, so a repeated "Load Data" click is a
+local read instead of a network round-trip.
+
+Yahoo rewrites history after the fact (raw Close after a split, Adj Close
+after every dividend). Each gap download therefore re-fetches one bar that is
+already cached; if its Close or Adj Close no longer matches the stored value,
+the file and its sidecar are dropped and the whole range is fetched again,
+so old and new price scales are never stitched together. Requests that are
+fully cached make no gap download, so they re-check the newest complete bar
+instead, at most once per REVALIDATE_EVERY.
+
+Notes:
+    - Ranges are half-open [start, end), matching yfinance's exclusive `end`.
+    - Coverage is never recorded past today's date: the current (incomplete)
+      bar is always refetched.
+    - Set the PRICE_CACHE_DIR environment variable to move the cache.
+"""
+
+from __future__ import annotations
+import importlib.util
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scr.data.adjustments import adjust_prices
+from scr.data.singleflight import coalesce, request_key
+from scr.data.sources import get_source
+
+CACHE_DIR = os.environ.get(
+    "PRICE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "inf1002_prices"),
+)
+
+# Empty downloads shorter than this are weekends/holidays and are remembered as
+# covered; longer empty gaps may be a transient failure, so they are retried.
+MAX_EMPTY_GAP = pd.Timedelta(days=7)
+
+# Relative difference on a re-fetched cached bar that counts as rewritten history.
+REWRITE_RTOL = 1e-5
+
+# How long a fully cached file is served before one stored bar is re-checked.
+REVALIDATE_EVERY = pd.Timedelta(days=1)
+
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+Range = Tuple[pd.Timestamp, pd.Timestamp]
+
+# ---------- helpers ----------
+
+def _to_ts(value) -> pd.Timestamp:
+    """Convert a date-like value to a tz-naive, day-normalized Timestamp."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize()
+
+
+def _normalize_range(start, end) -> Range:
+    """Return the half-open [start, end) range; a missing end means 'up to today'."""
+    s = _to_ts(start)
+    e = _to_ts(end) if end is not None else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+    return s, e
+
+
+def _safe_name(ticker: str) -> str:
+    """Filesystem-safe ticker ('^GSPC' -> '_GSPC')."""
+    return "".join(ch if ch.isalnum() or ch in "-." else "_" for ch in ticker.upper())
+
+
+def _cache_paths(ticker: str, interval: str) -> Tuple[str, str]:
+    """Return (data_path, meta_path) for one ticker/interval (raw bars)."""
+    stem = os.path.join(CACHE_DIR, f"{_safe_name(ticker)}_{interval}_raw")
+    ext = ".parquet" if _HAS_PYARROW else ".pkl"
+    return stem + ext, stem + ".json"
+
+
+def _lock_for(path: str) -> threading.Lock:
+    """One lock per cache file so concurrent sessions don't interleave writes."""
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def _read_frame(path: str) -> Optional[pd.DataFrame]:
+    """Load a cached frame, or None if it is missing or unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path) if _HAS_PYARROW else pd.read_pickle(path)
+    except Exception:
+        return None
+
+
+def _write_frame(df: pd.DataFrame, path: str) -> None:
+    """Atomically replace the cached frame (write to temp file, then rename)."""
+    tmp = path + ".tmp"
+    if _HAS_PYARROW:
+        df.to_parquet(tmp)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _read_coverage(path: str) -> Tuple[List[Range], Optional[pd.Timestamp]]:
+    """Load the already-fetched [start, end) ranges and when the bars were last revalidated."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            raw = json.load(fh)
+        ranges = [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in raw.get("covered", [])]
+        validated = raw.get("validated")
+        return ranges, (pd.Timestamp(validated) if validated else None)
+    except Exception:
+        return [], None
+
+
+def _write_coverage(ranges: List[Range], validated: Optional[pd.Timestamp], path: str) -> None:
+    """Persist the coverage list (and last revalidation time) next to the data file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"covered": [[a.isoformat(), b.isoformat()] for a, b in ranges],
+                   "validated": validated.isoformat() if validated is not None else None}, fh)
+    os.replace(tmp, path)
+
+
+def merge_ranges(ranges: List[Range]) -> List[Range]:
+    """Merge overlapping/touching half-open ranges into a sorted minimal list."""
+    merged: List[Range] = []
+    for a, b in sorted(r for r in ranges if r[0] < r[1]):
+        if merged and a <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+        else:
+            merged.append((a, b))
+    return merged
+
+
+def missing_ranges(covered: List[Range], start: pd.Timestamp, end: pd.Timestamp) -> List[Range]:
+    """
+    Return the sub-ranges of [start, end) that are not in `covered`.
+
+    Args:
+        covered (list[tuple]): Sorted, merged [start, end) ranges already cached.
+        start (pd.Timestamp): Requested start (inclusive).
+        end (pd.Timestamp): Requested end (exclusive).
+
+    Returns:
+        list[tuple]: Gaps to download, in chronological order.
+    """
+    gaps: List[Range] = []
+    cursor = start
+    for a, b in covered:
+        if b <= cursor:
+            continue
+        if a >= end:
+            break
+        if a > cursor:
+            gaps.append((cursor, min(a, end)))
+        cursor = max(cursor, b)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _flatten(df: pd.DataFrame) -> pd.DataFrame:
+    """Flatten yfinance MultiIndex columns and name the index 'Date'."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df.index.name = "Date"
+    return df
+
+
+def _slice(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """Select rows in [start, end), comparing in the index's own timezone."""
+    idx = df.index
+    if getattr(idx, "tz", None) is not None:
+        start, end = start.tz_localize(idx.tz), end.tz_localize(idx.tz)
+    return df[(idx >= start) & (idx < end)]
+
+
+def _naive_days(idx: pd.Index) -> pd.DatetimeIndex:
+    """Index as tz-naive days (wall-clock date in the index's own timezone)."""
+    idx = pd.DatetimeIndex(idx)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.normalize()
+
+
+def _with_anchor(cached: Optional[pd.DataFrame], a: pd.Timestamp, b: pd.Timestamp,
+                 today: pd.Timestamp) -> Range:
+    """
+    Widen the gap [a, b) to include one complete cached bar (the last before
+    `a`, else the first at or after `b`), so the download overlaps the cache.
+    """
+    if cached is None or cached.empty:
+        return a, b
+    days = _naive_days(cached.index)
+    days = days[days < today]
+    before = days[days < a]
+    if len(before):
+        return before.max(), b
+    after = days[days >= b]
+    if len(after):
+        return a, after.min() + pd.Timedelta(days=1)
+    return a, b
+
+
+def _history_rewritten(cached: pd.DataFrame, part: pd.DataFrame, today: pd.Timestamp) -> bool:
+    """True if a complete bar present in both frames changed its Close or Adj Close."""
+    old_days, new_days = _naive_days(cached.index), _naive_days(part.index)
+    common = old_days.intersection(new_days)
+    common = common[common < today]   # today's bar is still forming
+    if not len(common):
+        return False
+    old_pos = old_days.get_indexer(common)
+    new_pos = new_days.get_indexer(common)
+    for col in ("Close", "Adj Close"):
+        if col not in cached.columns or col not in part.columns:
+            continue
+        old = pd.to_numeric(cached[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)[old_pos]
+        new = pd.to_numeric(part[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)[new_pos]
+        if not np.allclose(new, old, rtol=REWRITE_RTOL, atol=0.0, equal_nan=True):
+            return True
+    return False
+
+
+def _probe_rewritten(download: Callable[..., Optional[pd.DataFrame]], ticker: str, interval: str,
+                     cached: pd.DataFrame, today: pd.Timestamp) -> Optional[bool]:
+    """
+    Re-download the newest complete cached bar and compare it (see `_history_rewritten`).
+
+    Returns:
+        bool | None: Whether history was rewritten; None if it could not be
+            checked (no complete bar, upstream down, empty answer).
+    """
+    days = _naive_days(cached.index)
+    days = days[days < today]
+    if not len(days):
+        return None
+    day = days.max()
+    try:
+        part = download(ticker, day.date().isoformat(), (day + pd.Timedelta(days=1)).date().isoformat(), interval)
+    except (RuntimeError, OSError):
+        return None  # keep serving the cache; the next request re-checks
+    if part is None or part.empty:
+        return None
+    return _history_rewritten(cached, _flatten(part), today)
+
+
+def _discard(*paths: str) -> None:
+    """Remove cache files that may not exist."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _source_download(ticker: str, start, end, interval: str) -> Optional[pd.DataFrame]:
+    """Default downloader: one raw request for [start, end) to the active DataSource."""
+    return get_source().history(ticker, start=start, end=end, interval=interval, auto_adjust=False)
+
+# ---------- public API ----------
+
+def cached_download(
+    ticker: str,
+    start,
+    end=None,
+    interval: str = "1d",
+    auto_adjust: bool = True,
+    download: Optional[Callable[..., Optional[pd.DataFrame]]] = None,
+) -> pd.DataFrame:
+    """
+    Return raw OHLCV rows for [start, end), downloading only what is not cached.
+
+    Args:
+        ticker (str): Symbol, e.g. "AAPL".
+        start (str | date | datetime): Inclusive start of the range.
+        end (str | date | datetime | None): Exclusive end; None means today.
+        interval (str): yfinance interval ("1d", "1wk", ...). Part of the cache key.
+        auto_adjust (bool): Return split/dividend-adjusted OHLC (derived from
+            the cached raw bars, like yfinance's auto_adjust=True) instead of
+            raw bars with 'Adj Close'. Not part of the cache key.
+        download (callable, optional): `download(ticker, start, end, interval)`
+            returning a raw DatetimeIndex frame (with 'Adj Close'). Defaults to
+            the active DataSource (see scr.data.sources); local sources that
+            are not `cacheable` bypass the cache entirely.
+
+    Returns:
+        pd.DataFrame: Flattened yfinance-style frame with a DatetimeIndex named
+            'Date'. Empty if nothing is available for the range.
+
+    Notes:
+        Identical concurrent requests (same ticker, range, interval and
+        adjustment) are coalesced: one caller fetches, the others share its
+        result (see scr.data.singleflight).
+        If the upstream fails while some of the range is cached, the cached
+        rows are returned with `attrs["freshness"]` marking them stale and
+        carrying the error, instead of raising.
+    """
+    start_ts, end_ts = _normalize_range(start, end)
+    if download is not None:
+        raw = _cached_download(ticker, start_ts, end_ts, interval, download)
+    else:
+        # Raw and adjusted requests share one in-flight download
+        key = request_key("history", ticker, start_ts, end_ts, interval, False)
+        raw, shared = coalesce(key, lambda: _cached_download(ticker, start_ts, end_ts, interval, None))
+        if shared and not auto_adjust:
+            # Followers get their own column container so renames/assignments stay local
+            raw = raw.copy(deep=False)
+    return adjust_prices(raw) if auto_adjust else raw
+
+
+def _cached_download(ticker: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp, interval: str,
+                     download: Optional[Callable[..., Optional[pd.DataFrame]]]) -> pd.DataFrame:
+    """Raw-bar body of `cached_download` for a normalized range (one caller per key at a time)."""
+    if download is None:
+        if not get_source().cacheable:
+            df = _source_download(ticker, start_ts.date().isoformat(), end_ts.date().isoformat(), interval)
+            return _flatten(df) if df is not None else pd.DataFrame()
+        download = _source_download
+    data_path, meta_path = _cache_paths(ticker, interval)
+
+    with _lock_for(data_path):
+        cached = _read_frame(data_path)
+        covered, validated = _read_coverage(meta_path) if cached is not None else ([], None)
+
+        now = pd.Timestamp.now()
+        today = now.normalize()
+        while True:
+            gaps = missing_ranges(covered, start_ts, end_ts)
+            fresh: List[pd.DataFrame] = []
+            error: Optional[Exception] = None
+            rewritten = checked = False
+            for a, b in gaps:
+                lo, hi = _with_anchor(cached, a, b, today)
+                try:
+                    part = download(ticker, lo.date().isoformat(), hi.date().isoformat(), interval)
+                except (RuntimeError, OSError) as e:
+                    if cached is None and not fresh:
+                        raise
+                    error = e  # upstream down (FetchError/CircuitOpenError): serve what we have
+                    break
+                if part is not None and not part.empty:
+                    part = _flatten(part)
+                    if cached is not None and _history_rewritten(cached, part, today):
+                        rewritten = True
+                        break
+                    validated, checked = now, True   # stored bars agree with upstream now
+                    fresh.append(part)
+                elif b - a > MAX_EMPTY_GAP:
+                    continue  # possibly a failed request; don't remember it as covered
+                covered.append((a, min(b, today)))
+            if not gaps and cached is not None and (validated is None or now - validated >= REVALIDATE_EVERY):
+                # Fully cached: a dividend since the last check would leave every
+                # stored Adj Close (and so the adjusted view) on the old scale
+                verdict = _probe_rewritten(download, ticker, interval, cached, today)
+                rewritten = bool(verdict)
+                if verdict is False:
+                    validated, checked = now, True
+            if not rewritten:
+                break
+            # A split/dividend rescaled history since these bars were stored:
+            # drop them and fetch the requested range afresh
+            _discard(data_path, meta_path)
+            cached, covered, validated = None, [], None
+
+        if fresh:
+            parts = ([cached] if cached is not None else []) + fresh
+            cached = pd.concat(parts)
+            cached = cached[~cached.index.duplicated(keep="last")].sort_index()
+        if (gaps or checked) and cached is not None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            if fresh:
+                _write_frame(cached, data_path)
+            _write_coverage(merge_ranges(covered), validated, meta_path)
+
+    if cached is None:
+        return pd.DataFrame()
+    out = _slice(cached, start_ts, end_ts)
+    if error is not None:
+        out.attrs["freshness"] = {"source": f"{get_source().name} (cached)", "stale": True,
+                                  "error": str(error) or type(error).__name__}
+    return out
+
+
+def clear_cache(ticker: Optional[str] = None) -> int:
+    """
+    Delete cached files (all, or only those for `ticker`).
+
+    Returns:
+        int: Number of files removed.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    prefix = _safe_name(ticker) + "_" if ticker else ""
+    removed = 0
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix):
+            os.remove(os.path.join(CACHE_DIR, name))
+            removed += 1
+    return removed
@@ -0,0 +1,126 @@
+# scr/data/circuit_breaker.py
+"""
+Upstream Circuit Breaker
+------------------------
+Stops the app from hammering Yahoo Finance while it is down or rate-limiting us.
+
+States:
+    closed     → requests flow; consecutive failures are counted.
+    open       → after `failure_threshold` failures in a row, requests are
+                 rejected immediately (CircuitOpenError) for `reset_timeout` s.
+    half_open  → after the timeout, ONE trial request is let through; success
+                 closes the circuit, failure re-opens it.
+
+Only failures that survive the fetch client's own retries are recorded, so a
+single flaky request never trips the breaker.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Upstream unavailable (circuit open); retrying in {retry_in:.0f}s.")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds to stay open before a trial request.
+        clock (callable): Time source (seconds); injectable for benchmarks.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.last_error: Optional[str] = None
+
+    # ---------- state ----------
+
+    def _refresh(self) -> None:
+        """open → half_open once the timeout has elapsed (caller holds the lock)."""
+        if self._state == "open" and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = "half_open"
+            self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while requests would be rejected (does not reserve a trial)."""
+        with self._lock:
+            self._refresh()
+            return self._state == "open" or (self._state == "half_open" and self._trial_running)
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial request is allowed (0 if not open)."""
+        with self._lock:
+            self._refresh()
+            if self._state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    # ---------- transitions ----------
+
+    def allow(self) -> bool:
+        """
+        Whether a request may go upstream now. In half_open, only the first
+        caller gets True (the trial); it must report back via `record_*`.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == "closed":
+                return True
+            if self._state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def check(self) -> None:
+        """`allow()` that raises CircuitOpenError instead of returning False."""
+        if not self.allow():
+            raise CircuitOpenError(self.retry_in())
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.last_error = str(error) if error is not None else None
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = self._clock()
+                self._trial_running = False
+
+    def snapshot(self) -> dict:
+        """Status for the UI: {"state", "failures", "retry_in", "last_error"}."""
+        with self._lock:
+            self._refresh()
+            retry = 0.0
+            if self._state == "open":
+                retry = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            return {"state": self._state, "failures": self._failures,
+                    "retry_in": retry, "last_error": self.last_error}
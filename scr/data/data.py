@@ -8,12 +8,15 @@ This module ONLY handles:
 - returning a DataFrame with EXACTLY 6 headers:
   ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
 - simple save/load utilities
+
+Importing this module does no I/O; downloads only happen when a function is called.
 """
 
 from __future__ import annotations
 from typing import Optional, List, Tuple
 import pandas as pd
-import yfinance as yf
+from scr.data.cache import cached_download
+from scr.data.data_preprocessing import to_compact
 
 # --------------------------- public API --------------------------- #
 
@@ -34,11 +37,11 @@ def fetch_raw_yf(
     Return the RAW yfinance DataFrame (DatetimeIndex; columns may include
     'Open','High','Low','Close','Adj Close','Volume', possibly MultiIndex).
     No schema guarantees. Use data_preprocessing.standardize_ohlcv(...) next.
+    Served from the on-disk cache; only uncached date ranges are downloaded.
+    With `auto_adjust=True` the adjusted OHLC is derived from the cached raw
+    bars (scr.data.adjustments), so both variants share one download.
     """
-    df = yf.download(
-        ticker, start=start, end=end or None,
-        auto_adjust=auto_adjust, progress=False, group_by="column"
-    )
+    df = cached_download(ticker, start, end or None, auto_adjust=auto_adjust)
     if df is None or df.empty:
         raise RuntimeError("No data returned. Check ticker or date range.")
     return df
@@ -48,6 +51,7 @@ def fetch_dataset(
     start: str,
     end: Optional[str] = None,
     auto_adjust: bool = True,
+    compact: bool = False,
 ) -> pd.DataFrame:
     """
     Download daily OHLCV from Yahoo Finance and return a dataframe with six headers:
@@ -55,17 +59,14 @@ def fetch_dataset(
 
     Notes
     -----
-    - `auto_adjust=True` = Close is adjusted for splits/dividends.
+    - `auto_adjust=True` = Close is adjusted for splits/dividends (derived
+      locally from the raw bars' Adj Close / Close ratio).
     - No heavy cleaning here (your web/UI may do more). We only normalize columns.
+    - Served from the on-disk cache (scr.data.cache); repeat loads are local reads.
+    - `compact=True` returns float32 prices and int64 Volume (see
+      data_preprocessing.to_compact).
     """
-    df = yf.download(
-        ticker,
-        start=start,
-        end=end or None,
-        auto_adjust=auto_adjust,
-        progress=False,
-        group_by="column",    # avoids some MultiIndex cases
-    )
+    df = cached_download(ticker, start, end or None, auto_adjust=auto_adjust)
     if df is None or df.empty:
         raise RuntimeError("No data returned. Check ticker or date range.")
 
@@ -86,7 +87,7 @@ def fetch_dataset(
 
     # Final order: exactly 6 headers
     df = df[["Date", "Open", "High", "Low", "Close", "Volume"]]
-    return df
+    return to_compact(df) if compact else df
 
 def save_csv(df: pd.DataFrame, path: str) -> None:
     """Save the dataset to CSV (index disabled)."""
@@ -103,8 +104,6 @@ def dataset_summary(df: pd.DataFrame) -> str:
     last = df["Date"].max()
     return f"Rows: {n} | Range: {first.date()} → {last.date()}"
 
-print(dataset_summary(fetch_dataset("AAPL", "2023-01-01", "2023-10-01")))
-          
 if __name__ == "__main__":
     # 1. Fetch dataset
     df = fetch_dataset("AAPL", "2023-01-01", "2023-10-01")
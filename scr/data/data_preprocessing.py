@@ -1,18 +1,109 @@
 # scr/Calcultions/data/data_preprocessing.py
 from __future__ import annotations
-import io
+import importlib.util
+from typing import Iterator
+import numpy as np
 import pandas as pd
 
 CANONICAL_COLS = ["Open", "High", "Low", "Close", "Volume"]
+PRICE_COLS = ["Open", "High", "Low", "Close", "Adj Close"]
+COMPACT_PRICE_DTYPE = np.float32
+_NS_PER_DAY = 86_400 * 10**9
 
-def _is_datelike(series: pd.Series) -> bool:
+DATE_SNIFF_ROWS = 256  # rows parsed when guessing whether the first column holds dates
+CLOSE_ALIASES = ("Adj Close", "Price")  # used as Close only when no Close column exists
+
+def _is_datelike(series: pd.Series, sample: int = DATE_SNIFF_ROWS) -> bool:
+    """Guess from the first `sample` values whether a column holds dates."""
     try:
-        parsed = pd.to_datetime(series, errors="coerce")
+        parsed = pd.to_datetime(series.iloc[:sample], errors="coerce")
         return parsed.notna().mean() > 0.8
     except Exception:
         return False
 
-def standardize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+def _numeric_values(col: pd.Series) -> np.ndarray:
+    """Coerce one column to a NumPy numeric array (NaN for anything unparsable)."""
+    out = pd.to_numeric(col, errors="coerce")
+    if isinstance(out.dtype, np.dtype) and out.dtype.kind in "iuf":
+        return out.to_numpy()
+    return out.to_numpy(dtype="float64", na_value=np.nan)
+
+def _ffill_bfill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill then back-fill NaNs in a 1-D array (no-op for ints/no gaps)."""
+    if values.dtype.kind != "f":
+        return values
+    missing = np.isnan(values)
+    if not missing.any() or missing.all():
+        return values
+    pos = np.where(missing, 0, np.arange(len(values)))
+    np.maximum.accumulate(pos, out=pos)
+    filled = values[pos]
+    first = int(np.argmax(~missing))
+    filled[:first] = values[first]
+    return filled
+
+def _compact_values(col: str, values: np.ndarray) -> np.ndarray:
+    """float32 for prices, int64 for Volume (NaN → 0); other columns unchanged."""
+    if col == "Volume":
+        if values.dtype.kind == "f":
+            values = np.nan_to_num(values, nan=0.0).round()
+        return values.astype(np.int64, copy=False)
+    if col in PRICE_COLS:
+        return values.astype(COMPACT_PRICE_DTYPE, copy=False)
+    return values
+
+def decode_dates(values, errors: str = "coerce"):
+    """
+    Convert any stored date representation to datetime64.
+
+    Integer inputs are treated as compact dates: int32 (or narrower) as day
+    numbers since 1970-01-01, int64 as epoch nanoseconds. Anything else goes
+    through `pd.to_datetime`. Returns a Series for Series input, otherwise a
+    DatetimeIndex.
+    """
+    dtype = getattr(values, "dtype", None)
+    if dtype is not None and dtype.kind in "iu":
+        unit = "D" if dtype.itemsize <= 4 else "ns"
+        return pd.to_datetime(values, unit=unit)
+    return pd.to_datetime(values, errors=errors)
+
+def to_compact(df: pd.DataFrame, date_unit: str = "ns") -> pd.DataFrame:
+    """
+    Opt-in compact representation of a price frame (roughly half the memory).
+
+    - Open/High/Low/Close/Adj Close → float32
+    - Volume → int64 (missing volume becomes 0)
+    - 'Date' column: "ns" keeps datetime64[ns] (already 8-byte integers),
+      "day" stores int32 day numbers since 1970-01-01. A DatetimeIndex is kept.
+
+    `scr.Calculations` accepts these frames directly (see `decode_dates`); it
+    does not upcast prices back to float64.
+
+    Raises:
+        ValueError: If `date_unit` is not "ns" or "day".
+    """
+    if date_unit not in ("ns", "day"):
+        raise ValueError("date_unit must be 'ns' or 'day'.")
+    data = {}
+    for col in df.columns:
+        values = df[col]
+        if col == "Date":
+            dates = pd.DatetimeIndex(decode_dates(values))
+            if dates.tz is not None:
+                dates = dates.tz_localize(None)
+            data[col] = (
+                (dates.as_unit("ns").asi8 // _NS_PER_DAY).astype(np.int32)
+                if date_unit == "day" else dates.as_unit("ns").to_numpy()
+            )
+        elif col in PRICE_COLS or col == "Volume":
+            data[col] = _compact_values(col, _numeric_values(values))
+        else:
+            data[col] = values.to_numpy()
+    return pd.DataFrame(data, index=df.index, copy=False)
+
+def standardize_ohlcv(
+    df: pd.DataFrame, assume_sorted: bool = False, fill: bool = True, compact: bool = False
+) -> pd.DataFrame:
     """
     Normalize ANY price dataset to OHLCV with a DatetimeIndex.
     - Flattens MultiIndex columns
@@ -21,57 +112,87 @@ def standardize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
     - Ensures ['Open','High','Low','Close','Volume'] exist
     - Builds a DatetimeIndex from index/'Date'/first datelike col
     - Sorts, drops duplicate dates, minimal ffill/bfill, coerces numerics
-    """
-    if not isinstance(df, pd.DataFrame):
-        raise TypeError("standardize_ohlcv expects a pandas DataFrame")
 
-    df = df.copy()
+    Works column by column on NumPy arrays: headers are mapped without renaming
+    the input, the date column is sniffed from a small sample, each needed column
+    is coerced once, and sorting/de-duplication/NaT removal are folded into one
+    row selection applied per column. The input frame is never copied or modified;
+    when a column needs no coercion or reordering the result shares its memory,
+    so `.copy()` the result before mutating it in place.
 
-    # Flatten MultiIndex columns if present
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
+    Args:
+        df (pd.DataFrame): Raw price data (yfinance output, CSV/Excel upload, ...).
+        assume_sorted (bool): Caller guarantees dates are already ascending; skips
+            the monotonic check and sort. Passing unsorted input with this set
+            is the caller's error: the output is then unsorted too (and only
+            adjacent duplicate dates are dropped).
+        fill (bool): Forward/back-fill gaps. Chunked readers pass False and fill
+            once after the chunks are joined, so gaps can be filled across chunks.
+        compact (bool): float32 prices and int64 Volume (see `to_compact`).
 
-    # Normalize header casing/spacing
-    df.rename(columns={c: str(c).strip().title() for c in df.columns}, inplace=True)
+    Returns:
+        pd.DataFrame: Columns ['Open','High','Low','Close','Volume'] with a
+            DatetimeIndex named 'Date' (ascending, unique; see `assume_sorted`).
 
-    # Map common variations to Close
-    if "Adj Close" in df.columns and "Close" not in df.columns:
-        df.rename(columns={"Adj Close": "Close"}, inplace=True)
-    if "Price" in df.columns and "Close" not in df.columns:
-        df.rename(columns={"Price": "Close"}, inplace=True)
+    Raises:
+        TypeError: If `df` is not a DataFrame.
+        ValueError: If no Date column or DatetimeIndex can be found.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("standardize_ohlcv expects a pandas DataFrame")
+
+    # Map normalized header -> column position (first occurrence wins)
+    cols = df.columns.get_level_values(0) if isinstance(df.columns, pd.MultiIndex) else df.columns
+    pos: dict = {}
+    for i, c in enumerate(cols):
+        pos.setdefault(str(c).strip().title(), i)
+    if "Close" not in pos:
+        for alias in CLOSE_ALIASES:
+            if alias in pos:
+                pos["Close"] = pos[alias]
+                break
 
-    # Ensure a DatetimeIndex
+    # Locate dates: index, 'Date' column, or a datelike first column
     if isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index, errors="coerce")
-        df.index.name = df.index.name or "Date"
-    elif "Date" in df.columns:
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-        df = df.dropna(subset=["Date"]).set_index("Date")
+        dates = df.index
+    elif "Date" in pos:
+        dates = pd.DatetimeIndex(pd.to_datetime(df.iloc[:, pos["Date"]], errors="coerce"))
+    elif len(cols) > 0 and _is_datelike(df.iloc[:, 0]):
+        dates = pd.DatetimeIndex(pd.to_datetime(df.iloc[:, 0], errors="coerce"))
     else:
-        if len(df.columns) > 0 and _is_datelike(df.iloc[:, 0]):
-            col0 = df.columns[0]
-            df[col0] = pd.to_datetime(df[col0], errors="coerce")
-            df = df.dropna(subset=[col0]).set_index(col0)
-            df.index.name = "Date"
-        else:
-            raise ValueError("No Date column or DatetimeIndex found (and could not infer one).")
+        raise ValueError("No Date column or DatetimeIndex found (and could not infer one).")
 
-    # Guarantee canonical columns
-    for col in CANONICAL_COLS:
-        if col not in df.columns:
-            df[col] = pd.NA
-    df = df[CANONICAL_COLS]
+    # One row selection: drop NaT, stable-sort by date, keep the last duplicate
+    keys = dates.asi8
+    rows = None
+    nat = dates.isna()
+    if nat.any():
+        rows = np.flatnonzero(~nat)
+        keys = keys[rows]
+    if not assume_sorted and len(keys) > 1 and not (keys[1:] >= keys[:-1]).all():
+        order = np.argsort(keys, kind="stable")
+        rows = order if rows is None else rows[order]
+        keys = keys[order]
+    if len(keys) > 1:
+        last = np.empty(len(keys), dtype=bool)
+        np.not_equal(keys[1:], keys[:-1], out=last[:-1])
+        last[-1] = True
+        if not last.all():
+            rows = np.flatnonzero(last) if rows is None else rows[last]
 
-    # Clean index & fill small gaps
-    df = df.sort_index()
-    df = df[~df.index.duplicated(keep="last")]
-    df = df.ffill().bfill()
-
-    # Coerce numerics
+    index = dates if rows is None else dates[rows]
+    data = {}
     for col in CANONICAL_COLS:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+        if col in pos:
+            values = _numeric_values(df.iloc[:, pos[col]])
+            if rows is not None:
+                values = values[rows]
+        else:
+            values = np.full(len(index), np.nan)
+        values = _ffill_bfill(values) if fill else values
+        data[col] = _compact_values(col, values) if compact else values
 
-    return df
+    return pd.DataFrame(data, index=pd.DatetimeIndex(index, name="Date"), copy=False)
 
 def to_price_series(df: pd.DataFrame) -> pd.Series:
     """Close as float Series with a DatetimeIndex (works with Date column or index)."""
@@ -87,6 +208,34 @@ def to_price_series(df: pd.DataFrame) -> pd.Series:
     s.index.name = "Date"
     return s
 
+def clean_date_close(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Date/Close-clean version of `df`: datetime 'Date', numeric 'Close', no missing
+    values in either, sorted by Date with a fresh RangeIndex.
+
+    Returns `df` itself (no copy) when it already satisfies all of that, which is
+    the normal case for frames coming from the price store or `fetch_prices`;
+    otherwise returns a cleaned copy. Treat the result as read-only.
+    """
+    date, close = df.get("Date"), df.get("Close")
+    if date is not None and date.dtype.kind in "iu":
+        # Compact day-number/epoch dates: decode just this column, keep prices as stored
+        df = df.assign(Date=decode_dates(date))
+        date = df["Date"]
+    if (
+        date is not None and close is not None
+        and pd.api.types.is_datetime64_any_dtype(date)
+        and pd.api.types.is_numeric_dtype(close)
+        and isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+        and date.is_monotonic_increasing
+        and not date.isna().any() and not close.isna().any()
+    ):
+        return df
+    d = df.copy()
+    d["Date"] = decode_dates(d.get("Date"))
+    d["Close"] = pd.to_numeric(d.get("Close"), errors="coerce")
+    return d.dropna(subset=["Date", "Close"]).sort_values("Date").reset_index(drop=True)
+
 def quick_summary(df: pd.DataFrame) -> str:
     """One-line summary: row count and date range."""
     if df is None or df.empty:
@@ -95,24 +244,250 @@ def quick_summary(df: pd.DataFrame) -> str:
     if isinstance(df.index, pd.DatetimeIndex) and len(df.index) > 0:
         start = df.index.min().date(); end = df.index.max().date()
     if (start is None or end is None) and "Date" in df.columns:
-        d = pd.to_datetime(df["Date"], errors="coerce").dropna()
+        d = pd.Series(decode_dates(df["Date"])).dropna()
         if not d.empty:
             start = start or d.min().date(); end = end or d.max().date()
     return f"Rows: {len(df)} | Range: {start} → {end}" if start and end else f"Rows: {len(df)} | Range: N/A"
 
-def load_file_clean(file_obj) -> pd.DataFrame:
+class IngestBudgetError(ValueError):
+    """Raised when an upload exceeds the configured row or memory budget."""
+
+CSV_CHUNK_ROWS = 250_000  # rows per chunk for the pandas engine (≈ same bytes for pyarrow)
+_BYTES_PER_ROW = 64       # rough CSV bytes per OHLCV row, used to size pyarrow blocks
+
+def _csv_header(file_obj) -> list | None:
+    """Peek the header row of a seekable file without consuming it."""
+    if not (hasattr(file_obj, "seek") and hasattr(file_obj, "tell")):
+        return None
+    pos = file_obj.tell()
+    line = file_obj.readline()
+    file_obj.seek(pos)
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    return [h.strip().strip('"') for h in line.rstrip("\r\n").split(",")] if line else None
+
+def _pyarrow_batches(file_obj, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Stream a CSV as pandas frames using pyarrow's incremental reader."""
+    from pyarrow import csv as pacsv
+    import pyarrow as pa
+
+    header = _csv_header(file_obj)
+    # Price columns are read as float64 up front so type inference on the first
+    # block can't clash with later blocks (e.g. int Volume, then 1.5e6).
+    types = {h: pa.float64() for h in header or [] if h.title() in CANONICAL_COLS + list(CLOSE_ALIASES)}
+    reader = pacsv.open_csv(
+        file_obj,
+        read_options=pacsv.ReadOptions(block_size=max(1 << 20, chunk_rows * _BYTES_PER_ROW)),
+        convert_options=pacsv.ConvertOptions(column_types=types, strings_can_be_null=True),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+def iter_csv_chunks(
+    file_obj,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    max_rows: int | None = None,
+    max_bytes: int | None = None,
+    engine: str = "auto",
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV incrementally and yield standardized OHLCV chunks.
+
+    Each chunk goes through `standardize_ohlcv(..., fill=False)`, so only one
+    chunk of raw text is in memory at a time. Chunks are sorted and unique
+    within themselves; `load_csv_streaming` fixes ordering and gaps across them.
+
+    Args:
+        file_obj: Path or binary file-like object (e.g. a Streamlit upload).
+        chunk_rows (int): Target rows per chunk.
+        max_rows (int | None): Abort once more than this many rows were read.
+        max_bytes (int | None): Abort once the standardized chunks exceed this
+            many bytes in memory.
+        engine (str): "pyarrow", "c" (pandas), or "auto" (pyarrow if installed).
+
+    Yields:
+        pd.DataFrame: OHLCV chunk with a DatetimeIndex named 'Date'.
+
+    Raises:
+        IngestBudgetError: If a row or memory budget is exceeded.
+        ValueError: If the CSV has no usable date column.
+    """
+    if engine == "auto":
+        engine = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+    raw_chunks = (
+        _pyarrow_batches(file_obj, chunk_rows) if engine == "pyarrow"
+        else pd.read_csv(file_obj, chunksize=chunk_rows, engine="c")
+    )
+
+    rows = used = 0
+    for raw in raw_chunks:
+        rows += len(raw)
+        if max_rows is not None and rows > max_rows:
+            raise IngestBudgetError(f"File exceeds the row budget ({max_rows:,} rows).")
+        chunk = standardize_ohlcv(raw, fill=False)
+        used += int(chunk.memory_usage(index=True).sum())
+        if max_bytes is not None and used > max_bytes:
+            raise IngestBudgetError(f"File exceeds the memory budget ({max_bytes / 2**20:,.0f} MiB).")
+        yield chunk
+
+def load_csv_streaming(
+    file_obj,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    max_rows: int | None = None,
+    max_bytes: int | None = None,
+    engine: str = "auto",
+) -> pd.DataFrame:
+    """
+    Chunked CSV → canonical ['Date','Open','High','Low','Close','Volume'] frame.
+
+    Peak memory is roughly the standardized output plus one raw chunk, instead
+    of the whole file as bytes plus a fully parsed object frame. If the pyarrow
+    reader rejects the file mid-stream (odd quoting, mixed types), a seekable
+    input is re-read with the pandas C engine. Budgets behave as in
+    `iter_csv_chunks`.
+
+    Raises:
+        IngestBudgetError: If a budget is exceeded.
+        ValueError: If nothing could be parsed.
+    """
+    def read(eng: str) -> list:
+        return list(iter_csv_chunks(file_obj, chunk_rows, max_rows, max_bytes, eng))
+
+    try:
+        chunks = read(engine)
+    except IngestBudgetError:
+        raise
+    except Exception:
+        if engine == "c" or not hasattr(file_obj, "seek"):
+            raise
+        file_obj.seek(0)
+        chunks = read("c")
+    if not chunks:
+        raise ValueError("CSV contained no rows.")
+
+    # Chunks are already numeric; this re-sorts/de-dups across chunk borders and fills gaps.
+    df = standardize_ohlcv(pd.concat(chunks) if len(chunks) > 1 else chunks[0])
+    return df.reset_index()[["Date", "Open", "High", "Low", "Close", "Volume"]]
+
+EXCEL_SNIFF_ROWS = 10  # rows per sheet inspected when looking for the OHLCV header
+
+def _sniff_header(rows: list) -> tuple | None:
+    """
+    Find the OHLCV header among the first rows of a sheet.
+
+    Returns:
+        tuple | None: (header_row_offset, {canonical name: column position})
+            with at least 'Date' and 'Close', or None if the rows don't look
+            like price data.
+    """
+    for r, row in enumerate(rows):
+        pos: dict = {}
+        for i, cell in enumerate(row):
+            if cell is not None:
+                pos.setdefault(str(cell).strip().title(), i)
+        if "Close" not in pos:
+            alias = next((a for a in CLOSE_ALIASES if a in pos), None)
+            if alias is None:
+                continue
+            pos["Close"] = pos[alias]
+        if "Date" not in pos:
+            # Unnamed first column holding dates (e.g. an exported index)
+            below = pd.Series([row_[0] for row_ in rows[r + 1:] if row_])
+            if below.empty or not _is_datelike(below):
+                continue
+            pos["Date"] = 0
+        return r, {c: pos[c] for c in ["Date"] + CANONICAL_COLS if c in pos}
+    return None
+
+def _typed_frame(columns: dict) -> pd.DataFrame:
+    """Build Date/OHLCV columns from raw cell lists and standardize them."""
+    data = {"Date": pd.to_datetime(pd.Series(columns.pop("Date"), dtype=object), errors="coerce")}
+    for name, cells in columns.items():
+        data[name] = pd.to_numeric(pd.Series(cells, dtype=object), errors="coerce")
+    return standardize_ohlcv(pd.DataFrame(data)).reset_index()[["Date"] + CANONICAL_COLS]
+
+def _excel_openpyxl(file_obj, sniff_rows: int) -> pd.DataFrame:
+    """Read-only openpyxl path: sniff each sheet's header, stream one sheet."""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            head = [tuple(r) for r in ws.iter_rows(max_row=sniff_rows, values_only=True)]
+            found = _sniff_header(head)
+            if found is None:
+                continue
+            header_row, pos = found
+            columns = {name: [] for name in pos}
+            items = list(pos.items())
+            width = max(pos.values()) + 1
+            for row in ws.iter_rows(min_row=header_row + 2, max_col=width, values_only=True):
+                for name, i in items:
+                    columns[name].append(row[i] if i < len(row) else None)
+            return _typed_frame(columns)
+    finally:
+        wb.close()
+    raise ValueError("No sheet with Date and Close columns found.")
+
+def _excel_pandas(file_obj, sniff_rows: int) -> pd.DataFrame:
+    """pandas fallback (.xls, or openpyxl missing): sniff with nrows, parse one sheet."""
+    xl = pd.ExcelFile(file_obj)
+    for name in xl.sheet_names:
+        head = xl.parse(name, header=None, nrows=sniff_rows)
+        rows = [tuple(None if pd.isna(v) else v for v in r) for r in head.itertuples(index=False)]
+        found = _sniff_header(rows)
+        if found is None:
+            continue
+        header_row, pos = found
+        body = xl.parse(name, header=None, skiprows=header_row + 1, usecols=sorted(set(pos.values())))
+        columns = {c: body[i].tolist() for c, i in pos.items()}
+        return _typed_frame(columns)
+    raise ValueError("No sheet with Date and Close columns found.")
+
+def load_excel_ohlcv(file_obj, sniff_rows: int = EXCEL_SNIFF_ROWS) -> pd.DataFrame:
+    """
+    Read the OHLCV sheet of an Excel workbook without parsing the others.
+
+    Every sheet's first `sniff_rows` rows are read (openpyxl read-only mode
+    for .xlsx) to find a header with Date and Close. Only that sheet is then
+    streamed, and only its Date/OHLCV cells are kept.
+
+    Args:
+        file_obj: Path or binary file-like object (.xlsx or .xls).
+        sniff_rows (int): Rows per sheet inspected to locate the header.
+
+    Returns:
+        pd.DataFrame: Canonical ['Date','Open','High','Low','Close','Volume'].
+
+    Raises:
+        ValueError: If no sheet looks like OHLCV data.
+    """
+    if hasattr(file_obj, "read"):
+        file_obj.seek(0)
+        head = file_obj.read(4)
+        file_obj.seek(0)
+    else:
+        with open(file_obj, "rb") as fh:
+            head = fh.read(4)
+    # .xlsx files are zip archives; .xls (and anything without openpyxl) goes through pandas
+    if head[:2] == b"PK" and importlib.util.find_spec("openpyxl") is not None:
+        return _excel_openpyxl(file_obj, sniff_rows)
+    return _excel_pandas(file_obj, sniff_rows)
+
+def load_file_clean(file_obj, max_rows: int | None = None, max_bytes: int | None = None) -> pd.DataFrame:
     """
     Read CSV or Excel (uploaded file-like) and return standardized OHLCV with a 'Date' column.
+
+    CSVs are streamed in chunks (see `load_csv_streaming`); `max_rows` and
+    `max_bytes` cap how much of an upload is accepted (IngestBudgetError).
     """
     try:
-        buf = io.BytesIO(file_obj.read()) if hasattr(file_obj, "read") else file_obj
-        df = pd.read_csv(buf)
+        return load_csv_streaming(file_obj, max_rows=max_rows, max_bytes=max_bytes)
+    except IngestBudgetError:
+        raise
+    except Exception:
+        pass  # not a CSV we can read → try Excel
+    try:
+        return load_excel_ohlcv(file_obj)
     except Exception:
-        try:
-            if hasattr(file_obj, "seek"):
-                file_obj.seek(0)
-            df = pd.read_excel(file_obj)
-        except Exception:
-            raise RuntimeError("Failed to read uploaded file as CSV or Excel.")
-    df = standardize_ohlcv(df).reset_index()
-    return df[["Date", "Open", "High", "Low", "Close", "Volume"]]
+        raise RuntimeError("Failed to read uploaded file as CSV or Excel.")
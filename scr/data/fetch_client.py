@@ -0,0 +1,365 @@
+# scr/data/fetch_client.py
+"""
+Upstream Fetch Client
+---------------------
+All Yahoo Finance calls made by `YFinanceSource` go through one process-wide
+`FetchClient`, which adds what a bare `yf.download` call lacks:
+
+- a pooled HTTP session shared by every request (curl_cffi when installed,
+  otherwise a `requests.Session` with a sized connection pool),
+- a per-attempt timeout,
+- retries with jittered exponential backoff ("full jitter") for transient
+  failures (timeouts, connection resets, rate limits, 5xx),
+- a cap on concurrent upstream requests across all sessions and pages,
+- a circuit breaker (scr.data.circuit_breaker) that fails fast after
+  repeated exhausted failures instead of piling more requests on.
+
+The client is asyncio-native and runs on its own background event loop. The
+blocking yfinance calls execute on a small thread pool sized to the
+concurrency cap. A concurrency slot is held until the worker thread really
+finishes, not just until the awaiting side times out, so a hung upstream call
+cannot leave retries queued behind it in the pool. Sync wrappers (`history`,
+`snapshot`) let Streamlit pages and the rest of `scr.data` use it unchanged;
+async callers can await `history_async` / `snapshot_async` /
+`gather_history` directly.
+
+Tuning (environment variables, read when the client is created):
+    FETCH_MAX_CONCURRENCY  (default 4)
+    FETCH_TIMEOUT          seconds per attempt (default 10)
+    FETCH_RETRIES          retries after the first attempt (default 3)
+"""
+
+from __future__ import annotations
+import asyncio
+import importlib.util
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Union
+import pandas as pd
+from scr.data.circuit_breaker import CircuitBreaker
+
+_HAS_CURL_CFFI = importlib.util.find_spec("curl_cffi") is not None
+
+# Intervals for which yf.download drops the exchange timezone by default
+_DAILY_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+# Columns yfinance's Ticker.history adds that yf.download does not return
+_EVENT_COLUMNS = ["Dividends", "Stock Splits", "Capital Gains"]
+
+# yfinance exceptions that will not go away on retry (bad symbol/period, no data)
+_PERMANENT_ERRORS = {"YFTickerMissingError", "YFPricesMissingError", "YFInvalidPeriodError", "YFTzMissingError"}
+
+# Names of transient network/rate-limit errors across requests, curl_cffi and yfinance
+_TRANSIENT_ERRORS = {
+    "YFRateLimitError", "RequestsError", "ConnectionError", "Timeout",
+    "ConnectTimeout", "ReadTimeout", "ChunkedEncodingError", "CurlError",
+}
+
+
+class FetchError(RuntimeError):
+    """
+    Raised when an upstream request fails for good.
+
+    Attributes:
+        attempts (int): Number of attempts made.
+        retryable (bool): Whether the last error looked transient (i.e. the
+            retry budget ran out rather than the request being invalid).
+    """
+
+    def __init__(self, message: str, attempts: int, retryable: bool):
+        super().__init__(message)
+        self.attempts = attempts
+        self.retryable = retryable
+
+# ---------- helpers ----------
+
+def is_transient(exc: BaseException) -> bool:
+    """True if `exc` looks like a temporary upstream/network failure worth retrying."""
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names & _PERMANENT_ERRORS:
+        return False
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)) or names & _TRANSIENT_ERRORS:
+        return True
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    text = str(exc).lower()
+    return "too many requests" in text or "rate limit" in text or "timed out" in text
+
+
+def make_session(pool_size: int = 4):
+    """
+    Build the pooled HTTP session passed to yfinance.
+
+    Returns a curl_cffi session (what current yfinance releases expect) when
+    curl_cffi is installed, else a `requests.Session` whose connection pool
+    holds `pool_size` connections per host.
+    """
+    if _HAS_CURL_CFFI:
+        from curl_cffi import requests as curl_requests
+
+        return curl_requests.Session(impersonate="chrome")
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+# ---------- client ----------
+
+class FetchClient:
+    """
+    Concurrency-capped, retrying yfinance client with a pooled session.
+
+    Args:
+        max_concurrency (int): Upper bound on in-flight upstream requests.
+        timeout (float): Seconds allowed per attempt (also passed to yfinance).
+        retries (int): Extra attempts after the first one for transient errors.
+        backoff (float): Base delay in seconds; attempt k sleeps a random time
+            in [0, min(max_backoff, backoff * 2**k)].
+        max_backoff (float): Ceiling on a single backoff delay.
+        session: HTTP session to reuse; built with `make_session` on first use.
+        breaker (CircuitBreaker, optional): Shared upstream breaker; a default
+            one (5 failures → open for 30 s) is created if omitted.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        session=None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = float(timeout)
+        self.retries = max(0, int(retries))
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+        self._session = session
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ---------- event loop / pool ----------
+
+    @property
+    def session(self):
+        """The shared pooled session (created on first use)."""
+        with self._lock:
+            if self._session is None:
+                self._session = make_session(self.max_concurrency)
+            return self._session
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop and worker pool on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="yf")
+                self._loop = asyncio.new_event_loop()
+                self._loop.set_default_executor(self._executor)
+                self._thread = threading.Thread(target=self._loop.run_forever, name="fetch-loop", daemon=True)
+                self._thread.start()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            return self._loop
+
+    def run(self, coro):
+        """
+        Run a coroutine on the client's loop and block until it finishes.
+
+        Raises:
+            RuntimeError: If called from the client's own loop (await instead).
+        """
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("FetchClient.run() called from its own event loop; await the coroutine instead.")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self) -> None:
+        """Stop the background loop and worker threads (a later call restarts them)."""
+        with self._lock:
+            loop, executor = self._loop, self._executor
+            self._loop = self._thread = self._executor = self._semaphore = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    # ---------- core ----------
+
+    async def call(self, fn: Callable, *args, **kwargs):
+        """
+        Run a blocking upstream call with the concurrency cap, timeout and retries.
+
+        Args:
+            fn (callable): Blocking function to run on the worker pool.
+            *args, **kwargs: Passed to `fn`.
+
+        Returns:
+            Whatever `fn` returns.
+
+        Raises:
+            CircuitOpenError: If the breaker is open (no request is made).
+            FetchError: When the call fails with a permanent error or keeps
+                failing after `retries` extra attempts.
+        """
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is not loop:
+            # Awaited from another loop: hop onto the client's loop so the cap is shared
+            fut = asyncio.run_coroutine_threadsafe(self.call(fn, *args, **kwargs), loop)
+            return await asyncio.wrap_future(fut)
+        self.breaker.check()
+        attempt = 0
+        while True:
+            try:
+                result = await asyncio.wait_for(self._run_in_slot(fn, *args, **kwargs), timeout=self.timeout)
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                retryable = is_transient(e)
+                if not retryable or attempt >= self.retries:
+                    # Only exhausted transient failures count against the upstream
+                    if retryable:
+                        self.breaker.record_failure(e)
+                    else:
+                        self.breaker.record_success()
+                    reason = "timed out" if isinstance(e, asyncio.TimeoutError) else (str(e) or type(e).__name__)
+                    raise FetchError(f"{reason} (after {attempt + 1} attempt(s))", attempt + 1, retryable) from e
+            delay = random.uniform(0.0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _run_in_slot(self, fn: Callable, *args, **kwargs):
+        """
+        Run `fn` on the worker pool under one concurrency slot.
+
+        The slot is released when the worker thread finishes, even if the
+        awaiting side has already timed out: wait_for cannot stop a blocking
+        call, so the cap keeps counting threads that are really busy. Waiting
+        for a free slot happens inside the caller's timeout, so slots held by
+        hung calls surface as timeouts (and trip the breaker) rather than queues.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore
+        await semaphore.acquire()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # loop already closed (client.close()): nothing left to unblock
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    # ---------- yfinance calls (run on the worker pool) ----------
+
+    def _history_blocking(self, ticker, start, end, interval, auto_adjust, period) -> pd.DataFrame:
+        import yfinance as yf
+
+        t = yf.Ticker(ticker, session=self.session)
+        kwargs = dict(interval=interval, auto_adjust=auto_adjust, raise_errors=True, timeout=self.timeout)
+        if period is not None:
+            df = t.history(period=period, **kwargs)
+        else:
+            df = t.history(start=start, end=end, **kwargs)
+            # Match yf.download: daily-and-up bars come back tz-naive
+            if interval in _DAILY_INTERVALS and getattr(df.index, "tz", None) is not None:
+                df.index = df.index.tz_localize(None)
+        return df.drop(columns=[c for c in _EVENT_COLUMNS if c in df.columns])
+
+    def _snapshot_blocking(self, ticker) -> dict:
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker, session=self.session)
+        info = stock.fast_info if hasattr(stock, "fast_info") else {}
+        # Fallback to .info for missing fields
+        try:
+            info = {**stock.info, **info}
+        except Exception:
+            pass
+        return info
+
+    # ---------- async API ----------
+
+    async def history_async(self, ticker: str, start=None, end=None, interval: str = "1d",
+                            auto_adjust: bool = True, period: Optional[str] = None) -> pd.DataFrame:
+        """Price history for one ticker (see `DataSource.history`)."""
+        return await self.call(self._history_blocking, ticker, start, end, interval, auto_adjust, period)
+
+    async def snapshot_async(self, ticker: str) -> dict:
+        """Quote fields (fast_info merged over info) for one ticker."""
+        return await self.call(self._snapshot_blocking, ticker)
+
+    async def gather_history(self, tickers: Iterable[str], **kwargs) -> Dict[str, Union[pd.DataFrame, FetchError]]:
+        """
+        Fetch several tickers concurrently (still bounded by `max_concurrency`).
+
+        Returns:
+            dict: {ticker: DataFrame} on success, {ticker: FetchError} on failure.
+        """
+        symbols = list(dict.fromkeys(tickers))
+        results = await asyncio.gather(
+            *(self.history_async(t, **kwargs) for t in symbols), return_exceptions=True
+        )
+        return dict(zip(symbols, results))
+
+    # ---------- sync wrappers ----------
+
+    def history(self, ticker: str, start=None, end=None, interval: str = "1d",
+                auto_adjust: bool = True, period: Optional[str] = None) -> pd.DataFrame:
+        """Blocking `history_async`."""
+        return self.run(self.history_async(ticker, start, end, interval, auto_adjust, period))
+
+    def snapshot(self, ticker: str) -> dict:
+        """Blocking `snapshot_async`."""
+        return self.run(self.snapshot_async(ticker))
+
+
+_client: Optional[FetchClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FetchClient:
+    """Process-wide client, so the concurrency cap and session span all sessions."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FetchClient(
+                max_concurrency=int(_env_number("FETCH_MAX_CONCURRENCY", 4)),
+                timeout=_env_number("FETCH_TIMEOUT", 10.0),
+                retries=int(_env_number("FETCH_RETRIES", 3)),
+            )
+        return _client
+
+
+def set_client(client: FetchClient) -> None:
+    """Replace the process-wide client (e.g. different limits in a load test)."""
+    global _client
+    with _client_lock:
+        old, _client = _client, client
+    if old is not None and old is not client:
+        old.close()
@@ -0,0 +1,283 @@
+# scr/data/price_store.py
+"""
+Memory-Mapped Price Store
+-------------------------
+Keeps each loaded dataset ONCE on disk as plain NumPy column files and hands out
+read-only, memory-mapped views of it. Every session (and every page) that loads
+the same ticker/range maps the same file pages, so resident memory stays flat
+as users are added instead of growing with one DataFrame copy per session.
+
+Layout (under PRICE_STORE_DIR, default ~/.cache/inf1002_store):
+    <key>.json               → {"version": ..., "columns": [...], "rows": n, ...}
+    <key>.<version>/Date.npy → int64 epoch nanoseconds
+    <key>.<version>/<col>.npy → float64 (or float32) price columns, Volume as stored
+
+Compact frames (`data_preprocessing.to_compact`) keep their float32 prices and
+int64 Volume in the store whatever `price_dtype` is.
+
+Views are pandas DataFrames whose columns point straight at the mapped arrays.
+Writing into them raises "assignment destination is read-only"; adding or
+replacing whole columns is fine (it only changes the caller's frame).
+
+Every view carries `view.attrs["freshness"]` (see scr.data.swr): where the data
+came from, when it was fetched, and whether it is stale. With
+`get_or_load(..., stale_while_revalidate=True)` an outdated entry is served at
+once and refreshed in the background; if that refresh fails, its error is
+recorded on the entry (and so in every later view's freshness).
+"""
+
+from __future__ import annotations
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scr.data.data_preprocessing import decode_dates
+from scr.data.singleflight import coalesce, in_flight
+from scr.data.swr import freshness, refresh_in_background
+
+STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "inf1002_store"),
+)
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def store_key(ticker: str, start, end, interval: str = "1d") -> str:
+    """Filesystem-safe key for one ticker/range/interval, e.g. 'AAPL_1d_2023-01-01_2024-01-01'."""
+    safe = "".join(ch if ch.isalnum() or ch in "-." else "_" for ch in str(ticker).upper())
+    s = pd.Timestamp(start).date().isoformat()
+    e = pd.Timestamp(end).date().isoformat() if end is not None else "open"
+    return f"{safe}_{interval}_{s}_{e}"
+
+
+class PriceStore:
+    """
+    Directory of memory-mapped datasets, shared by all sessions in the process
+    (and by other processes pointing at the same directory).
+
+    Args:
+        root (str): Directory holding the column files.
+        price_dtype (str): "float64" (default) or "float32" for price columns.
+    """
+
+    def __init__(self, root: str = STORE_DIR, price_dtype: str = "float64"):
+        self.root = root
+        self.price_dtype = np.dtype(price_dtype)
+        self._views: Dict[str, Tuple[str, pd.DataFrame]] = {}
+        self._lock = threading.RLock()
+
+    # ---------- helpers ----------
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root, key + ".json")
+
+    def _read_meta(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _flight(self, key: str) -> tuple:
+        return ("store", self.root, key)
+
+    def _record_error(self, key: str, error: str) -> None:
+        """Mark the stored entry (if any) as degraded by a failed reload."""
+        with self._lock:
+            meta = self._read_meta(key)
+            if meta is None:
+                return
+            meta["error"] = error
+            tmp = self._meta_path(key) + f".{meta['version']}.err.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(meta, fh)
+            os.replace(tmp, self._meta_path(key))
+
+    def _open(self, key: str, meta: dict) -> pd.DataFrame:
+        """Map every column of one stored version and wrap them in a DataFrame."""
+        folder = os.path.join(self.root, f"{key}.{meta['version']}")
+        dates = np.load(os.path.join(folder, "Date.npy"), mmap_mode="r").view("datetime64[ns]")
+        data = {"Date": dates}
+        if meta.get("tz"):
+            data["Date"] = pd.DatetimeIndex(dates).tz_localize("UTC").tz_convert(meta["tz"])
+        for col in meta["columns"]:
+            data[col] = np.load(os.path.join(folder, f"{col}.npy"), mmap_mode="r")
+        return pd.DataFrame(data, copy=False)
+
+    # ---------- public API ----------
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """
+        Return a read-only view of a stored dataset, or None if absent/too old.
+
+        Args:
+            key (str): Dataset key (see `store_key`).
+            max_age (float, optional): Ignore entries older than this many seconds
+                (useful for ranges that end today and are still changing).
+
+        Returns:
+            pd.DataFrame | None: Columns 'Date' plus the stored price columns.
+                A shallow copy: callers may add columns without affecting others.
+                `attrs["freshness"]` describes its age and source.
+        """
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        if max_age is not None and time.time() - meta.get("created", 0) > max_age:
+            return None
+        with self._lock:
+            hit = self._views.get(key)
+            if hit is None or hit[0] != meta["version"]:
+                try:
+                    hit = (meta["version"], self._open(key, meta))
+                except (OSError, ValueError, KeyError):
+                    return None
+                self._views[key] = hit
+            view = hit[1].copy(deep=False)
+        view.attrs["freshness"] = freshness(
+            meta.get("source") or "store", meta.get("created", 0), max_age, error=meta.get("error"),
+        )
+        return view
+
+    def status(self, key: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """
+        Current freshness of a stored dataset without mapping its columns:
+        age, recorded reload error, and whether a reload is running now.
+
+        Returns:
+            dict | None: Freshness dict (see scr.data.swr), or None if absent.
+        """
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        return freshness(meta.get("source") or "store", meta.get("created", 0), max_age,
+                         refreshing=in_flight(self._flight(key)), error=meta.get("error"))
+
+    def put(self, key: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Write a dataset (with a 'Date' column or DatetimeIndex) and return its view.
+
+        Columns are written to a fresh version directory and published by
+        atomically replacing the JSON pointer, so readers never see a partial
+        write. The previous version is removed; on POSIX, sessions still holding
+        it keep their mapping until they drop it.
+
+        Raises:
+            ValueError: If the frame has no dates.
+        """
+        if "Date" in df.columns:
+            dates = pd.DatetimeIndex(decode_dates(df["Date"]))
+        elif isinstance(df.index, pd.DatetimeIndex):
+            dates = df.index
+        else:
+            raise ValueError("PriceStore.put expects a 'Date' column or DatetimeIndex.")
+
+        with self._lock:
+            return self._write(key, df, dates)
+
+    def _write(self, key: str, df: pd.DataFrame, dates: pd.DatetimeIndex) -> pd.DataFrame:
+        """Write one new version of `key` and publish it (caller holds the lock)."""
+        tz = str(dates.tz) if dates.tz is not None else None
+        if tz:
+            dates = dates.tz_convert("UTC").tz_localize(None)
+        version = uuid.uuid4().hex[:12]
+        folder = os.path.join(self.root, f"{key}.{version}")
+        os.makedirs(folder, exist_ok=True)
+
+        np.save(os.path.join(folder, "Date.npy"), dates.as_unit("ns").asi8)
+        columns = [c for c in PRICE_COLUMNS if c in df.columns]
+        for col in columns:
+            values = pd.to_numeric(df[col], errors="coerce")
+            if values.dtype == np.float32 or (col == "Volume" and values.dtype.kind in "iu"):
+                values = values.to_numpy()  # already compact: keep as is
+            else:
+                values = values.to_numpy(dtype=self.price_dtype, na_value=np.nan)
+            np.save(os.path.join(folder, f"{col}.npy"), values)
+
+        # Provenance: a frame served from an old cache because the upstream
+        # failed carries the error, so the entry is treated as stale.
+        fresh = df.attrs.get("freshness") or {}
+        if not fresh.get("source"):
+            from scr.data.sources import get_source
+            fresh = {**fresh, "source": get_source().name}
+
+        old = self._read_meta(key)
+        meta = {"version": version, "columns": columns, "rows": len(dates), "tz": tz, "created": time.time(),
+                "source": fresh["source"], "error": fresh.get("error")}
+        tmp = self._meta_path(key) + f".{version}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._meta_path(key))
+        if old and old.get("version") != version:
+            shutil.rmtree(os.path.join(self.root, f"{key}.{old['version']}"), ignore_errors=True)
+
+        view = self.get(key)
+        return view if view is not None else df
+
+    def get_or_load(self, key: str, loader, max_age: Optional[float] = None,
+                    stale_while_revalidate: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Return the stored view, calling `loader()` and storing its result on a miss.
+
+        Concurrent misses for the same key (e.g. several sessions loading the
+        same ticker at once) run `loader()` and write the store only once.
+
+        Args:
+            key (str): Dataset key (see `store_key`).
+            loader (callable): Returns the frame to store (or None/empty).
+                Should raise on failure: the error is then recorded on the
+                stored entry, so its freshness reports why it is stale.
+            max_age (float, optional): Seconds after which an entry is outdated.
+            stale_while_revalidate (bool): Serve an outdated (or degraded) entry
+                immediately and reload it on a background thread instead of
+                blocking on `loader()`. Skipped while the upstream circuit is open.
+
+        Returns:
+            pd.DataFrame | None: The view, or None if `loader` returned nothing.
+        """
+        def load() -> Optional[pd.DataFrame]:
+            try:
+                df = loader()
+            except Exception as e:
+                self._record_error(key, str(e) or type(e).__name__)
+                raise
+            if df is None or df.empty:
+                return None
+            return self.put(key, df)
+
+        flight = self._flight(key)
+        if stale_while_revalidate:
+            view = self.get(key)
+            if view is not None:
+                fresh = freshness(view.attrs["freshness"]["source"], view.attrs["freshness"]["fetched_at"],
+                                  max_age, error=view.attrs["freshness"]["error"])
+                if fresh["stale"]:
+                    fresh["refreshing"] = refresh_in_background(flight, load)
+                view.attrs["freshness"] = fresh
+                return view
+        else:
+            view = self.get(key, max_age=max_age)
+            if view is not None:
+                return view
+
+        view, shared = coalesce(flight, load)
+        return view.copy(deep=False) if shared and view is not None else view
+
+
+_store: Optional[PriceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> PriceStore:
+    """Process-wide store, so every Streamlit session maps the same files."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore()
+        return _store
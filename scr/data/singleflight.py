@@ -0,0 +1,128 @@
+# scr/data/singleflight.py
+"""
+Single-flight Request Coalescing
+--------------------------------
+Streamlit runs every browser session on its own thread in one process. When
+several sessions (or several pages of one session) ask for the same data at the
+same moment, only the first caller — the leader — runs the fetch; the others
+wait for it and receive the same result (or the same exception).
+
+Keys are plain tuples; `request_key` builds the canonical
+(ticker, start, end, interval, adjust) key used by `scr.data`.
+
+Nothing is cached here: once the in-flight call finishes, the next request for
+the key starts a new one. Results are shared objects — treat them as read-only.
+"""
+
+from __future__ import annotations
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple, TypeVar
+import pandas as pd
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight call: the waiters block on `done` until the leader finishes."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Group of coalesced calls, keyed by any hashable value.
+
+    Attributes:
+        stats (dict): Counters — "leaders" (calls actually executed) and
+            "shared" (callers served by someone else's call).
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run `fn()` unless an identical call is already in flight; then wait for it.
+
+        Args:
+            key (Hashable): Identity of the request.
+            fn (callable): Zero-argument function doing the actual work.
+
+        Returns:
+            tuple: (result, shared) — `shared` is True when the result came
+                from another caller's in-flight call.
+
+        Raises:
+            Exception: Whatever the leader's `fn()` raised, re-raised in every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats["shared"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats["leaders"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self, key: Hashable) -> bool:
+        """True while a call for `key` is running."""
+        with self._lock:
+            return key in self._calls
+
+
+def request_key(kind: str, ticker: str, start=None, end=None, interval: str = "1d",
+                adjust=None, period: Optional[str] = None) -> tuple:
+    """
+    Canonical coalescing key, e.g.
+    ("history", "AAPL", "2024-01-01T00:00:00", "2024-06-01T00:00:00", "1d", True, None).
+
+    Dates are reduced to ISO strings so "2024-01-01", date(2024, 1, 1) and
+    Timestamp("2024-01-01") coalesce; None stays None (open range).
+    """
+    def _iso(value):
+        return None if value is None else pd.Timestamp(value).isoformat()
+
+    return (kind, str(ticker).strip().upper(), _iso(start), _iso(end), interval, adjust, period)
+
+
+_group = SingleFlight()
+
+
+def coalesce(key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+    """Process-wide `SingleFlight.do` (shared by every session and page)."""
+    return _group.do(key, fn)
+
+
+def in_flight(key: Hashable) -> bool:
+    """True while a process-wide call for `key` is running."""
+    return _group.in_flight(key)
+
+
+def flight_stats() -> Dict[str, int]:
+    """Copy of the process-wide leader/shared counters."""
+    return dict(_group.stats)
@@ -0,0 +1,314 @@
+# scr/data/sources.py
+"""
+Data Sources
+------------
+Every price read in the app goes through a `DataSource`, so the same pages and
+`scr.data` functions can run against Yahoo Finance, a local directory of files,
+or a deterministic synthetic generator (for load tests and profiling without
+network access).
+
+Implementations:
+- YFinanceSource: live Yahoo Finance data (default).
+- DirectorySource: replays `<root>/<TICKER>.parquet` or `<root>/<TICKER>.csv`.
+- SyntheticSource: geometric Brownian motion with a fixed seed per ticker.
+
+The process-wide source is picked from the DATA_SOURCE environment variable:
+    DATA_SOURCE=yfinance                       (default)
+    DATA_SOURCE=dir:/path/to/files
+    DATA_SOURCE=synthetic                      (or synthetic:rows=1000000,seed=7)
+or set explicitly with `set_source(...)`.
+"""
+
+from __future__ import annotations
+import os
+import threading
+import zlib
+from typing import Dict, Optional, Protocol, Tuple, runtime_checkable
+import numpy as np
+import pandas as pd
+from scr.data.data_preprocessing import standardize_ohlcv
+from scr.data.fetch_client import get_client
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+# yfinance period strings → offsets from the end of the range
+_PERIODS = {
+    "1d": pd.DateOffset(days=1), "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1), "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6), "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2), "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# yfinance interval strings → pandas frequencies (synthetic bars)
+_FREQS = {
+    "1m": "min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min",
+    "60m": "h", "1h": "h", "1d": "B", "5d": "5B", "1wk": "W-FRI", "1mo": "BME",
+}
+
+
+@runtime_checkable
+class DataSource(Protocol):
+    """
+    Minimal interface the data layer needs from a price provider.
+
+    Attributes:
+        name (str): Short label shown in the UI (e.g. "yfinance").
+        cacheable (bool): Whether results should go through the on-disk cache.
+            Local sources are already fast and return False.
+    """
+
+    name: str
+    cacheable: bool
+
+    def history(
+        self,
+        ticker: str,
+        start=None,
+        end=None,
+        interval: str = "1d",
+        auto_adjust: bool = True,
+        period: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Return OHLCV bars with a DatetimeIndex named 'Date' (empty if none)."""
+        ...
+
+    def snapshot(self, ticker: str) -> dict:
+        """Return quote fields using yfinance's info/fast_info key names."""
+        ...
+
+# ---------- helpers ----------
+
+def _finish(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Flatten MultiIndex columns and name the index 'Date'."""
+    if df is None:
+        return pd.DataFrame(columns=OHLCV)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df.index.name = "Date"
+    return df
+
+
+def _window(start, end, period: Optional[str], last: pd.Timestamp) -> Tuple[Optional[pd.Timestamp], pd.Timestamp]:
+    """Resolve (start, end) from explicit dates or a yfinance-style period; end is exclusive."""
+    end_ts = pd.Timestamp(end) if end is not None else last + pd.Timedelta(days=1)
+    if period is not None and period != "max":
+        if period == "ytd":
+            return pd.Timestamp(end_ts.year, 1, 1), end_ts
+        return end_ts - _PERIODS.get(period, pd.DateOffset(years=1)), end_ts
+    return (pd.Timestamp(start) if start is not None else None), end_ts
+
+
+def _slice(df: pd.DataFrame, start, end) -> pd.DataFrame:
+    """Rows in [start, end), comparing in the index's own timezone."""
+    tz = getattr(df.index, "tz", None)
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        s = pd.Timestamp(start)
+        mask &= df.index >= (s.tz_localize(tz) if tz is not None and s.tzinfo is None else s)
+    if end is not None:
+        e = pd.Timestamp(end)
+        mask &= df.index < (e.tz_localize(tz) if tz is not None and e.tzinfo is None else e)
+    return df[mask]
+
+
+def _snapshot_from_bars(df: pd.DataFrame) -> dict:
+    """Build a yfinance-like snapshot dict from the last two bars of a frame."""
+    if df is None or df.empty:
+        return {}
+    last = df.iloc[-1]
+    prev_close = float(df["Close"].iloc[-2]) if len(df) > 1 else float(last["Close"])
+    price = float(last["Close"])
+    change = price - prev_close
+    return {
+        "last_price": price,
+        "regularMarketPrice": price,
+        "previousClose": prev_close,
+        "open": float(last["Open"]),
+        "dayLow": float(last["Low"]),
+        "dayHigh": float(last["High"]),
+        "volume": float(last["Volume"]),
+        "fiftyTwoWeekLow": float(df["Low"].iloc[-252:].min()),
+        "fiftyTwoWeekHigh": float(df["High"].iloc[-252:].max()),
+        "regularMarketChange": change,
+        "regularMarketChangePercent": (change / prev_close * 100.0) if prev_close else None,
+    }
+
+# ---------- implementations ----------
+
+class YFinanceSource:
+    """
+    Live Yahoo Finance data via `yfinance` (imported on first use).
+
+    Requests go through the process-wide `FetchClient` (pooled session,
+    timeouts, retries with backoff, concurrency cap). A request that still
+    fails raises `scr.data.fetch_client.FetchError`.
+    """
+
+    name = "yfinance"
+    cacheable = True
+
+    def history(self, ticker, start=None, end=None, interval="1d", auto_adjust=True, period=None):
+        df = get_client().history(ticker, start=start, end=end, interval=interval,
+                                  auto_adjust=auto_adjust, period=period)
+        return _finish(df)
+
+    def snapshot(self, ticker):
+        return get_client().snapshot(ticker)
+
+
+class DirectorySource:
+    """
+    Replay prices from local files: `<root>/<TICKER>.parquet` or `<root>/<TICKER>.csv`.
+
+    Files may use any layout `standardize_ohlcv` understands. `auto_adjust` and
+    `interval` are ignored: the files are returned as stored.
+    """
+
+    name = "directory"
+    cacheable = False
+
+    def __init__(self, root: str):
+        self.root = root
+        self._frames: Dict[str, Tuple[float, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str) -> str:
+        for ext in (".parquet", ".csv"):
+            path = os.path.join(self.root, ticker.upper() + ext)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"No file for {ticker} in {self.root}")
+
+    def _load(self, ticker: str) -> pd.DataFrame:
+        path = self._path(ticker)
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            hit = self._frames.get(path)
+            if hit is not None and hit[0] == mtime:
+                return hit[1]
+        raw = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+        df = standardize_ohlcv(raw)
+        with self._lock:
+            self._frames[path] = (mtime, df)
+        return df
+
+    def history(self, ticker, start=None, end=None, interval="1d", auto_adjust=True, period=None):
+        df = self._load(ticker)
+        if df.empty:
+            return _finish(df.copy())
+        s, e = _window(start, end, period, df.index[-1])
+        return _finish(_slice(df, s, e).copy())
+
+    def snapshot(self, ticker):
+        return _snapshot_from_bars(self._load(ticker))
+
+
+class SyntheticSource:
+    """
+    Deterministic geometric-Brownian-motion prices for offline runs.
+
+    The same (seed, ticker, range, interval) always yields the same bars, so
+    benchmarks and load tests are reproducible.
+
+    Args:
+        rows (int, optional): If set, return exactly this many bars ending at
+            the requested end (ignores start/period) — handy for sizing tests.
+        seed (int): Base seed; combined with a hash of the ticker.
+        start_price (float): Price of the first bar.
+        mu (float): Annualized drift.
+        sigma (float): Annualized volatility.
+    """
+
+    name = "synthetic"
+    cacheable = False
+
+    def __init__(self, rows: Optional[int] = None, seed: int = 42,
+                 start_price: float = 100.0, mu: float = 0.08, sigma: float = 0.25):
+        self.rows = rows
+        self.seed = seed
+        self.start_price = start_price
+        self.mu = mu
+        self.sigma = sigma
+
+    def _index(self, start, end, interval: str, period: Optional[str]) -> pd.DatetimeIndex:
+        freq = _FREQS.get(interval, "B")
+        today = pd.Timestamp.today().normalize()
+        s, e = _window(start, end, period, today)
+        if self.rows is not None:
+            return pd.date_range(end=e - pd.Timedelta(days=1), periods=int(self.rows), freq=freq)
+        s = s if s is not None else pd.Timestamp("2000-01-03")
+        return pd.date_range(s, e, freq=freq, inclusive="left")
+
+    def history(self, ticker, start=None, end=None, interval="1d", auto_adjust=True, period=None):
+        idx = self._index(start, end, interval, period)
+        n = len(idx)
+        if n == 0:
+            return _finish(pd.DataFrame(columns=OHLCV, index=idx))
+
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.upper().encode())])
+        dt = 1.0 / 252.0
+        shocks = rng.standard_normal(n)
+        log_ret = (self.mu - 0.5 * self.sigma ** 2) * dt + self.sigma * np.sqrt(dt) * shocks
+        log_ret[0] = 0.0
+        close = self.start_price * np.exp(np.cumsum(log_ret))
+        open_ = np.r_[close[0], close[:-1]]
+        spread = np.abs(rng.standard_normal(n)) * self.sigma * np.sqrt(dt) * close
+        high = np.maximum(open_, close) + spread
+        low = np.minimum(open_, close) - spread
+        volume = rng.integers(500_000, 5_000_000, n).astype(float)
+
+        df = pd.DataFrame(
+            {"Open": open_, "High": high, "Low": low, "Close": close, "Adj Close": close, "Volume": volume},
+            index=idx,
+        )
+        return _finish(df)
+
+    def snapshot(self, ticker):
+        return _snapshot_from_bars(self.history(ticker, period="1y"))
+
+# ---------- process-wide source ----------
+
+_source: Optional[DataSource] = None
+_source_lock = threading.Lock()
+
+
+def source_from_spec(spec: str) -> DataSource:
+    """
+    Build a source from a DATA_SOURCE-style string.
+
+    Examples: "yfinance", "dir:./data", "synthetic", "synthetic:rows=100000,seed=7".
+
+    Raises:
+        ValueError: If the spec names an unknown source.
+    """
+    kind, _, arg = (spec or "yfinance").strip().partition(":")
+    kind = kind.lower()
+    if kind in ("", "yfinance", "yahoo"):
+        return YFinanceSource()
+    if kind in ("dir", "directory", "replay"):
+        return DirectorySource(arg or ".")
+    if kind == "synthetic":
+        kwargs = {}
+        for item in filter(None, arg.split(",")):
+            key, _, val = item.partition("=")
+            key = key.strip()
+            kwargs[key] = int(val) if key in ("rows", "seed") else float(val)
+        return SyntheticSource(**kwargs)
+    raise ValueError(f"Unknown data source: {spec!r}")
+
+
+def get_source() -> DataSource:
+    """Return the process-wide data source (created from DATA_SOURCE on first use)."""
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = source_from_spec(os.environ.get("DATA_SOURCE", "yfinance"))
+        return _source
+
+
+def set_source(source: DataSource) -> None:
+    """Replace the process-wide data source (e.g. in a benchmark or load test)."""
+    global _source
+    with _source_lock:
+        _source = source
@@ -0,0 +1,190 @@
+# scr/data/swr.py
+"""
+Stale-While-Revalidate Serving
+------------------------------
+Keeps page latency bounded when the upstream is slow or failing: a request is
+answered from the most recent stored value at once, and if that value is older
+than its freshness window it is refreshed on a background thread.
+
+- fresh  (age ≤ fresh_for)         → served as is.
+- stale  (fresh_for < age ≤ max_stale) → served as is + background refresh.
+- expired or missing               → loaded synchronously; if that load fails
+  and an (expired) value exists, the old value is served with the error.
+
+Refreshes are coalesced per key (scr.data.singleflight) and skipped while the
+upstream circuit breaker is open. Every answer carries a freshness dict:
+
+    {"source": str, "fetched_at": float (epoch s), "age": float (s),
+     "stale": bool, "refreshing": bool, "error": str | None}
+"""
+
+from __future__ import annotations
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from scr.data.singleflight import coalesce, in_flight
+
+logger = logging.getLogger(__name__)
+
+_refresher: Optional[ThreadPoolExecutor] = None
+_refresher_lock = threading.Lock()
+
+# ---------- helpers ----------
+
+def upstream_available() -> bool:
+    """False while the fetch client's circuit breaker is open."""
+    from scr.data.fetch_client import get_client
+
+    return not get_client().breaker.is_open()
+
+
+def freshness(source: str, fetched_at: float, fresh_for: Optional[float],
+              refreshing: bool = False, error: Optional[str] = None) -> dict:
+    """Build the freshness dict for a value fetched at `fetched_at` (epoch seconds)."""
+    age = max(0.0, time.time() - fetched_at)
+    stale = error is not None or (fresh_for is not None and age > fresh_for)
+    return {"source": source, "fetched_at": fetched_at, "age": age,
+            "stale": stale, "refreshing": refreshing, "error": error}
+
+
+def describe(fresh: Optional[dict]) -> str:
+    """One-line label for the UI, e.g. "yfinance • 3 min old • stale, refreshing"."""
+    if not fresh:
+        return "unknown"
+    age = fresh.get("age")
+    if age is None:
+        age_txt = None
+    elif age < 60:
+        age_txt = f"{age:.0f}s old"
+    elif age < 3600:
+        age_txt = f"{age / 60:.0f} min old"
+    else:
+        age_txt = f"{age / 3600:.1f} h old"
+    flags = []
+    if fresh.get("stale"):
+        flags.append("stale")
+    if fresh.get("refreshing"):
+        flags.append("refreshing")
+    parts = [fresh.get("source") or "unknown", age_txt, ", ".join(flags) or "fresh"]
+    return " • ".join(p for p in parts if p)
+
+
+def refresh_in_background(key: Hashable, fn: Callable[[], object]) -> bool:
+    """
+    Run `fn()` on the shared refresher pool unless a call for `key` is already in
+    flight or the upstream circuit is open. The refresh is coalesced under `key`
+    (scr.data.singleflight), so a synchronous load of the same key joins it.
+    `fn` should record its own failure in the entry it refreshes (as
+    `SWRCache._load` and `PriceStore.get_or_load` do); here it is only logged.
+
+    Returns:
+        bool: True if a refresh is (now) running for `key`.
+    """
+    global _refresher
+    if in_flight(key):
+        return True
+    if not upstream_available():
+        return False
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="swr")
+
+    def run():
+        try:
+            coalesce(key, fn)
+        except Exception:
+            # Keep serving the stale value; `fn` surfaced the error via freshness
+            logger.warning("Background refresh of %r failed", key, exc_info=True)
+
+    _refresher.submit(run)
+    return True
+
+# ---------- in-memory SWR cache ----------
+
+class SWRCache:
+    """
+    Small process-wide LRU of values served stale-while-revalidate.
+
+    Args:
+        fresh_for (float): Seconds a value counts as fresh.
+        max_stale (float): Beyond this age a value is reloaded synchronously
+            (and only served if that reload fails). Defaults to no limit.
+        capacity (int): Maximum number of keys kept.
+    """
+
+    def __init__(self, fresh_for: float, max_stale: float = math.inf, capacity: int = 256):
+        self.fresh_for = float(fresh_for)
+        self.max_stale = float(max_stale)
+        self.capacity = int(capacity)
+        self._entries: "OrderedDict[Hashable, Tuple[object, float, str, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, key: Hashable, value, source: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            if error is not None:
+                old = self._entries.get(key)
+                if old is None:
+                    return
+                self._entries[key] = (old[0], old[1], old[2], error)  # keep the old value
+            else:
+                self._entries[key] = (value, time.time(), source, None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: Hashable, loader: Callable[[], object], source: str):
+        try:
+            value = loader()
+        except Exception as e:
+            self._store(key, None, source, error=str(e) or type(e).__name__)
+            raise
+        self._store(key, value, source)
+        return value
+
+    def get(self, key: Hashable, loader: Callable[[], object], source: str = "upstream") -> Tuple[object, dict]:
+        """
+        Return (value, freshness) for `key`, loading or refreshing via `loader()`.
+
+        Raises:
+            Exception: Whatever `loader()` raised, if there is nothing to serve.
+        """
+        flight = ("swr", id(self), key)
+        with self._lock:
+            hit = self._entries.get(key)
+        if hit is not None:
+            value, fetched_at, src, error = hit
+            age = time.time() - fetched_at
+            if age <= self.fresh_for and error is None:
+                return value, freshness(src, fetched_at, self.fresh_for)
+            if age <= self.max_stale:
+                refreshing = refresh_in_background(flight, lambda: self._load(key, loader, source))
+                return value, freshness(src, fetched_at, self.fresh_for, refreshing, error)
+
+        try:
+            value, _ = coalesce(flight, lambda: self._load(key, loader, source))
+        except Exception as e:
+            if hit is None:
+                raise
+            return hit[0], freshness(hit[2], hit[1], self.fresh_for, error=str(e) or type(e).__name__)
+        return value, freshness(source, time.time(), self.fresh_for)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_caches: Dict[str, SWRCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, fresh_for: float, max_stale: float = math.inf) -> SWRCache:
+    """Named process-wide cache (Streamlit reruns page scripts, so don't build one per run)."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = SWRCache(fresh_for, max_stale)
+        return cache
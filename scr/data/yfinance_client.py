@@ -11,11 +11,60 @@ and converts data types for reliability across downstream computations
 and visualizations.
 """
 
-import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Tuple
 import pandas as pd
+from scr.data.cache import cached_download
+from scr.data.data_preprocessing import to_compact
 
 
-def fetch_prices(ticker: str, start, end, interval: str = "1d") -> pd.DataFrame | None:
+PRICE_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def _download_prices(ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+    """
+    Download and clean one ticker; raises instead of returning None.
+
+    Shared by `fetch_prices` (single ticker, errors swallowed) and
+    `fetch_prices_batch` (errors collected per ticker).
+
+    Raises:
+        RuntimeError: If Yahoo Finance returns no rows for the range.
+    """
+    # Download data using Yahoo Finance API (through the local on-disk cache,
+    # so only date ranges we have not fetched before hit the network)
+    df = cached_download(
+        ticker,
+        start,
+        end,
+        interval=interval,
+        auto_adjust=False    # Keep raw close prices (no dividends/splits applied)
+    )
+
+    # Handle missing or invalid results
+    if df is None or df.empty:
+        raise RuntimeError("No data returned. Check ticker or date range.")
+
+    # Some tickers return MultiIndex columns (e.g., ('Close', 'MSFT'))
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    # Reset index to make 'Date' a column
+    df = df.reset_index()
+    df["Date"] = pd.to_datetime(df["Date"])  # Ensure consistent datetime format
+
+    # Convert all numeric columns to float (coerce invalid data to NaN)
+    for c in ["Open", "High", "Low", "Close", "Adj Close", "Volume"]:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    # Keep only the standard financial columns in consistent order
+    keep = [c for c in PRICE_COLUMNS if c in df.columns]
+    return df[keep]
+
+
+def fetch_prices(ticker: str, start, end, interval: str = "1d", compact: bool = False,
+                 raise_errors: bool = False) -> pd.DataFrame | None:
     """
     Fetch historical stock prices from Yahoo Finance and return a cleaned DataFrame.
 
@@ -29,45 +78,113 @@ def fetch_prices(ticker: str, start, end, interval: str = "1d") -> pd.DataFrame
         end (str or datetime): End date for the data retrieval (e.g., "2023-12-31").
         interval (str, optional): Data sampling frequency. Defaults to "1d".
             Common options: "1d" (daily), "1wk" (weekly), "1mo" (monthly).
+        compact (bool, optional): Return float32 prices and int64 Volume
+            (see `data_preprocessing.to_compact`). Defaults to False.
+        raise_errors (bool, optional): Raise instead of returning None, for
+            callers that record the failure (e.g. stale-while-revalidate
+            loaders). Defaults to False.
 
     Returns:
         pd.DataFrame | None: A cleaned DataFrame containing stock price data.
             Returns None if data is unavailable or an error occurs.
+
+    Raises:
+        RuntimeError: Only with `raise_errors=True`: no rows for the range, or
+            the upstream failed (FetchError/CircuitOpenError).
+
+    Notes:
+        Upstream requests go through `scr.data.fetch_client` (pooled session,
+        per-attempt timeout, jittered backoff), so transient failures are
+        retried before None is returned.
     """
     try:
-        # Download data using Yahoo Finance API
-        df = yf.download(
-            tickers=ticker,
-            start=start,
-            end=end,
-            interval=interval,
-            progress=False,
-            group_by="column",   # Prevents multi-ticker column conflicts
-            auto_adjust=False    # Keep raw close prices (no dividends/splits applied)
-        )
+        df = _download_prices(ticker, start, end, interval)
+        return to_compact(df) if compact else df
+    except Exception as e:
+        if raise_errors:
+            raise
+        # Print error message for debugging without crashing the app
+        print(f"Error fetching {ticker}: {e}")
+        return None
 
-        # Handle missing or invalid results
-        if df is None or df.empty:
-            return None
 
-        # Some tickers return MultiIndex columns (e.g., ('Close', 'MSFT'))
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+def fetch_prices_batch(
+    tickers: Iterable[str],
+    start,
+    end,
+    interval: str = "1d",
+    layout: str = "wide",
+    field: str = "Close",
+    max_workers: int = 8,
+) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Fetch several tickers concurrently and return one aligned price panel.
 
-        # Reset index to make 'Date' a column
-        df = df.reset_index()
-        df["Date"] = pd.to_datetime(df["Date"])  # Ensure consistent datetime format
+    Downloads run on a bounded thread pool (each one still goes through the
+    on-disk cache), so a watchlist costs roughly one round-trip instead of N.
+    A failing ticker is reported in `errors` and does not abort the batch.
 
-        # Convert all numeric columns to float (coerce invalid data to NaN)
-        for c in ["Open", "High", "Low", "Close", "Adj Close", "Volume"]:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors="coerce")
+    Args:
+        tickers (Iterable[str]): Symbols to fetch; duplicates are ignored.
+        start (str or datetime): Start date for the data retrieval.
+        end (str or datetime): End date for the data retrieval.
+        interval (str, optional): Data sampling frequency. Defaults to "1d".
+        layout (str, optional): "wide" → Date × Ticker frame of `field`
+            (outer-joined on Date, NaN where a ticker has no bar);
+            "long" → tidy frame with a 'Ticker' column and all price columns.
+        field (str, optional): Column used for the wide layout. Defaults to "Close".
+        max_workers (int, optional): Upper bound on concurrent downloads.
 
-        # Keep only the standard financial columns in consistent order
-        keep = [c for c in ["Date", "Open", "High", "Low", "Close", "Adj Close", "Volume"] if c in df.columns]
-        return df[keep]
+    Returns:
+        tuple[pd.DataFrame, dict[str, str]]:
+            panel: The aligned frame (empty if every ticker failed).
+            errors: {ticker: error message} for tickers that failed (or,
+                for the wide layout, whose data has no `field` column).
 
-    except Exception as e:
-        # Print error message for debugging without crashing the app
-        print(f"Error fetching {ticker}: {e}")
-        return None
+    Raises:
+        ValueError: If `layout` is not "wide" or "long".
+    """
+    if layout not in ("wide", "long"):
+        raise ValueError("layout must be 'wide' or 'long'.")
+
+    symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    frames: Dict[str, pd.DataFrame] = {}
+    errors: Dict[str, str] = {}
+    if not symbols:
+        return pd.DataFrame(), errors
+
+    workers = max(1, min(max_workers, len(symbols)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+        futures = {pool.submit(_download_prices, t, start, end, interval): t for t in symbols}
+        for fut in as_completed(futures):
+            t = futures[fut]
+            try:
+                frames[t] = fut.result()
+            except Exception as e:
+                errors[t] = str(e) or type(e).__name__
+
+    # Keep the caller's ticker order in the output
+    ordered = [t for t in symbols if t in frames]
+    if not ordered:
+        return pd.DataFrame(), errors
+
+    if layout == "long":
+        panel = pd.concat(
+            [frames[t].assign(Ticker=t) for t in ordered], ignore_index=True
+        )
+        cols = ["Date", "Ticker"] + [c for c in PRICE_COLUMNS[1:] if c in panel.columns]
+        return panel[cols].sort_values(["Date", "Ticker"], kind="stable").reset_index(drop=True), errors
+
+    # A fetched ticker without `field` (e.g. no 'Adj Close' from a local source) is an error too
+    series = {}
+    for t in ordered:
+        if field in frames[t].columns:
+            series[t] = frames[t].set_index("Date")[field]
+        else:
+            errors[t] = f"No '{field}' column in the data."
+    if not series:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"), columns=pd.Index([], name="Ticker")), errors
+
+    wide = pd.concat(series, axis=1).sort_index()
+    wide.columns.name = "Ticker"
+    return wide, errors